@@ -0,0 +1,220 @@
+# async_api.py
+# ✅ asyncio API over services.py for many concurrent clients in one process
+# ✅ Blocking DB calls (pyodbc / sqlite3) run on a bounded worker thread pool
+# ✅ Backpressure (bounded queue) + per-call timeouts
+#
+#   api = AsyncServices()
+#   ok, err = await api.add("customers", {...})
+#   rows = await api.search_shipments("customer", 7, timeout=2)
+#   await api.close()
+#
+# Workers default to the connection pool size, so a worker never sits waiting for a
+# connection; at most `max_pending` more calls wait in the queue. When workers + queue are
+# full, callers wait for a slot (inside their timeout) or get Busy straight away (block=False).
+#
+# A timeout stops the caller from waiting. A call that has not started yet is dropped; one
+# that is already running in a worker still finishes (a write may still commit).
+#
+# Settings (environment variables):
+#   TRANSPORT_ASYNC_WORKERS   worker threads             (default = TRANSPORT_POOL_SIZE)
+#   TRANSPORT_ASYNC_QUEUE     calls allowed to wait      (default 100)
+#   TRANSPORT_ASYNC_TIMEOUT   seconds per call, 0 = none (default 30)
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import services
+from db_pool import get_pool
+
+
+class Busy(Exception):
+    """Every worker is busy and the queue is full (only raised with block=False)."""
+
+
+class AsyncStats:
+    def __init__(self):
+        self.calls = 0
+        self.completed = 0
+        self.failed = 0          # the service function raised
+        self.timeouts = 0
+        self.rejected = 0        # Busy
+        self.queue_waits = 0     # had to wait for a free slot
+        self.busy_time = 0.0     # seconds spent inside service functions
+        self.max_in_flight = 0
+
+    def snapshot(self) -> dict:
+        data = dict(vars(self))
+        data["avg_ms"] = self.busy_time / self.completed * 1000 if self.completed else 0.0
+        return data
+
+
+class AsyncServices:
+    def __init__(self, workers: int | None = None, max_pending: int | None = None,
+                 timeout: float | None = None):
+        self.workers = workers or int(os.environ.get("TRANSPORT_ASYNC_WORKERS", "0")) or get_pool().size
+        self.max_pending = max_pending if max_pending is not None else \
+            int(os.environ.get("TRANSPORT_ASYNC_QUEUE", "100"))
+        self.timeout = timeout if timeout is not None else float(os.environ.get("TRANSPORT_ASYNC_TIMEOUT", "30"))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="transport-db")
+        self._slots = None          # asyncio.Semaphore of self._loop (made again if the loop changes)
+        self._loop = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.stats = AsyncStats()
+
+    # ---------- core ----------
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers + self.max_pending)
+            self._loop = loop
+            self._in_flight = 0
+        return self._slots
+
+    def _run(self, fn, args, kwargs):
+        # worker thread
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.stats.busy_time += time.perf_counter() - t0
+
+    async def call(self, fn, *args, timeout: float | None = None, block: bool = True, **kwargs):
+        """
+        Run fn(*args, **kwargs) on a worker. timeout covers queueing + running
+        (None = the default, 0 = wait forever). Raises Busy, TimeoutError or fn's own exception.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout if timeout else None
+        slots = self._semaphore()
+        self.stats.calls += 1
+
+        if slots.locked():
+            if not block:
+                self.stats.rejected += 1
+                raise Busy(f"{self.workers} workers busy and {self.max_pending} calls queued")
+            self.stats.queue_waits += 1
+            try:
+                await asyncio.wait_for(slots.acquire(), timeout or None)
+            except TimeoutError:
+                self.stats.timeouts += 1
+                raise
+        else:
+            await slots.acquire()       # free slot: returns at once
+
+        loop = self._loop
+        self._in_flight += 1
+        self.stats.max_in_flight = max(self.stats.max_in_flight, self._in_flight)
+        try:
+            cfut = self._executor.submit(self._run, fn, args, kwargs)
+        except BaseException:
+            self._in_flight -= 1
+            slots.release()
+            raise
+        # the slot is given back when the worker is really done (not when the caller gives up),
+        # so a pile of timed-out calls cannot overload the database
+        cfut.add_done_callback(lambda _: self._release_threadsafe(loop, slots))
+
+        remaining = max(0.0, deadline - time.monotonic()) if deadline else None
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(cfut, loop=loop), remaining)
+        except TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        except Exception:
+            self.stats.failed += 1
+            raise
+        self.stats.completed += 1
+        return result
+
+    def _release_threadsafe(self, loop, slots):
+        def release():
+            self._in_flight -= 1
+            slots.release()
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            pass        # loop already closed
+
+    def info(self) -> dict:
+        return {"workers": self.workers, "max_pending": self.max_pending, "timeout": self.timeout,
+                "in_flight": self._in_flight, **self.stats.snapshot()}
+
+    async def close(self):
+        """Wait for running calls, then stop the workers."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    # ---------- services.py, async ----------
+    async def exists(self, entity: str, rid: int, **kw) -> bool:
+        return await self.call(services.exists, entity, rid, **kw)
+
+    async def add(self, entity: str, raw: dict, **kw):
+        return await self.call(services.add, entity, raw, **kw)
+
+    async def update(self, entity: str, rid: int, raw: dict, **kw):
+        return await self.call(services.update, entity, rid, raw, **kw)
+
+    async def delete(self, entity: str, rid: int, **kw):
+        return await self.call(services.delete, entity, rid, **kw)
+
+    async def list_page(self, entity: str, after: tuple | None = None, page_size: int | None = None, **kw):
+        """(rows, next_cursor); pass next_cursor back as `after` for the next page."""
+        return await self.call(services.list_page, entity, after, page_size, **kw)
+
+    async def shipment_join_page(self, after: tuple | None = None, page_size: int | None = None, **kw):
+        return await self.call(services.shipment_join_page, after, page_size, **kw)
+
+    async def search_shipments(self, by: str, value, **kw) -> list:
+        return await self.call(services.search_shipments, by, value, **kw)
+
+    async def route_shipments(self, origin: str, destination: str, **kw) -> list:
+        return await self.call(services.route_shipments, origin, destination, **kw)
+
+    async def search(self, text: str, kinds=None, limit: int | None = None, **kw) -> list:
+        return await self.call(services.search, text, kinds, limit, **kw)
+
+    async def set_status(self, sid: int, status: str, **kw):
+        return await self.call(services.set_status, sid, status, **kw)
+
+    async def transition(self, ids, status: str, from_status: str | None = None, **kw):
+        return await self.call(services.transition, ids, status, from_status, **kw)
+
+    async def shipment_history(self, sid: int, **kw) -> list:
+        return await self.call(services.shipment_history, sid, **kw)
+
+    async def status_at(self, sid: int, when, **kw):
+        return await self.call(services.status_at, sid, when, **kw)
+
+    async def summary(self, month: str | None = None, **kw) -> dict:
+        return await self.call(services.summary, month, **kw)
+
+    async def breakdown(self, by: str, month: str | None = None, top: int | None = None, **kw) -> list:
+        return await self.call(services.breakdown, by, month, top, **kw)
+
+    async def transit_times(self, by: str, month: str | None = None, sla_hours: float | None = None,
+                            **kw) -> list:
+        return await self.call(services.transit_times, by, month, sla_hours, **kw)
+
+    async def stats_all(self, **kw) -> dict:
+        data = await self.call(services.stats, **kw)
+        data["async"] = self.info()
+        return data
+
+
+# =========================
+# SHARED INSTANCE
+# =========================
+_api = None
+_api_lock = threading.Lock()
+
+
+def get_api() -> AsyncServices:
+    global _api
+    with _api_lock:
+        if _api is None:
+            _api = AsyncServices()
+        return _api
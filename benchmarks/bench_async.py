@@ -0,0 +1,107 @@
+# bench_async.py
+# ✅ Operations/sec of the async API (async_api.py) with many concurrent clients vs one-at-a-time
+#
+#   TRANSPORT_BACKEND=sqlite TRANSPORT_DB_PATH=transport.db python benchmarks/bench_async.py
+#   python benchmarks/bench_async.py --clients 64 --ops 5000 --workers 8
+#
+# Uses the database the environment points to (it needs some customers + shipments).
+# Each operation is a read the dispatch screens do all the time: one page of a list,
+# look up one shipment, check an ID. The query cache is turned off so every
+# operation really reaches the database.
+#
+# A local SQLite query takes microseconds, so there the thread hand-off costs more than it
+# saves. --latency MS adds a blocking wait to every operation, like the network round trip
+# of an Access file on a share, which is the case the worker pool is for.
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TRANSPORT_CACHE_SIZE", "0")
+
+import services  # noqa: E402
+from async_api import AsyncServices  # noqa: E402
+from db import fetch_all  # noqa: E402
+from db_pool import get_pool  # noqa: E402
+
+
+def with_latency(fn, seconds: float):
+    def slow(*args):
+        time.sleep(seconds)         # blocks like a pyodbc call waiting on the network
+        return fn(*args)
+    slow.__name__ = fn.__name__
+    return slow
+
+
+def make_ops(n: int, latency: float = 0.0, seed: int = 1) -> list[tuple]:
+    customers = [r[0] for r in fetch_all("SELECT id FROM tbl_customers", cache=False)]
+    ship_ids = [r[0] for r in fetch_all("SELECT id FROM tbl_shipments", cache=False)]
+    if not customers or not ship_ids:
+        raise SystemExit("❌ The database needs customers and shipments (see import_export.py)")
+    rnd = random.Random(seed)
+    ops = []
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            ops.append((services.list_page, ("customers", (rnd.choice(customers),), 20)))
+        elif kind == 1:
+            ops.append((services.search_shipments, ("id", rnd.choice(ship_ids))))
+        else:
+            ops.append((services.exists, ("shipments", rnd.choice(ship_ids))))
+    if latency:
+        ops = [(with_latency(fn, latency), args) for fn, args in ops]
+    return ops
+
+
+def run_sequential(ops) -> float:
+    t0 = time.perf_counter()
+    for fn, args in ops:
+        fn(*args)
+    return time.perf_counter() - t0
+
+
+async def run_async(ops, clients: int, workers: int | None) -> tuple[float, dict]:
+    api = AsyncServices(workers=workers, max_pending=clients)
+    queue = list(reversed(ops))
+
+    async def client():
+        while queue:
+            fn, args = queue.pop()
+            await api.call(fn, *args)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    sec = time.perf_counter() - t0
+    info = api.info()
+    await api.close()
+    return sec, info
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the async service API")
+    parser.add_argument("--ops", type=int, default=3000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--workers", type=int, help="worker threads (default: connection pool size)")
+    parser.add_argument("--latency", type=float, default=0.0, help="extra ms of blocking wait per operation")
+    args = parser.parse_args(argv)
+
+    services.startup()
+    ops = make_ops(args.ops, args.latency / 1000)
+    print(f"{args.ops} operations, pool size {get_pool().size}, latency {args.latency} ms")
+    print(f"{'case':<22} {'seconds':>9} {'ops/sec':>10}")
+    base = run_sequential(ops)
+    print(f"{'sequential':<22} {base:>9.3f} {args.ops / base:>10,.0f}")
+    for clients in args.clients:
+        sec, info = asyncio.run(run_async(ops, clients, args.workers))
+        name = f"async {clients} clients"
+        print(f"{name:<22} {sec:>9.3f} {args.ops / sec:>10,.0f}   x{base / sec:.2f}"
+              f"   (workers {info['workers']}, max in flight {info['max_in_flight']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# bench_http.py
+# ✅ Load test for http_api.py: requests/sec + p50 / p99 latency at 1..256 concurrent clients
+#
+#   python benchmarks/bench_http.py --db transport.db
+#   python benchmarks/bench_http.py --db transport.db --clients 1 16 256 --seconds 5
+#   python benchmarks/bench_http.py --url http://127.0.0.1:8080     (server already running)
+#
+# Without --url the server is started in a separate process on the SQLite file given by
+# --db (the clients then do not share a GIL with it). Every client keeps one keep-alive
+# connection and loops over a mix of requests: one shipment by id, a search by id,
+# the summary report and the first 50 rows of the streamed JOIN list.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# =========================
+# SERVER
+# =========================
+def start_server(db_path: str):
+    env = dict(os.environ, TRANSPORT_BACKEND="sqlite", TRANSPORT_DB_PATH=db_path)
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "http_api.py"), "--port", "0"],
+                            env=env, stderr=subprocess.PIPE, text=True)
+    line = proc.stderr.readline()       # "✅ Listening on http://127.0.0.1:PORT"
+    if "Listening on" not in line:
+        proc.kill()
+        raise SystemExit(f"❌ Server did not start: {line}{proc.stderr.read()}")
+    return proc, line.split()[-1]
+
+
+# =========================
+# CLIENT (one keep-alive connection)
+# =========================
+async def read_response(reader) -> tuple[int, bytes]:
+    status = int((await reader.readline()).split()[1])
+    length, chunked = 0, False
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b""):
+            break
+        key, _, value = h.decode("latin-1").partition(":")
+        key = key.strip().lower()
+        if key == "content-length":
+            length = int(value)
+        elif key == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if not chunked:
+        return status, await reader.readexactly(length)
+    parts = []
+    while True:
+        size = int((await reader.readline()).strip(), 16)
+        data = await reader.readexactly(size + 2)
+        if size == 0:
+            return status, b"".join(parts)
+        parts.append(data[:-2])
+
+
+def make_paths(ship_ids: list[int], n: int, seed: int) -> list[str]:
+    rnd = random.Random(seed)
+    paths = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            paths.append(f"/shipments/{rnd.choice(ship_ids)}")
+        elif kind == 1:
+            paths.append(f"/shipments/search?by=id&value={rnd.choice(ship_ids)}")
+        elif kind == 2:
+            paths.append("/reports/summary")
+        else:
+            paths.append("/shipments?limit=50")
+    return paths
+
+
+async def client(host: str, port: int, paths: list[str], stop_at: float, latencies: list, errors: list):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < stop_at:
+            path = paths[i % len(paths)]
+            i += 1
+            t0 = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_level(host: str, port: int, clients: int, seconds: float, ship_ids: list[int]):
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + seconds
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, make_paths(ship_ids, 200, seed=c), stop_at, latencies, errors)
+        for c in range(clients)
+    ))
+    return time.perf_counter() - t0, latencies, errors
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+async def fetch_ids(host: str, port: int) -> list[int]:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /shipments?view=simple&limit=2000 HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    _, body = await read_response(reader)
+    writer.close()
+    return [r["id"] for r in json.loads(body)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the HTTP API")
+    parser.add_argument("--db", default="transport.db", help="SQLite file for the started server")
+    parser.add_argument("--url", help="use a server that is already running")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64, 256])
+    parser.add_argument("--seconds", type=float, default=3.0, help="run time per level")
+    args = parser.parse_args(argv)
+
+    proc = None
+    url = args.url
+    if not url:
+        if not os.path.exists(args.db):
+            raise SystemExit(f"❌ {args.db} not found (load data with import_export.py first)")
+        proc, url = start_server(args.db)
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+
+    try:
+        ship_ids = asyncio.run(fetch_ids(host, port))
+        if not ship_ids:
+            raise SystemExit("❌ No shipments in the database")
+        print(f"server {url}, {args.seconds:.0f}s per level")
+        print(f"{'clients':>7} {'requests':>9} {'req/sec':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for clients in args.clients:
+            sec, lat, errors = asyncio.run(run_level(host, port, clients, args.seconds, ship_ids))
+            lat.sort()
+            print(f"{clients:>7} {len(lat):>9} {len(lat) / sec:>9,.0f} {percentile(lat, 0.50) * 1000:>8.2f}"
+                  f" {percentile(lat, 0.99) * 1000:>8.2f} {len(errors):>7}")
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# bench_load_plan.py
+# ✅ Speed + packing quality of load_planner.pack() for 10k .. 1M Pending shipments
+#
+#   python benchmarks/bench_load_plan.py
+#   python benchmarks/bench_load_plan.py --sizes 10000 100000 1000000 --vehicles 500
+#
+# In memory only (no database): random shipment weights and vehicle capacities from a fixed
+# seed, so every run packs the same data. Vehicle capacity is scaled to ~90% of the total
+# weight, so some shipments are left over and both strategies have to choose.
+# "naive ffd" scans every vehicle for every shipment (what a plain loop does) - it only runs
+# up to --naive-max shipments because it gets slow.
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_planner import STRATEGIES, pack  # noqa: E402
+
+
+def make_data(n: int, vehicles: int, seed: int = 1):
+    rnd = random.Random(seed)
+    weights = [round(rnd.lognormvariate(3.5, 1.0), 1) for _ in range(n)]     # mostly 10-100 kg
+    kinds = [1000.0, 3500.0, 7500.0, 18000.0]                              # van .. truck
+    caps = [rnd.choice(kinds) for _ in range(vehicles)]
+    scale = 0.9 * sum(weights) / sum(caps)
+    return list(range(1, n + 1)), weights, list(range(1, vehicles + 1)), [c * scale for c in caps]
+
+
+def naive_first_fit(weights, caps) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    room = sorted(caps, reverse=True)
+    placed = 0
+    for w in sorted(weights, reverse=True):
+        for v, r in enumerate(room):
+            if r >= w:
+                room[v] = r - w
+                placed += 1
+                break
+    return time.perf_counter() - t0, placed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the load planner")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--vehicles", type=int, default=200)
+    parser.add_argument("--naive-max", type=int, default=100_000, help="largest size for the naive loop")
+    args = parser.parse_args(argv)
+
+    print(f"{args.vehicles} vehicles, capacity = 90% of the total weight")
+    print(f"{'shipments':>10} {'strategy':<10} {'seconds':>8} {'ships/sec':>11} {'assigned':>9} {'fill':>7}")
+    for n in args.sizes:
+        ids, weights, vids, caps = make_data(n, args.vehicles)
+        for strategy in STRATEGIES:
+            st = pack(ids, weights, vids, caps, strategy=strategy).stats()
+            print(f"{n:>10,} {strategy:<10} {st['seconds']:>8.3f} {st['shipments_per_sec']:>11,.0f}"
+                  f" {st['assigned']:>9,} {st['fill']:>7.2%}")
+        if n <= args.naive_max:
+            sec, placed = naive_first_fit(weights, caps)
+            print(f"{n:>10,} {'naive ffd':<10} {sec:>8.3f} {n / sec:>11,.0f} {placed:>9,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# bench_render.py
+# ✅ Rows/sec of the table renderer vs the old print_table (fullcode detail.py) and show (short1.py)
+#
+#   python benchmarks/bench_render.py                 (50 000 shipment rows)
+#   python benchmarks/bench_render.py --rows 200000 --repeat 5 --target file
+#
+# --target tty  : line-buffered stream, like printing to a terminal (default)
+# --target file : normal block-buffered file
+# --target null : /dev/null with a big buffer (pure formatting cost)
+#
+# The old functions are copied here exactly as they were, so the comparison stays fair
+# after the menus switched to render.py.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from render import render_table  # noqa: E402
+
+HEADERS = ["ID", "Customer_ID", "Driver_ID", "Vehicle_ID", "From", "To", "Kg", "$", "Status", "Created_At"]
+STATUSES = ("Pending", "In Transit", "Delivered", "Cancelled")
+
+
+# =========================
+# OLD IMPLEMENTATIONS (baseline)
+# =========================
+def old_print_table(title: str, headers: list[str], rows: list[tuple]):
+    print("\n" + "=" * 100)
+    print(title)
+    print("=" * 100)
+    if not rows:
+        print("⚠️ No data")
+        print("=" * 100)
+        return
+
+    # simple text header
+    print(" | ".join(headers))
+    print("-" * 100)
+
+    for r in rows:
+        print(" | ".join(str(x) for x in r))
+
+    print("=" * 100)
+
+
+def old_show(title, rows):
+    print("\n" + "="*60)
+    print(title)
+    print("="*60)
+    if not rows:
+        print("No data")
+        return
+    for r in rows:
+        print(r)
+
+
+# =========================
+# BENCH
+# =========================
+def make_rows(n: int) -> list[tuple]:
+    start = datetime(2024, 1, 1)
+    return [
+        (i, i % 5000, i % 300, i % 120, f"City {i % 97}", f"City {(i * 7) % 97}",
+         round(10 + (i % 900) * 1.5, 1), round(25 + (i % 400) * 3.25, 2),
+         STATUSES[i % 4], start + timedelta(minutes=i))
+        for i in range(n)
+    ]
+
+
+def open_target(target: str):
+    if target == "tty":
+        return open(os.devnull, "w", encoding="utf-8", buffering=1)
+    if target == "file":
+        return tempfile.TemporaryFile("w", encoding="utf-8")
+    return open(os.devnull, "w", encoding="utf-8", buffering=1 << 20)
+
+
+def timed(fn, repeat: int, target: str) -> float:
+    """Best wall time of `repeat` runs with stdout sent to the target stream."""
+    best = float("inf")
+    saved = sys.stdout
+    for _ in range(repeat):
+        with open_target(target) as stream:
+            sys.stdout = stream
+            try:
+                t0 = time.perf_counter()
+                fn()
+                stream.flush()
+                best = min(best, time.perf_counter() - t0)
+            finally:
+                sys.stdout = saved
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark table rendering")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--target", choices=["tty", "file", "null"], default="tty")
+    args = parser.parse_args(argv)
+
+    rows = make_rows(args.rows)
+    cases = [
+        ("old print_table", lambda: old_print_table("SHIPMENTS", HEADERS, rows)),
+        ("old show", lambda: old_show("SHIPMENTS", rows)),
+        ("render text", lambda: render_table("SHIPMENTS", HEADERS, rows, out=sys.stdout)),
+        ("render tsv", lambda: render_table("SHIPMENTS", HEADERS, rows, out=sys.stdout, fmt="tsv")),
+        ("render json", lambda: render_table("SHIPMENTS", HEADERS, rows, out=sys.stdout, fmt="json")),
+    ]
+
+    print(f"{args.rows} rows, best of {args.repeat}, target={args.target}")
+    print(f"{'case':<16} {'seconds':>9} {'rows/sec':>12}")
+    base = None
+    for name, fn in cases:
+        sec = timed(fn, args.repeat, args.target)
+        base = base or sec
+        print(f"{name:<16} {sec:>9.3f} {args.rows / sec:>12,.0f}   x{base / sec:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# bench_snapshot.py
+# ✅ Ad-hoc analysis over N shipments: per-row Python over Row tuples vs the columnar snapshot
+#
+#   python benchmarks/bench_snapshot.py
+#   python benchmarks/bench_snapshot.py --rows 3000000
+#   python benchmarks/bench_snapshot.py --db transport.db      (real tables, rows fetched every time)
+#
+# Without --db the rows are generated from a fixed seed, the same tuples fetch_all() would
+# return, already in memory (the best case for the row loop). With --db every "rows" question
+# first runs fetch_all(), like the reports do today.
+# "rows" = the usual loop over tuples, "array" = snapshot.py without NumPy,
+# "numpy" = snapshot.py with NumPy (skipped when it is not installed).
+# Loading (encoding the columns) is timed separately; it is paid once per snapshot.
+
+import argparse
+import os
+import random
+import sys
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snapshot  # noqa: E402
+
+EDGES = [10.0, 50.0, 100.0, 500.0]
+
+
+def make_rows(n: int, seed: int = 1):
+    rnd = random.Random(seed)
+    cities = [f"City{i}" for i in range(40)]
+    statuses = ["Pending", "In Transit", "Delivered", "Cancelled"]
+    start = datetime(2024, 1, 1)
+    customers = [(i, f"Customer {i}") for i in range(1, 2001)]
+    drivers = [(i, f"Driver {i}") for i in range(1, 201)]
+    vehicles = [(i, f"P-{i}", rnd.choice(["Van", "Truck", "Bike"])) for i in range(1, 151)]
+    rows = [
+        (i, rnd.randint(1, 2000), rnd.randint(1, 200), rnd.randint(1, 150),
+         rnd.choice(cities), rnd.choice(cities), round(rnd.uniform(1, 800), 1), round(rnd.uniform(5, 900), 2),
+         rnd.choices(statuses, (1, 1, 6, 1))[0], start + timedelta(minutes=rnd.randint(0, 500_000)))
+        for i in range(1, n + 1)
+    ]
+    return rows, customers, drivers, vehicles
+
+
+# ---------- the same questions, one row at a time ----------
+def rows_income_by_route(rows):
+    out = {}
+    for r in rows:
+        if r[8] != "Cancelled":
+            key = (r[4], r[5])
+            out[key] = out.get(key, 0.0) + r[7]
+    return out
+
+
+def rows_top_customers(rows, k=10):
+    out = {}
+    for r in rows:
+        if r[8] != "Cancelled":
+            out[r[1]] = out.get(r[1], 0.0) + r[7]
+    return sorted(out.items(), key=lambda kv: -kv[1])[:k]
+
+
+def rows_weight_hist(rows, vtype):
+    out = {}
+    for r in rows:
+        bins = out.setdefault(vtype[r[3]], [0] * (len(EDGES) + 1))
+        bins[bisect_right(EDGES, r[6])] += 1
+    return out
+
+
+def rows_delivered_in_month_by_driver(rows, since, until):
+    out = {}
+    for r in rows:
+        if r[8] == "Delivered" and since <= r[9] < until:
+            out[r[2]] = out.get(r[2], 0.0) + r[7]
+    return out
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the columnar snapshot")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", help="SQLite file to read instead of generated rows")
+    args = parser.parse_args(argv)
+
+    since, until = datetime(2024, 5, 1), datetime(2024, 6, 1)
+    if args.db:
+        os.environ.update(TRANSPORT_BACKEND="sqlite", TRANSPORT_DB_PATH=args.db, TRANSPORT_CACHE_SIZE="0")
+        from db import fetch_all
+        vehicles = fetch_all("SELECT id, plate, vehicles_type FROM tbl_vehicles")
+        snaps = {"array": snapshot.load(use_numpy=False)}
+        if snapshot.np is not None:
+            snaps["numpy"] = snapshot.load(use_numpy=True)
+
+        def get_rows():
+            return fetch_all(snapshot.SNAPSHOT_SELECT, cache=False)
+    else:
+        rows, customers, drivers, vehicles = make_rows(args.rows)
+        snaps = {"array": snapshot.Snapshot.from_rows(rows, customers, drivers, vehicles, use_numpy=False)}
+        if snapshot.np is not None:
+            snaps["numpy"] = snapshot.Snapshot.from_rows(rows, customers, drivers, vehicles, use_numpy=True)
+
+        def get_rows():
+            return rows
+    vtype = {vid: vt for vid, _, vt in vehicles}
+    s = snaps["array"]
+    print(f"{s.n:,} shipments; snapshot load {s.seconds:.2f}s, {s.nbytes() / 1024 / 1024:.0f} MB of columns")
+
+    cases = {
+        "income by route": (
+            lambda: rows_income_by_route(get_rows()),
+            lambda snap: snap.group_by("route")),
+        "top 10 customers": (
+            lambda: rows_top_customers(get_rows()),
+            lambda snap: snap.top_k("customer", "income", 10)),
+        "kg histogram / vehicle type": (
+            lambda: rows_weight_hist(get_rows(), vtype),
+            lambda snap: snap.histogram("weight_kg", EDGES, by="vehicle_type")),
+        "delivered in May by driver": (
+            lambda: rows_delivered_in_month_by_driver(get_rows(), since, until),
+            lambda snap: snap.group_by("driver", snap.where(since, until, status="Delivered"))),
+    }
+    names = list(snaps)
+    print(f"{'question':<30} {'rows s':>8}" + "".join(f" {n + ' s':>9} {'x':>6}" for n in names))
+    for title, (by_rows, by_snap) in cases.items():
+        base = timed(by_rows)
+        line = f"{title:<30} {base:>8.3f}"
+        for n in names:
+            sec = timed(lambda: by_snap(snaps[n]))
+            line += f" {sec:>9.3f} {base / sec:>6.1f}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
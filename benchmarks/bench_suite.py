@@ -0,0 +1,316 @@
+# bench_suite.py
+# ✅ Times every operation of the menus in fullcode detail.py (adds, edits, lists, JOIN view, searches,
+#    status changes, reports, deletes) on generated SQLite databases of 10^3 .. 10^7 shipments
+# ✅ Results as JSON (with Python / SQLite / machine / git commit), compare two runs to catch regressions
+#
+#   python benchmarks/bench_suite.py run --out base.json
+#   python benchmarks/bench_suite.py run --sizes 1000 100000 10000000 --repeat 9 --out new.json
+#   python benchmarks/bench_suite.py run --ops search_customer report_summary_month
+#   python benchmarks/bench_suite.py compare base.json new.json --threshold 0.25
+#
+# The databases come from datagen.py (fixed seed) and are kept in --data-dir, so only the first run
+# of a size pays for generating it (10^7 shipments: ~10 minutes, ~2 GB). Every run works on a fresh
+# copy, so writes of one run never change the data of the next one.
+# Each operation runs --repeat times on different rows (IDs picked from a fixed seed). The query cache
+# is off, so every read reaches the database.
+# compare exits with 1 when an operation got slower by more than --threshold (and more than --min-ms)
+# in its median AND its fastest run - one slow sample on a busy machine is not a regression.
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("TRANSPORT_CACHE_SIZE", "0")
+
+import datagen  # noqa: E402
+import services  # noqa: E402
+from db_backend import make_backend, set_backend  # noqa: E402
+from db_pool import get_pool  # noqa: E402
+
+FORMAT = 1      # version of the JSON layout
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "transport-bench")
+PAGE_SIZE = 50
+CLOSE_OUT_BATCH = 100
+MONTH = "2025-06"       # a full month inside the generated data (datagen.END - DAYS .. END)
+
+
+class Context:
+    """Rows the operations work on: sample IDs from the data + rows the add_* operations created."""
+
+    def __init__(self, size: int, repeat: int, seed: int):
+        self.rnd = random.Random(seed)
+        dims = datagen.dimensions(size)
+        self.shipment_ids = [self.rnd.randint(1, size) for _ in range(repeat)]
+        self.customer_ids = [self.rnd.randint(1, dims["customers"]) for _ in range(repeat)]
+        self.driver_ids = [self.rnd.randint(1, dims["drivers"]) for _ in range(repeat)]
+        self.vehicle_ids = [self.rnd.randint(1, dims["vehicles"]) for _ in range(repeat)]
+        pending = sorted(r[0] for r in services.search_shipments("status", "Pending"))
+        batch = min(CLOSE_OUT_BATCH, len(pending) // repeat)
+        picked = self.rnd.sample(pending, batch * repeat)
+        self.pending_batches = [picked[i * batch:(i + 1) * batch] for i in range(repeat)] if batch else []
+        self.city_prefixes = [self.rnd.choice(datagen.CITIES)[:3] for _ in range(repeat)]     # typeahead
+        self.new = {"customers": [], "drivers": [], "vehicles": [], "shipments": []}
+
+
+def _ok(result):
+    ok, value = result
+    if not ok:
+        raise RuntimeError(value)
+    return value
+
+
+def _add(ctx: Context, entity: str, raw: dict):
+    ctx.new[entity].append(_ok(services.add(entity, raw)))
+
+
+# =========================
+# OPERATIONS (name, menu action in fullcode detail.py, fn(ctx, i)) - run in this order
+# =========================
+OPS = [
+    ("add_customer", "add_customer",
+     lambda c, i: _add(c, "customers", {"name": f"Bench {i}", "phone": "555-0100", "address": "1 Test Rd"})),
+    ("add_driver", "add_driver",
+     lambda c, i: _add(c, "drivers", {"name": f"Bench {i}", "phone": "555-0100", "license": f"B-{i}"})),
+    ("add_vehicle", "add_vehicle",
+     lambda c, i: _add(c, "vehicles", {"plate": f"BENCH-{i}", "vehicles_type": "Truck", "capacity_kg": 24000})),
+    ("view_customers", "view_customers",
+     lambda c, i: services.list_page("customers", (c.customer_ids[i],), PAGE_SIZE)),
+    ("edit_customer", "edit_customer",
+     lambda c, i: _ok(services.update("customers", c.customer_ids[i], {"phone": f"555-{i:04d}"}))),
+    ("edit_driver", "edit_driver",
+     lambda c, i: _ok(services.update("drivers", c.driver_ids[i], {"phone": f"555-{i:04d}"}))),
+    ("add_shipment", "add_shipment",
+     lambda c, i: _add(c, "shipments", {
+         "customer_id": c.new["customers"][i], "driver_id": c.new["drivers"][i],
+         "vehicle_id": c.new["vehicles"][i], "origin": "Lisbon", "destination": "Porto",
+         "weight_kg": 120.0, "price_usd": 90.0, "status": "Pending"})),
+    ("view_shipments", "view_shipments_simple", lambda c, i: services.list_page("shipments", None, PAGE_SIZE)),
+    ("view_shipments_join", "view_shipments_join", lambda c, i: services.shipment_join_page(None, PAGE_SIZE)),
+    ("search_id", "search_shipments", lambda c, i: services.search_shipments("id", c.shipment_ids[i])),
+    ("search_customer", "search_shipments", lambda c, i: services.search_shipments("customer", c.customer_ids[i])),
+    ("search_driver", "search_shipments", lambda c, i: services.search_shipments("driver", c.driver_ids[i])),
+    ("search_vehicle", "search_shipments", lambda c, i: services.search_shipments("vehicle", c.vehicle_ids[i])),
+    ("search_status", "search_shipments", lambda c, i: services.search_shipments("status", "In Transit")),
+    ("find_customer", "find_customers", lambda c, i: services.search(f"cust {c.customer_ids[i]}", ["customer"])),
+    ("find_route", "search_route", lambda c, i: services.search(c.city_prefixes[i], ["route"])),
+    ("update_status", "update_shipment_status",
+     lambda c, i: _ok(services.set_status(c.new["shipments"][i], "In Transit"))),
+    ("close_out", "close_out_shipments",
+     lambda c, i: c.pending_batches and _ok(services.transition(c.pending_batches[i], "In Transit", "Pending"))),
+    ("shipment_history", "shipment_history", lambda c, i: services.shipment_history(c.shipment_ids[i])),
+    ("report_summary", "report_summary", lambda c, i: services.summary()),
+    ("report_summary_month", "report_summary", lambda c, i: services.summary(MONTH)),
+    ("report_breakdown", "report_breakdown", lambda c, i: services.breakdown("route", MONTH, 20)),
+    ("report_transit", "report_transit", lambda c, i: services.transit_times("route", MONTH)),
+    ("plan_loads", "plan_vehicle_loads", lambda c, i: services.plan_loads()),
+    ("delete_shipment", "delete_shipment", lambda c, i: _ok(services.delete("shipments", c.new["shipments"][i]))),
+    ("delete_customer", "delete_customer", lambda c, i: _ok(services.delete("customers", c.new["customers"][i]))),
+    ("delete_driver", "delete_driver", lambda c, i: _ok(services.delete("drivers", c.new["drivers"][i]))),
+    ("delete_vehicle", "delete_vehicle", lambda c, i: _ok(services.delete("vehicles", c.new["vehicles"][i]))),
+]
+OP_NAMES = [name for name, _, _ in OPS]
+# rows an operation needs from an earlier one (kept even when --ops leaves the earlier one out)
+NEEDS = {
+    "add_shipment": ("add_customer", "add_driver", "add_vehicle"),
+    "update_status": ("add_shipment",),
+    "delete_shipment": ("add_shipment",),
+    "delete_customer": ("add_customer",),
+    "delete_driver": ("add_driver",),
+    "delete_vehicle": ("add_vehicle",),
+}
+
+
+def _median(values: list[float]) -> float:
+    s = sorted(values)
+    mid = len(s) // 2
+    return s[mid] if len(s) % 2 else (s[mid - 1] + s[mid]) / 2
+
+
+def _with_needs(names: list[str]) -> set:
+    out = set(names)
+    for name in names:
+        out.update(_with_needs(list(NEEDS.get(name, ()))))
+    return out
+
+
+# =========================
+# RUN
+# =========================
+def data_file(data_dir: str, size: int, seed: int) -> str:
+    """Generated database for one size (made on first use, reused afterwards)."""
+    path = os.path.join(data_dir, f"transport-{size}-s{seed}-v{datagen.VERSION}.db")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"💡 Generating {size:,} shipments -> {path}", file=sys.stderr)
+        tmp = path + ".tmp"
+        info = datagen.generate(tmp, size, seed=seed)
+        set_backend(make_backend("sqlite", ":memory:"))      # close the generator's connections
+        os.replace(tmp, path)
+        print(f"   {info['seconds']:.1f}s", file=sys.stderr)
+    return path
+
+
+def run_size(size: int, data_dir: str, repeat: int, seed: int, names: list[str]) -> list[dict]:
+    work = os.path.join(data_dir, f"work-{size}-{os.getpid()}.db")
+    shutil.copyfile(data_file(data_dir, size, seed), work)
+    set_backend(make_backend("sqlite", work))
+    try:
+        t0 = time.perf_counter()
+        services.startup()
+        ms = round(1000 * (time.perf_counter() - t0), 4)
+        results = [{"size": size, "op": "startup", "action": "main_menu", "samples_ms": [ms],
+                    "median_ms": ms, "min_ms": ms}]
+        ctx = Context(size, repeat, seed)
+        run = _with_needs(names)
+        for name, action, fn in OPS:
+            if name not in run:
+                continue
+            samples = []
+            for i in range(repeat):
+                t = time.perf_counter()
+                fn(ctx, i)
+                samples.append(1000 * (time.perf_counter() - t))
+            if name in names:
+                results.append({"size": size, "op": name, "action": action,
+                                "samples_ms": [round(s, 4) for s in samples],
+                                "median_ms": round(_median(samples), 4), "min_ms": round(min(samples), 4)})
+        return results
+    finally:
+        get_pool().close()
+        set_backend(make_backend("sqlite", ":memory:"))
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(work + suffix):
+                os.remove(work + suffix)
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def cmd_run(args) -> int:
+    unknown = set(args.ops or ()) - set(OP_NAMES)
+    if unknown:
+        print(f"❌ Unknown operation: {', '.join(sorted(unknown))} (choose: {', '.join(OP_NAMES)})")
+        return 2
+    names = args.ops or OP_NAMES
+    report = {"format": FORMAT, "created": datetime.now().isoformat(timespec="seconds"),
+              "seed": args.seed, "repeat": args.repeat, "datagen": datagen.VERSION,
+              "environment": environment(), "results": []}
+    print(f"{'shipments':>10} {'operation':<22} {'median ms':>10} {'min ms':>9} {'max ms':>9}")
+    for size in args.sizes:
+        for r in run_size(size, args.data_dir, args.repeat, args.seed, names):
+            report["results"].append(r)
+            print(f"{size:>10,} {r['op']:<22} {r['median_ms']:>10.3f} {r['min_ms']:>9.3f}"
+                  f" {max(r['samples_ms']):>9.3f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"✅ Results saved to {args.out}")
+    return 0
+
+
+# =========================
+# COMPARE
+# =========================
+def compare(base: dict, new: dict, threshold: float, min_ms: float) -> tuple[list[tuple], list[tuple]]:
+    """
+    Rows (size, op, base ms, new ms, change, flag) for operations in both runs (medians) + the regressions.
+    A change only counts when the fastest runs moved the same way.
+    """
+    old = {(r["size"], r["op"]): r for r in base["results"]}
+    rows, slower = [], []
+    for r in new["results"]:
+        key = (r["size"], r["op"])
+        if key not in old:
+            continue
+        a, b = old[key]["median_ms"], r["median_ms"]
+        a_min, b_min = old[key]["min_ms"], r["min_ms"]
+        change = (b - a) / a if a else 0.0
+        change_min = (b_min - a_min) / a_min if a_min else 0.0
+        flag = ""
+        if min(change, change_min) > threshold and min(b - a, b_min - a_min) > min_ms:
+            flag = "❌ slower"
+        elif max(change, change_min) < -threshold and min(a - b, a_min - b_min) > min_ms:
+            flag = "✅ faster"
+        row = (key[0], key[1], a, b, change, flag)
+        rows.append(row)
+        if flag.startswith("❌"):
+            slower.append(row)
+    return rows, slower
+
+
+def cmd_compare(args) -> int:
+    runs = []
+    for path in (args.base, args.new):
+        with open(path, encoding="utf-8") as f:
+            runs.append(json.load(f))
+    base, new = runs
+    for key in ("python", "sqlite", "platform", "cpus"):
+        a, b = base["environment"].get(key), new["environment"].get(key)
+        if a != b:
+            print(f"⚠️ {key} differs: {a} -> {b} (timings may not be comparable)")
+    if (base.get("seed"), base.get("datagen")) != (new.get("seed"), new.get("datagen")):
+        print("⚠️ The runs used different generated data (seed / datagen version)")
+
+    rows, slower = compare(base, new, args.threshold, args.min_ms)
+    print(f"{'shipments':>10} {'operation':<22} {'base ms':>10} {'new ms':>10} {'change':>8}")
+    for size, op, a, b, change, flag in rows:
+        print(f"{size:>10,} {op:<22} {a:>10.3f} {b:>10.3f} {change:>+8.1%} {flag}")
+    if not rows:
+        print("⚠️ No operation appears in both runs")
+    if slower:
+        print(f"❌ {len(slower)} regression(s) over {args.threshold:.0%}")
+        return 1
+    print(f"✅ No regression over {args.threshold:.0%}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every menu operation on generated data")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("run", help="run the suite")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="shipments per database")
+    p.add_argument("--repeat", type=int, default=15, help="runs of each operation (different rows)")
+    p.add_argument("--ops", nargs="+", metavar="OP", help=f"only these ({', '.join(OP_NAMES)})")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated databases are kept")
+    p.add_argument("--out", help="write the results to this JSON file")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("compare", help="compare two result files (exit code 1 on a regression)")
+    p.add_argument("base")
+    p.add_argument("new")
+    p.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    p.add_argument("--min-ms", type=float, default=0.25, help="ignore changes smaller than this")
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
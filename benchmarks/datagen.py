@@ -0,0 +1,215 @@
+# datagen.py
+# ✅ Deterministic synthetic transport data: N customers / drivers / vehicles + M shipments in SQLite
+# ✅ Realistic skew: a few routes and big customers carry most shipments, old shipments are
+#    Delivered / Cancelled, recent ones still Pending / In Transit
+# ✅ Status history (tbl_shipment_events) + summary counters + indexes + search index, like a live database
+#
+#   python benchmarks/datagen.py bench.db --shipments 100000
+#   python benchmarks/datagen.py bench.db --shipments 10000000 --customers 200000 --seed 7
+#
+# The same --seed and sizes always give the same rows (no clock, no unseeded random), so two
+# benchmark runs on different days or machines measure the same database.
+# Customers / drivers / vehicles default to a fixed ratio of the shipment count (see dimensions()).
+# Rows are written in chunks of CHUNK with executemany(); the indexes are created afterwards.
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import search_index  # noqa: E402
+import summary_store  # noqa: E402
+from db_backend import make_backend, set_backend  # noqa: E402
+from indexes import ensure_indexes  # noqa: E402
+
+VERSION = 2             # bump when the generated data changes (bench_suite.py caches files by it)
+CHUNK = 50_000          # shipments per executemany()
+
+END = datetime(2026, 1, 1)          # "now" of the generated data
+DAYS = 730                          # shipments are spread over the two years before END
+CITIES = (
+    "Lisbon", "Porto", "Madrid", "Barcelona", "Valencia", "Seville", "Bilbao", "Lyon", "Paris", "Marseille",
+    "Toulouse", "Bordeaux", "Lille", "Brussels", "Antwerp", "Rotterdam", "Amsterdam", "Cologne", "Frankfurt",
+    "Hamburg", "Berlin", "Munich", "Stuttgart", "Zurich", "Milan", "Turin", "Genoa", "Rome", "Naples",
+    "Vienna", "Prague", "Warsaw", "Krakow", "Budapest", "Ljubljana", "Zagreb", "Copenhagen", "Gothenburg",
+    "Stockholm", "Oslo",
+)
+VEHICLE_TYPES = (("Van", 1_500.0), ("Truck", 7_500.0), ("Trailer", 24_000.0))
+ROUTE_SKEW = 1.0        # Zipf exponents: share of the k-th busiest route / customer ~ 1 / k^s
+CUSTOMER_SKEW = 1.0
+
+# age of the shipment -> status weights (Pending, In Transit, Delivered, Cancelled)
+STATUS_MIX = (
+    (timedelta(days=3), (50, 35, 10, 5)),
+    (timedelta(days=30), (10, 20, 62, 8)),
+    (None, (0.5, 0.5, 90, 9)),      # a few old shipments are never closed out
+)
+STATUSES = ("Pending", "In Transit", "Delivered", "Cancelled")
+
+
+def dimensions(shipments: int) -> dict:
+    """Default customers / drivers / vehicles for a shipment count."""
+    return {
+        "customers": max(20, shipments // 20),
+        "drivers": max(5, shipments // 500),
+        "vehicles": max(5, shipments // 400),
+    }
+
+
+def _zipf_cum(n: int, s: float) -> list[float]:
+    return list(accumulate(1.0 / (k + 1) ** s for k in range(n)))
+
+
+def _dimension_rows(rnd: random.Random, customers: int, drivers: int, vehicles: int):
+    cust = [(i, f"Customer {i}", f"555-{rnd.randrange(10**7):07d}", f"{rnd.randint(1, 999)} {rnd.choice(CITIES)} Rd")
+            for i in range(1, customers + 1)]
+    drv = [(i, f"Driver {i}", f"555-{rnd.randrange(10**7):07d}", f"L-{rnd.randrange(10**8):08d}")
+           for i in range(1, drivers + 1)]
+    veh = []
+    for i in range(1, vehicles + 1):
+        kind, cap = rnd.choices(VEHICLE_TYPES, (5, 4, 1))[0]
+        veh.append((i, f"{kind[0]}-{i:06d}", kind, cap))
+    return cust, drv, veh
+
+
+def _routes(rnd: random.Random):
+    """Every (origin, destination) pair in random popularity order + base hours + price per kg."""
+    pairs = [(a, b) for a in CITIES for b in CITIES if a != b]
+    rnd.shuffle(pairs)
+    return [(a, b, rnd.uniform(4, 60), rnd.uniform(0.3, 2.5)) for a, b in pairs]
+
+
+def _status(rnd: random.Random, age: timedelta) -> str:
+    for limit, weights in STATUS_MIX:
+        if limit is None or age < limit:
+            return rnd.choices(STATUSES, weights)[0]
+    return STATUSES[2]
+
+
+def _events(rnd: random.Random, sid: int, status: str, created: datetime, hours: float) -> list[tuple]:
+    """Status history that ends in `status`, every change before END."""
+    room = (END - created).total_seconds() / 3600
+    events = [(sid, None, "Pending", created)]
+    if status == "Pending":
+        return events
+    pickup = created + timedelta(hours=min(rnd.uniform(1, 24), room * 0.3))
+    if status == "Cancelled" and rnd.random() < 0.7:
+        return events + [(sid, "Pending", "Cancelled", pickup)]
+    events.append((sid, "Pending", "In Transit", pickup))
+    left = (END - pickup).total_seconds() / 3600
+    done = pickup + timedelta(hours=min(hours * rnd.lognormvariate(0, 0.35), left * 0.9))
+    if status == "Delivered":
+        events.append((sid, "In Transit", "Delivered", done))
+    elif status == "Cancelled":
+        events.append((sid, "In Transit", "Cancelled", done))
+    return events
+
+
+def shipment_chunks(shipments: int, customers: int, drivers: int, vehicles: int, seed: int = 1):
+    """Yields (shipment_rows, event_rows) lists of up to CHUNK shipments, oldest first (IDs follow time)."""
+    rnd = random.Random(seed * 1_000_003 + 1)
+    routes = _routes(rnd)
+    route_cum = _zipf_cum(len(routes), ROUTE_SKEW)
+    cust_ids = list(range(1, customers + 1))
+    rnd.shuffle(cust_ids)                       # the biggest customers are not simply the first IDs
+    cust_cum = _zipf_cum(customers, CUSTOMER_SKEW)
+    start = END - timedelta(days=DAYS)
+    step = DAYS * 86400 / shipments
+
+    for first in range(1, shipments + 1, CHUNK):
+        n = min(CHUNK, shipments - first + 1)
+        picked_routes = rnd.choices(routes, cum_weights=route_cum, k=n)
+        picked_customers = rnd.choices(cust_ids, cum_weights=cust_cum, k=n)
+        rows, events = [], []
+        for k in range(n):
+            sid = first + k
+            origin, dest, hours, per_kg = picked_routes[k]
+            created = start + timedelta(seconds=int((sid - 1) * step + rnd.uniform(0, step)))
+            created = min(created, END - timedelta(minutes=1))
+            weight = round(min(rnd.lognormvariate(3.5, 1.0), 5_000.0), 1)
+            price = round(15 + weight * per_kg, 2)
+            status = _status(rnd, END - created)
+            rows.append((sid, picked_customers[k], rnd.randint(1, drivers), rnd.randint(1, vehicles),
+                         origin, dest, weight, price, status, created))
+            events.extend(_events(rnd, sid, status, created, hours))
+        yield rows, events
+
+
+def generate(path: str, shipments: int, customers: int | None = None, drivers: int | None = None,
+             vehicles: int | None = None, seed: int = 1, quiet: bool = False) -> dict:
+    """
+    Write a new SQLite database at `path` (an existing file is replaced).
+    Leaves the generated database as the active backend. Returns sizes + seconds.
+    """
+    sizes = dimensions(shipments)
+    sizes.update({k: v for k, v in (("customers", customers), ("drivers", drivers), ("vehicles", vehicles)) if v})
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    t0 = time.perf_counter()
+    backend = set_backend(make_backend("sqlite", path))
+    backend.create_schema()
+    conn = backend.connect()
+    conn.execute("PRAGMA foreign_keys = OFF")       # rows are generated consistent, skip the checks
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = OFF")
+    cur = conn.cursor()
+    cust, drv, veh = _dimension_rows(random.Random(seed), sizes["customers"], sizes["drivers"], sizes["vehicles"])
+    cur.executemany("INSERT INTO tbl_customers (id, [name], phone, address) VALUES (?, ?, ?, ?)", cust)
+    cur.executemany("INSERT INTO tbl_drivers (id, [name], phone, license) VALUES (?, ?, ?, ?)", drv)
+    cur.executemany("INSERT INTO tbl_vehicles (id, plate, vehicles_type, capacity_kg) VALUES (?, ?, ?, ?)", veh)
+    conn.commit()
+
+    events = 0
+    for rows, evs in shipment_chunks(shipments, sizes["customers"], sizes["drivers"], sizes["vehicles"], seed):
+        cur.executemany(
+            "INSERT INTO tbl_shipments (id, customer_id, driver_id, vehicle_id, origin, destination,"
+            " weight_kg, price_usd, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        cur.executemany(
+            "INSERT INTO tbl_shipment_events (shipment_id, old_status, new_status, changed_at) VALUES (?, ?, ?, ?)",
+            evs,
+        )
+        conn.commit()
+        events += len(evs)
+        if not quiet:
+            print(f"\r  {rows[-1][0]:,} / {shipments:,} shipments", end="", file=sys.stderr, flush=True)
+    if not quiet and shipments:
+        print(file=sys.stderr)
+    conn.close()
+
+    ensure_indexes()
+    summary_store.rebuild()
+    search_index.rebuild()
+    with backend.connect() as conn:
+        conn.execute("ANALYZE")
+    return {**sizes, "shipments": shipments, "events": events, "seed": seed,
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic transport database (SQLite)")
+    parser.add_argument("path")
+    parser.add_argument("--shipments", type=int, default=100_000)
+    parser.add_argument("--customers", type=int)
+    parser.add_argument("--drivers", type=int)
+    parser.add_argument("--vehicles", type=int)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    info = generate(args.path, args.shipments, args.customers, args.drivers, args.vehicles, args.seed)
+    print(f"✅ {args.path}: {info['shipments']:,} shipments, {info['events']:,} events, "
+          f"{info['customers']:,} customers, {info['drivers']:,} drivers, {info['vehicles']:,} vehicles "
+          f"in {info['seconds']:.1f}s (seed {info['seed']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
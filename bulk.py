@@ -0,0 +1,163 @@
+# bulk.py
+# ✅ Batched writes: many rows per transaction instead of one connection + commit per row
+# ✅ executemany (with pyodbc fast_executemany where the driver supports it)
+#
+# A batch that fails is retried row by row inside its own transaction, so good rows are kept
+# and every bad row is reported with its position and error message.
+#
+# Batch size: argument, or TRANSPORT_BATCH_SIZE (default 1000).
+
+import os
+import time
+from itertools import islice
+
+import entities
+import id_index
+import query_cache
+import search_index
+import shipments
+from db import get_conn
+from db_backend import get_backend
+
+DEFAULT_BATCH_SIZE = int(os.environ.get("TRANSPORT_BATCH_SIZE", "1000"))
+
+
+class BulkResult:
+    """What happened during a bulk write."""
+
+    def __init__(self):
+        self.written = 0
+        self.batches = 0
+        self.errors = []        # [(row_number, row, error_message)], row_number starts at 0
+        self.seconds = 0.0
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.written / self.seconds if self.seconds else 0.0
+
+    def merge(self, other: "BulkResult"):
+        self.written += other.written
+        self.batches += other.batches
+        self.errors.extend(other.errors)
+        self.seconds += other.seconds
+
+    def __repr__(self):
+        return (f"BulkResult(written={self.written}, failed={self.failed}, "
+                f"batches={self.batches}, rows/sec={self.rows_per_sec:.0f})")
+
+
+def _batches(rows, size: int):
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _cursor(conn):
+    cur = conn.cursor()
+    if get_backend().supports_fast_executemany:
+        cur.fast_executemany = True
+    return cur
+
+
+def _write_batch(sql: str, params: list, start: int, result: BulkResult, on_written=None, on_committed=None):
+    """
+    One transaction for the whole batch; on failure, redo it row by row.
+    on_written(cur, indexes) runs in the same transaction for the rows that made it in,
+    on_committed(indexes) after the commit (in-memory state that must not see rolled back rows).
+    """
+    try:
+        with get_conn() as conn:
+            cur = _cursor(conn)
+            cur.executemany(sql, params)
+            if on_written:
+                on_written(cur, list(range(len(params))))
+    except Exception:
+        pass    # fall through to the row-by-row retry
+    else:
+        result.written += len(params)
+        if on_committed:
+            on_committed(list(range(len(params))))
+        return
+
+    with get_conn() as conn:
+        cur = conn.cursor()
+        ok = []
+        for i, p in enumerate(params):
+            try:
+                cur.execute(sql, p)
+                ok.append(i)
+            except Exception as e:
+                result.errors.append((start + i, p, str(e)))
+        if on_written and ok:
+            on_written(cur, ok)
+    result.written += len(ok)
+    if on_committed and ok:
+        on_committed(ok)
+
+
+def bulk_execute(sql: str, param_rows, batch_size: int | None = None, on_written=None,
+                 on_committed=None) -> BulkResult:
+    """
+    Run one statement for many parameter tuples, batch_size rows per transaction.
+    param_rows can be any iterable (a generator keeps memory flat).
+    """
+    size = batch_size or DEFAULT_BATCH_SIZE
+    result = BulkResult()
+    t0 = time.perf_counter()
+    start = 0
+    for chunk in _batches(param_rows, size):
+        hook = (lambda cur, idx, chunk=chunk: on_written(cur, [chunk[i] for i in idx])) if on_written else None
+        done = (lambda idx, chunk=chunk: on_committed([chunk[i] for i in idx])) if on_committed else None
+        _write_batch(sql, chunk, start, result, hook, done)
+        result.batches += 1
+        start += len(chunk)
+    result.seconds = time.perf_counter() - t0
+    if result.written:
+        query_cache.invalidate_sql(sql)
+        if on_written:
+            query_cache.invalidate("tbl_summary", "tbl_shipment_events")
+    return result
+
+
+def _as_params(entity: str, row) -> tuple:
+    """Accept a dict (by column name) or a tuple/list in column order."""
+    if isinstance(row, dict):
+        return tuple(row[c] for c in entities.columns(entity))
+    return tuple(row)
+
+
+def bulk_insert(entity: str, rows, batch_size: int | None = None) -> BulkResult:
+    """
+    Insert many customers / drivers / vehicles / shipments.
+    Shipments also update the summary counters, once per batch;
+    customer / driver / vehicle IDs are added to the shared ID index once committed (customers /
+    drivers also to the search index, same transaction).
+    """
+    sql = entities.insert_sql(entity)
+    params = (_as_params(entity, r) for r in rows)
+
+    on_written = on_committed = None
+    if entity == "shipments":
+        cols = entities.columns("shipments")
+
+        def on_written(cur, written_params):
+            shipments.run_hooks(cur, [(None, dict(zip(cols, p))) for p in written_params])
+    else:
+        table = entities.get_entity(entity)["table"]
+
+        cols = entities.columns(entity)
+
+        def on_written(cur, written_params):
+            search_index.index_rows(cur, entity, [dict(zip(cols, p)) for p in written_params])
+
+        def on_committed(written_params):
+            id_index.added(table, *(p[0] for p in written_params))
+
+    return bulk_execute(sql, params, batch_size, on_written, on_committed)
@@ -0,0 +1,388 @@
+# cli.py
+# ✅ Non-interactive command line for scripts / cron / automation (no menus, no TTY needed)
+# ✅ Every command is a thin wrapper over services.py
+#
+#   python cli.py customers add name=Ann phone=555 "address=Main St"     (id=... optional)
+#   python cli.py customers update 7 phone=556
+#   python cli.py customers delete 7
+#   python cli.py customers list --format tsv
+#   python cli.py customers import customers.csv
+#   python cli.py shipments create customer_id=7 driver_id=1 vehicle_id=1 origin=A destination=B \
+#                                  weight_kg=10 price_usd=25 status=Pending
+#   python cli.py shipments search customer 7
+#   python cli.py shipments route Lisbon Porto
+#   python cli.py find ann sm [--kind customer] [--limit 10]     customers / drivers / routes by word starts
+#   python cli.py shipments status 1 Delivered
+#   python cli.py shipments transition Delivered 120-180 195 --from "In Transit"   (end of shift)
+#   python cli.py report summary [--month 2024-05]
+#   python cli.py shipments history 12 [--at "2024-05-03 14:00"]
+#   python cli.py report breakdown customer [--month 2024-05] [--top 10]
+#   python cli.py report transit route [--month 2024-05] [--sla 48]    (Pending -> Delivered hours)
+#   python cli.py plan [--strategy bfd] [--apply]     pack Pending shipments onto vehicles by capacity
+#   python cli.py stats [--statements] [--latency]
+#   python cli.py batch ops.jsonl      (many operations in one process, see run_batch)
+#   python cli.py --profile cpu,memory report summary     cProfile / tracemalloc report on stderr
+#
+# Tables go to stdout (--format text|tsv|json, default TRANSPORT_OUTPUT), messages to stderr.
+# Exit code: 0 = ok, 1 = the operation failed, 2 = bad command line.
+
+import argparse
+import json
+import sys
+
+import entities
+import metrics
+import services
+from render import render_table
+
+ENTITY_NAMES = list(entities.ENTITIES)
+
+
+def parse_fields(pairs: list[str]) -> dict:
+    """["name=Ann", "phone=555"] -> {"name": "Ann", "phone": "555"}"""
+    fields = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            raise ValueError(f"expected field=value, got '{pair}'")
+        fields[key.strip()] = value
+    return fields
+
+
+def _done(ok: bool, err, msg: str) -> int:
+    if ok:
+        print("✅", msg, file=sys.stderr)
+        return 0
+    print("❌", err, file=sys.stderr)
+    return 1
+
+
+def _all_rows(pages, limit: int | None):
+    count = 0
+    for page in pages:
+        for row in page:
+            if limit is not None and count >= limit:
+                return
+            yield row
+            count += 1
+
+
+# =========================
+# BATCH MODE
+# =========================
+# one JSON object per line in, one JSON result per line out:
+#   {"op": "add", "entity": "customers", "row": {"id": 7, "name": "Ann", ...}}
+#   {"op": "update", "entity": "vehicles", "id": 3, "changes": {"capacity_kg": 9000}}
+#   {"op": "delete", "entity": "drivers", "id": 4}
+#   {"op": "status", "id": 12, "status": "Delivered"}
+#   {"op": "transition", "ids": [12, 13, 14], "status": "Delivered", "from": "In Transit"}
+#   {"op": "search", "by": "customer", "value": 7}
+#   {"op": "find", "text": "ann sm", "kinds": ["customer"], "limit": 10}
+#   {"op": "summary"}  /  {"op": "breakdown", "by": "route", "month": "2024-05", "top": 5}
+#   {"op": "transit", "by": "driver", "month": "2024-05", "sla": 48}
+BATCH_OPS = {
+    "add": lambda a: services.add(a["entity"], a["row"]),
+    "update": lambda a: services.update(a["entity"], a["id"], a["changes"]),
+    "delete": lambda a: services.delete(a["entity"], a["id"]),
+    "status": lambda a: services.set_status(a["id"], a["status"]),
+    "transition": lambda a: services.transition(a["ids"], a["status"], a.get("from")),
+    "search": lambda a: (True, services.search_shipments(a["by"], a["value"])),
+    "find": lambda a: (True, services.search(a["text"], a.get("kinds"), a.get("limit"))),
+    "summary": lambda a: (True, services.summary(a.get("month"))),
+    "breakdown": lambda a: (True, services.breakdown(a["by"], a.get("month"), a.get("top"))),
+    "transit": lambda a: (True, services.transit_times(a["by"], a.get("month"), a.get("sla"))),
+    "stats": lambda a: (True, services.stats()),
+}
+OBJECT_FIELDS = ("row", "changes")      # fields that must be JSON objects
+
+
+def _failed(error: str) -> dict:
+    return {"ok": False, "error": error, "result": None}
+
+
+def run_op(op: dict) -> dict:
+    """
+    Run one batch operation. Returns {"ok": bool, "error": str|None, "result": data|None}.
+    Never raises: any error of the operation becomes its failed result.
+    """
+    if not isinstance(op, dict):
+        return _failed("an operation must be a JSON object")
+    name = op.get("op")
+    if name not in BATCH_OPS:
+        return _failed(f"unknown op '{name}' (choose: {', '.join(BATCH_OPS)})")
+    for field in OBJECT_FIELDS:
+        if field in op and not isinstance(op[field], dict):
+            return _failed(f"{field}: must be a JSON object")
+    try:
+        ok, value = BATCH_OPS[name](op)
+    except KeyError as e:
+        return _failed(f"missing field {e}")
+    except ValueError as e:
+        return _failed(str(e))
+    except Exception as e:
+        return _failed(f"{type(e).__name__}: {e}")
+    if ok:
+        return {"ok": True, "error": None, "result": value}
+    return _failed(value)
+
+
+def run_batch(f, out) -> tuple[int, int]:
+    """Run every operation in a JSONL stream, writing one result line each. Returns (ok, failed)."""
+    good = bad = 0
+    for line_no, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            res = run_op(json.loads(line))
+        except json.JSONDecodeError as e:
+            res = _failed(f"bad JSON: {e}")
+        res["line"] = line_no
+        out.write(json.dumps(res, default=str, ensure_ascii=False) + "\n")
+        if res["ok"]:
+            good += 1
+        else:
+            bad += 1
+    out.flush()
+    return good, bad
+
+
+# =========================
+# COMMANDS
+# =========================
+def cmd_entity(args) -> int:
+    entity, label = args.entity, services.LABELS[args.entity]
+    if args.action in ("add", "create"):
+        ok, new_id = services.add(entity, parse_fields(args.fields))
+        if ok:
+            print(new_id)
+        return _done(ok, new_id, f"{label} {'created' if entity == 'shipments' else 'added'} (ID {new_id})")
+    if args.action == "update":
+        ok, err = services.update(entity, args.id, parse_fields(args.fields))
+        return _done(ok, err, f"{label} updated")
+    if args.action == "delete":
+        ok, err = services.delete(entity, args.id)
+        return _done(ok, err, f"{label} deleted")
+    if args.action == "list":
+        pages = services.list_pages(entity)
+        render_table(entity.upper(), services.HEADERS[entity], _all_rows(pages, args.limit), fmt=args.format)
+        return 0
+    if args.action == "import":
+        rep = services.import_rows(entity, args.path, args.file_format, args.batch_size)
+        res = rep.result
+        print(f"✅ Read {rep.read} rows: {res.written} inserted, {rep.invalid} invalid, "
+              f"{res.failed} rejected by the database", file=sys.stderr)
+        for msg in rep.errors:
+            print("❌", msg, file=sys.stderr)
+        return 0 if not rep.invalid and not res.failed else 1
+    if args.action == "export":
+        n = services.export_rows(entity, args.path, args.file_format)
+        print(f"✅ Exported {n} rows", file=sys.stderr)
+        return 0
+    if args.action == "search":
+        rows = services.search_shipments(args.by, args.value)
+        render_table("SHIPMENTS SEARCH RESULTS", services.HEADERS["shipments"], rows, fmt=args.format)
+        return 0
+    if args.action == "route":
+        rows = services.route_shipments(args.origin, args.destination)
+        render_table(f"SHIPMENTS {args.origin} → {args.destination}", services.HEADERS["shipments"], rows,
+                     fmt=args.format)
+        return 0
+    if args.action == "status":
+        ok, err = services.set_status(args.id, args.status)
+        return _done(ok, err, "Status updated")
+    if args.action == "transition":
+        ok, res = services.transition(services.parse_ids(" ".join(args.ids)), args.status, args.from_status)
+        if not ok:
+            return _done(ok, res, "")
+        rows = sorted(res["skipped"].items())
+        if rows:
+            render_table("NOT MOVED", ["ID", "Reason"], rows, fmt=args.format)
+        print(f"✅ {len(res['moved'])} moved to {args.status}, {len(rows)} skipped", file=sys.stderr)
+        return 1 if rows else 0
+    if args.action == "history":
+        if args.at:
+            status = services.status_at(args.id, args.at)
+            print(status or "(did not exist)")
+            return 0 if status else 1
+        render_table(f"SHIPMENT {args.id} HISTORY", services.HISTORY_HEADERS,
+                     services.shipment_history(args.id), fmt=args.format)
+        return 0
+    if args.action == "join":
+        rows = _all_rows(services.shipment_join_pages(), args.limit)
+        render_table("SHIPMENTS (JOIN VIEW)", services.JOIN_HEADERS, rows, fmt=args.format)
+        return 0
+    raise ValueError(f"unknown action '{args.action}'")
+
+
+def cmd_report(args) -> int:
+    if args.report == "summary":
+        st = services.summary(args.month)
+        row = (st["total"], st["Pending"], st["In Transit"], st["Delivered"], st["Cancelled"],
+               f"{st['weight_kg']:.1f}", f"{st['income']:.2f}")
+        title = "REPORT SUMMARY" + (f" ({args.month})" if args.month else "")
+        render_table(title, services.BREAKDOWN_HEADERS, [row], fmt=args.format)
+        return 0
+    if args.report == "transit":
+        rows = services.transit_rows(services.transit_times(args.by, args.month, args.sla))
+        title = f"PENDING → DELIVERED BY {args.by.upper()}" + (f" ({args.month})" if args.month else "")
+        render_table(title, [args.by.capitalize()] + services.TRANSIT_HEADERS, rows, fmt=args.format)
+        return 0
+    rows = services.breakdown_rows(services.breakdown(args.by, args.month, args.top))
+    title = f"BREAKDOWN BY {args.by.upper()}" + (f" ({args.month})" if args.month else "")
+    render_table(title, [args.by.capitalize()] + services.BREAKDOWN_HEADERS, rows, fmt=args.format)
+    return 0
+
+
+def cmd_find(args) -> int:
+    items = services.search(" ".join(args.text), args.kind, args.limit)
+    render_table("SEARCH RESULTS", services.SEARCH_HEADERS, services.search_rows(items), fmt=args.format)
+    return 0 if items else 1
+
+
+def cmd_plan(args) -> int:
+    res = services.plan_loads(args.strategy, args.apply)
+    render_table("LOAD PLAN", services.LOAD_HEADERS, res["vehicles"], fmt=args.format)
+    print(f"✅ {res['assigned']} of {res['shipments']} Pending shipments planned on {res['vehicles_used']}"
+          f" vehicles ({res['fill']:.1%} full); {res['unassigned']} do not fit", file=sys.stderr)
+    if args.apply:
+        print(f"✅ {res['moved']} shipment(s) moved to another vehicle, {res['failed']} failed", file=sys.stderr)
+        return 1 if res["failed"] else 0
+    return 0
+
+
+def cmd_stats(args) -> int:
+    st = services.stats()
+    rows = [(part, key, value) for part, values in st.items() for key, value in values.items()
+            if not isinstance(value, dict)]
+    render_table("STATS", ["Part", "Name", "Value"], rows, fmt=args.format)
+    if args.statements:
+        render_table("SQL STATEMENTS", services.STATEMENT_HEADERS, services.statement_stats(), fmt=args.format)
+    if args.latency:
+        render_table("LATENCY", metrics.LATENCY_HEADERS, metrics.latency_rows(), fmt=args.format)
+    return 0
+
+
+def cmd_batch(args) -> int:
+    if args.path == "-":
+        good, bad = run_batch(sys.stdin, sys.stdout)
+    else:
+        with open(args.path, encoding="utf-8") as f:
+            good, bad = run_batch(f, sys.stdout)
+    print(f"✅ {good} ok, {bad} failed", file=sys.stderr)
+    return 1 if bad else 0
+
+
+# =========================
+# ARGUMENTS
+# =========================
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=["text", "tsv", "json"], help="table output format")
+
+    parser = argparse.ArgumentParser(description="Transport system command line (no menus)")
+    parser.add_argument("--profile", help="cpu, memory or cpu,memory: profile the command (see metrics.py)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    for entity in ENTITY_NAMES:
+        p = sub.add_parser(entity, help=f"{entity}: add / update / delete / list / import / export")
+        p.set_defaults(func=cmd_entity, entity=entity)
+        acts = p.add_subparsers(dest="action", required=True)
+
+        names = ["add", "create"] if entity == "shipments" else ["add"]
+        for name in names:
+            a = acts.add_parser(name, parents=[common], help="insert one row (field=value ...)")
+            a.add_argument("fields", nargs="+", metavar="field=value")
+        a = acts.add_parser("update", parents=[common], help="change some fields of one row")
+        a.add_argument("id", type=int)
+        a.add_argument("fields", nargs="+", metavar="field=value")
+        a = acts.add_parser("delete", parents=[common], help="delete one row")
+        a.add_argument("id", type=int)
+        a = acts.add_parser("list", parents=[common], help="print the table")
+        a.add_argument("--limit", type=int)
+        for name in ("import", "export"):
+            a = acts.add_parser(name, parents=[common],
+                                help=f"{name} a CSV / JSONL file ('-' = stdin / stdout)")
+            a.add_argument("path")
+            a.add_argument("--file-format", choices=["csv", "jsonl"])
+            a.add_argument("--batch-size", type=int)
+
+        if entity == "shipments":
+            a = acts.add_parser("search", parents=[common], help="find shipments by one field")
+            a.add_argument("by", choices=list(services.SEARCH_BY))
+            a.add_argument("value")
+            a = acts.add_parser("route", parents=[common], help="shipments from origin to destination")
+            a.add_argument("origin")
+            a.add_argument("destination")
+            a = acts.add_parser("status", parents=[common], help="change the status of a shipment")
+            a.add_argument("id", type=int)
+            a.add_argument("status")
+            a = acts.add_parser("transition", parents=[common],
+                                help="move many shipments to one status (IDs and ranges like 20-25)")
+            a.add_argument("status")
+            a.add_argument("ids", nargs="+")
+            a.add_argument("--from", dest="from_status", help="only shipments in this status now")
+            a = acts.add_parser("history", parents=[common], help="status changes of one shipment")
+            a.add_argument("id", type=int)
+            a.add_argument("--at", help='only the status at "YYYY-MM-DD HH:MM"')
+            a = acts.add_parser("join", parents=[common], help="list with customer / driver names")
+            a.add_argument("--limit", type=int)
+
+    p = sub.add_parser("report", help="summary / breakdown / transit reports")
+    p.set_defaults(func=cmd_report)
+    reps = p.add_subparsers(dest="report", required=True)
+    a = reps.add_parser("summary", parents=[common])
+    a.add_argument("--month", help="YYYY-MM (default: all time)")
+    a = reps.add_parser("breakdown", parents=[common])
+    a.add_argument("by", choices=["customer", "driver", "vehicle", "route"])
+    a.add_argument("--month", help="YYYY-MM (default: all time)")
+    a.add_argument("--top", type=int)
+    a = reps.add_parser("transit", parents=[common], help="average Pending -> Delivered hours")
+    a.add_argument("by", choices=services.TRANSIT_BY)
+    a.add_argument("--month", help="YYYY-MM of delivery (default: all time)")
+    a.add_argument("--sla", type=float, help="hours; count shipments slower than this as late")
+
+    p = sub.add_parser("find", parents=[common], help="customers / drivers / routes by the start of their words")
+    p.add_argument("text", nargs="+")
+    p.add_argument("--kind", choices=services.SEARCH_KINDS, action="append", help="only this kind (repeatable)")
+    p.add_argument("--limit", type=int, help="rows per kind (default 20)")
+    p.set_defaults(func=cmd_find)
+
+    p = sub.add_parser("plan", parents=[common], help="pack Pending shipments onto vehicles by capacity")
+    p.add_argument("--strategy", choices=["ffd", "bfd"], default="ffd",
+                   help="first fit / best fit decreasing (default ffd)")
+    p.add_argument("--apply", action="store_true", help="move the shipments to their planned vehicle")
+    p.set_defaults(func=cmd_plan)
+
+    p = sub.add_parser("stats", parents=[common], help="connection pool / cache / ID index counters")
+    p.add_argument("--statements", action="store_true", help="also the per-statement timings of this run")
+    p.add_argument("--latency", action="store_true", help="also latency p50 / p95 / p99 of this run")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("batch", parents=[common], help="run JSONL operations from a file ('-' = stdin)")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_batch)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "path", None) == "-" and getattr(args, "action", None) in ("import", "export") \
+            and not args.file_format:
+        parser.error("--file-format is required when using stdin/stdout")
+    try:
+        services.startup()
+    except Exception as e:
+        print("❌ Connection failed:", e, file=sys.stderr)
+        return 1
+    try:
+        label = " ".join(filter(None, (args.cmd, getattr(args, "action", None), getattr(args, "report", None))))
+        with metrics.profile(label, args.profile.split(",") if args.profile else None):
+            return args.func(args)
+    except ValueError as e:
+        print("❌", e, file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
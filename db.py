@@ -0,0 +1,149 @@
+# db.py
+# ✅ Generic DB helpers shared by the menus and every other module
+# ✅ All of them borrow a connection from the shared pool (db_pool.get_pool)
+# ✅ fetch_all() answers repeated SELECTs from query_cache; writes invalidate it
+# ✅ query() / execute() run named statements from the catalog (statements.py), timed per name
+# ✅ execute / fetch time and rows of every call go to metrics.py ("adhoc" = not from the catalog)
+
+import time
+from contextlib import contextmanager
+
+import metrics
+import query_cache
+import statements
+from db_backend import get_backend
+from db_pool import get_pool
+
+_cache_backend = None   # backend the cached results came from
+
+
+@contextmanager
+def get_conn():
+    """Borrow a pooled connection: commit on success, rollback on error."""
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def record_exists(table: str, rid: int) -> bool:
+    """Check if ID exists in a specific table (only tables in statements.TABLES)."""
+    return bool(query(statements.table_statement("exists", table), (rid,), cache=False))
+
+
+def safe_execute(sql: str, params: tuple = ()):
+    """
+    Execute a SQL command safely.
+    Returns (True, None) if ok, otherwise (False, error_message).
+    """
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            t0 = time.perf_counter()
+            cur.execute(sql, params)
+            metrics.db_call("adhoc", time.perf_counter() - t0, None, max(cur.rowcount, 0))
+        query_cache.invalidate_sql(sql)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def _cache():
+    """The shared query cache, emptied if the backend was switched since it was filled."""
+    global _cache_backend
+    cache = query_cache.get_cache()
+    backend = get_backend()
+    if _cache_backend is not backend:
+        cache.invalidate()
+        _cache_backend = backend
+    return cache
+
+
+def fetch_all(sql: str, params: tuple = (), cache: bool = True):
+    """SELECT -> list of rows. cache=False always asks the database."""
+    qc = _cache() if cache else None
+    generation = None
+    if qc is not None and qc.enabled:
+        rows = qc.get(sql, params)
+        if rows is not None:
+            return rows
+        generation = qc.generation(sql)
+    with get_conn() as conn:
+        cur = conn.cursor()
+        rows = _timed_fetch(cur, sql, params, "adhoc")
+    if qc is not None:
+        qc.put(sql, params, rows, generation)
+    return rows
+
+
+def _timed_fetch(cur, sql: str, params: tuple, label: str) -> list:
+    t0 = time.perf_counter()
+    cur.execute(sql, params)
+    t1 = time.perf_counter()
+    rows = cur.fetchall()
+    t2 = time.perf_counter()
+    metrics.db_call(label, t1 - t0, t2 - t1, len(rows))
+    return rows
+
+
+def query(name: str, params: tuple = (), cache: bool = True) -> list:
+    """Run a named SELECT from statements.py -> list of rows. Same caching as fetch_all()."""
+    st = statements.get(name)
+    qc = _cache() if cache else None
+    generation = None
+    if qc is not None and qc.enabled:
+        rows = qc.get(st.sql, params)
+        if rows is not None:
+            st.hit()
+            return rows
+        generation = qc.generation(st.sql)
+    pool = get_pool()
+    with pool.connection() as conn:
+        t0 = time.perf_counter()
+        rows = _timed_fetch(pool.cursor(conn), st.sql, params, name)
+        st.record(time.perf_counter() - t0, len(rows))
+    if qc is not None:
+        qc.put(st.sql, params, rows, generation)
+    return rows
+
+
+def execute(name: str, params: tuple = ()):
+    """Run a named write from statements.py. Returns (True, None) or (False, error_message)."""
+    st = statements.get(name)
+    pool = get_pool()
+    try:
+        with pool.connection() as conn:
+            t0 = time.perf_counter()
+            cur = pool.cursor(conn)
+            cur.execute(st.sql, params)
+            seconds, changed = time.perf_counter() - t0, max(cur.rowcount, 0)
+            st.record(seconds, changed)
+            metrics.db_call(name, seconds, None, changed)
+        query_cache.invalidate_sql(st.sql)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def fetch_iter(sql: str, params: tuple = (), chunk: int = 1000):
+    """
+    Generator version of fetch_all: rows come in fetchmany(chunk) pieces,
+    so memory stays flat however big the result is.
+    The pooled connection is held until the generator is finished or closed.
+    """
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk)
+            if not rows:
+                return
+            yield from rows
+
+
+def pool_stats() -> dict:
+    """Pool usage + hit/miss + wait-time counters."""
+    return get_pool().info()
+
+
+def cache_stats() -> dict:
+    """Query cache entries, memory and hit rate."""
+    return query_cache.get_cache().stats()
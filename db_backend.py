@@ -0,0 +1,423 @@
+# db_backend.py
+# ✅ Storage backends for the Transport Company Information System
+# ✅ Same 4 tables on every engine: tbl_customers, tbl_drivers, tbl_vehicles, tbl_shipments
+#
+#   AccessBackend : MS Access through pyodbc (Windows, the original setup)
+#   SQLiteBackend : Python's built-in sqlite3 (Linux servers, load tests, in-memory DB)
+#
+# Choose the backend with environment variables:
+#   TRANSPORT_BACKEND = access | sqlite        (default: access)
+#   TRANSPORT_DB_PATH = path to .accdb / .db   (":memory:" works for sqlite)
+#
+# Both engines understand the SQL the menus already use ("?" params, [name] brackets,
+# Access-style parenthesised JOINs), so the rest of the code does not change per engine.
+
+import os
+import sqlite3
+import uuid
+from datetime import datetime
+
+
+# =========================
+# CONFIG
+# =========================
+DEFAULT_ACCESS_PATH = r"C:\Users\ROG\OneDrive\Documents\Database18.accdb"
+DEFAULT_SQLITE_PATH = "transport.db"
+
+TABLES = ("tbl_customers", "tbl_drivers", "tbl_vehicles", "tbl_shipments")
+STATUSES = ("Pending", "In Transit", "Delivered", "Cancelled")
+
+
+# =========================
+# SCHEMA (one entry per table, in FK order; helper tables after the main 4)
+# =========================
+SQLITE_SCHEMA = {
+    "tbl_customers": """
+        CREATE TABLE tbl_customers (
+            id      INTEGER PRIMARY KEY,
+            [name]  TEXT NOT NULL,
+            phone   TEXT NOT NULL,
+            address TEXT NOT NULL
+        )
+    """,
+    "tbl_drivers": """
+        CREATE TABLE tbl_drivers (
+            id      INTEGER PRIMARY KEY,
+            [name]  TEXT NOT NULL,
+            phone   TEXT NOT NULL,
+            license TEXT NOT NULL
+        )
+    """,
+    "tbl_vehicles": """
+        CREATE TABLE tbl_vehicles (
+            id            INTEGER PRIMARY KEY,
+            plate         TEXT NOT NULL,
+            vehicles_type TEXT NOT NULL,
+            capacity_kg   REAL NOT NULL
+        )
+    """,
+    "tbl_shipments": """
+        CREATE TABLE tbl_shipments (
+            id          INTEGER PRIMARY KEY,
+            customer_id INTEGER NOT NULL REFERENCES tbl_customers(id),
+            driver_id   INTEGER NOT NULL REFERENCES tbl_drivers(id),
+            vehicle_id  INTEGER NOT NULL REFERENCES tbl_vehicles(id),
+            origin      TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            weight_kg   REAL NOT NULL,
+            price_usd   REAL NOT NULL,
+            status      TEXT NOT NULL,
+            created_at  DATETIME NOT NULL
+        )
+    """,
+    # materialized counters, see summary_store.py
+    "tbl_summary": """
+        CREATE TABLE tbl_summary (
+            scope     TEXT NOT NULL,
+            scope_key TEXT NOT NULL,
+            status    TEXT NOT NULL,
+            shipments INTEGER NOT NULL,
+            price_usd REAL NOT NULL,
+            weight_kg REAL NOT NULL,
+            PRIMARY KEY (scope, scope_key, status)
+        )
+    """,
+    # next free ID per table, see id_alloc.py
+    "tbl_id_blocks": """
+        CREATE TABLE tbl_id_blocks (
+            table_name TEXT PRIMARY KEY,
+            next_id    INTEGER NOT NULL
+        )
+    """,
+    # append-only status history, see shipment_events.py (no FK: events outlive deleted shipments)
+    "tbl_shipment_events": """
+        CREATE TABLE tbl_shipment_events (
+            id          INTEGER PRIMARY KEY,
+            shipment_id INTEGER NOT NULL,
+            old_status  TEXT,
+            new_status  TEXT,
+            changed_at  DATETIME NOT NULL
+        )
+    """,
+    # replication feed: one row per written shipment, see replica.py (AUTOINCREMENT: seq never reused)
+    "tbl_change_log": """
+        CREATE TABLE tbl_change_log (
+            seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id     INTEGER NOT NULL,
+            op         TEXT NOT NULL,
+            changed_at DATETIME NOT NULL
+        )
+    """,
+    # prefix search, see search_index.py: one doc per customer / driver / route, one term per word
+    "tbl_search_docs": """
+        CREATE TABLE tbl_search_docs (
+            kind  TEXT NOT NULL,
+            ref   TEXT NOT NULL,
+            label TEXT NOT NULL,
+            uses  INTEGER NOT NULL,
+            PRIMARY KEY (kind, ref)
+        )
+    """,
+    "tbl_search_terms": """
+        CREATE TABLE tbl_search_terms (
+            kind TEXT NOT NULL,
+            term TEXT NOT NULL,
+            ref  TEXT NOT NULL,
+            PRIMARY KEY (kind, term, ref)
+        )
+    """,
+}
+
+ACCESS_SCHEMA = {
+    "tbl_customers": """
+        CREATE TABLE tbl_customers (
+            id LONG CONSTRAINT pk_customers PRIMARY KEY,
+            [name] TEXT(255), phone TEXT(50), address TEXT(255)
+        )
+    """,
+    "tbl_drivers": """
+        CREATE TABLE tbl_drivers (
+            id LONG CONSTRAINT pk_drivers PRIMARY KEY,
+            [name] TEXT(255), phone TEXT(50), license TEXT(50)
+        )
+    """,
+    "tbl_vehicles": """
+        CREATE TABLE tbl_vehicles (
+            id LONG CONSTRAINT pk_vehicles PRIMARY KEY,
+            plate TEXT(20), vehicles_type TEXT(50), capacity_kg DOUBLE
+        )
+    """,
+    "tbl_shipments": """
+        CREATE TABLE tbl_shipments (
+            id LONG CONSTRAINT pk_shipments PRIMARY KEY,
+            customer_id LONG CONSTRAINT fk_ship_customer REFERENCES tbl_customers (id),
+            driver_id LONG CONSTRAINT fk_ship_driver REFERENCES tbl_drivers (id),
+            vehicle_id LONG CONSTRAINT fk_ship_vehicle REFERENCES tbl_vehicles (id),
+            origin TEXT(100), destination TEXT(100),
+            weight_kg DOUBLE, price_usd CURRENCY,
+            status TEXT(20), created_at DATETIME
+        )
+    """,
+    "tbl_summary": """
+        CREATE TABLE tbl_summary (
+            scope TEXT(20), scope_key TEXT(50), status TEXT(20),
+            shipments LONG, price_usd DOUBLE, weight_kg DOUBLE,
+            CONSTRAINT pk_summary PRIMARY KEY (scope, scope_key, status)
+        )
+    """,
+    "tbl_id_blocks": """
+        CREATE TABLE tbl_id_blocks (
+            table_name TEXT(64) CONSTRAINT pk_id_blocks PRIMARY KEY, next_id LONG
+        )
+    """,
+    "tbl_shipment_events": """
+        CREATE TABLE tbl_shipment_events (
+            id COUNTER CONSTRAINT pk_shipment_events PRIMARY KEY,
+            shipment_id LONG, old_status TEXT(20), new_status TEXT(20), changed_at DATETIME
+        )
+    """,
+    "tbl_change_log": """
+        CREATE TABLE tbl_change_log (
+            seq COUNTER CONSTRAINT pk_change_log PRIMARY KEY,
+            table_name TEXT(64), row_id LONG, op TEXT(1), changed_at DATETIME
+        )
+    """,
+    "tbl_search_docs": """
+        CREATE TABLE tbl_search_docs (
+            kind TEXT(16), ref TEXT(255), label TEXT(255), uses LONG,
+            CONSTRAINT pk_search_docs PRIMARY KEY (kind, ref)
+        )
+    """,
+    "tbl_search_terms": """
+        CREATE TABLE tbl_search_terms (
+            kind TEXT(16), term TEXT(64), ref TEXT(255),
+            CONSTRAINT pk_search_terms PRIMARY KEY (kind, term, ref)
+        )
+    """,
+}
+
+
+# =========================
+# BACKENDS
+# =========================
+class Backend:
+    """Common interface: open connections and manage the schema."""
+
+    name = "base"
+    schema: dict = {}
+    ping_sql = "SELECT 1"     # cheap query used by the pool health check
+    supports_fast_executemany = False   # pyodbc bulk parameter arrays
+
+    def connect(self):
+        raise NotImplementedError
+
+    def table_exists(self, conn, table: str) -> bool:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return self.name
+
+    def limit(self, sql: str, n: int) -> str:
+        """Return at most n rows of a SELECT (dialect specific)."""
+        raise NotImplementedError
+
+    def no_index(self, column: str) -> str:
+        """
+        A column in a WHERE that should only filter, not pick the index
+        (e.g. "id IN (...) AND status=?" must use the primary key, not the status index).
+        """
+        return column
+
+    def index_names(self, conn, table: str) -> set[str]:
+        """Names of the indexes that exist on a table."""
+        raise NotImplementedError
+
+    def explain(self, conn, sql: str, params: tuple = ()) -> list[str] | None:
+        """Query plan lines, or None if the engine cannot show plans."""
+        return None
+
+    def create_schema(self) -> list[str]:
+        """Create every missing table. Returns the names that were created."""
+        created = []
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            for table, ddl in self.schema.items():
+                if not self.table_exists(conn, table):
+                    cur.execute(ddl)
+                    created.append(table)
+            conn.commit()
+        finally:
+            conn.close()
+        return created
+
+    def close(self):
+        """Release anything the backend keeps open (nothing by default)."""
+
+
+class AccessBackend(Backend):
+    """MS Access through pyodbc (needs the Access Database Engine, Windows only)."""
+
+    name = "access"
+    schema = ACCESS_SCHEMA
+    supports_fast_executemany = True
+
+    def __init__(self, db_path: str = DEFAULT_ACCESS_PATH):
+        self.db_path = db_path
+        self.conn_str = (
+            r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
+            rf"DBQ={db_path};"
+        )
+
+    def connect(self):
+        # imported here so the SQLite backend works on machines without pyodbc
+        import pyodbc
+        return pyodbc.connect(self.conn_str)
+
+    def table_exists(self, conn, table: str) -> bool:
+        cur = conn.cursor()
+        return cur.tables(table=table, tableType="TABLE").fetchone() is not None
+
+    def describe(self) -> str:
+        return f"MS Access ({self.db_path})"
+
+    def limit(self, sql: str, n: int) -> str:
+        # Access has no LIMIT: SELECT TOP n ...
+        head, rest = sql.lstrip().split(None, 1)
+        return f"{head} TOP {int(n)} {rest}"
+
+    def index_names(self, conn, table: str) -> set[str]:
+        cur = conn.cursor()
+        return {r.index_name for r in cur.statistics(table) if r.index_name}
+
+
+def _adapt_datetime(value: datetime) -> str:
+    return value.isoformat(" ")
+
+
+def _convert_datetime(value: bytes) -> datetime:
+    return datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+
+class SQLiteBackend(Backend):
+    """
+    SQLite through the standard library.
+    ":memory:" gives a private shared-cache database that lives as long as the backend.
+    """
+
+    name = "sqlite"
+    schema = SQLITE_SCHEMA
+
+    def __init__(self, db_path: str = DEFAULT_SQLITE_PATH):
+        self.db_path = db_path
+        self._keeper = None
+        if db_path == ":memory:":
+            # every connection must see the same in-memory DB, so use a named shared cache
+            # and keep one connection open, otherwise the DB disappears between calls
+            self._target = f"file:transport_{uuid.uuid4().hex}?mode=memory&cache=shared"
+            self._uri = True
+            self._keeper = self.connect()
+        else:
+            self._target = db_path
+            self._uri = False
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self._target,
+            uri=self._uri,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,   # pooled connections move between threads
+        )
+        # same behaviour as Access: referenced customers/drivers/vehicles cannot be deleted
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def table_exists(self, conn, table: str) -> bool:
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+        return cur.fetchone() is not None
+
+    def describe(self) -> str:
+        return f"SQLite ({self.db_path})"
+
+    def limit(self, sql: str, n: int) -> str:
+        return f"{sql.rstrip()} LIMIT {int(n)}"
+
+    def no_index(self, column: str) -> str:
+        # unary + : same value, but SQLite will not drive the search from an index on it
+        return f"+{column}"
+
+    def index_names(self, conn, table: str) -> set[str]:
+        cur = conn.cursor()
+        cur.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name=?", (table,))
+        return {r[0] for r in cur.fetchall()}
+
+    def explain(self, conn, sql: str, params: tuple = ()) -> list[str]:
+        cur = conn.cursor()
+        cur.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [r[3] for r in cur.fetchall()]
+
+    def close(self):
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+
+
+BACKENDS = {
+    "access": AccessBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+# =========================
+# ACTIVE BACKEND
+# =========================
+_backend = None
+
+
+def make_backend(kind: str, db_path: str | None = None) -> Backend:
+    """Build a backend by name ("access" / "sqlite")."""
+    kind = kind.strip().lower()
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown backend '{kind}' (choose: {', '.join(BACKENDS)})")
+    if db_path:
+        return BACKENDS[kind](db_path)
+    return BACKENDS[kind]()
+
+
+def backend_from_env() -> Backend:
+    """Build the backend described by TRANSPORT_BACKEND / TRANSPORT_DB_PATH."""
+    return make_backend(
+        os.environ.get("TRANSPORT_BACKEND", "access"),
+        os.environ.get("TRANSPORT_DB_PATH"),
+    )
+
+
+def get_backend() -> Backend:
+    """Return the active backend (created from the environment on first use)."""
+    global _backend
+    if _backend is None:
+        _backend = backend_from_env()
+    return _backend
+
+
+def set_backend(backend: Backend) -> Backend:
+    """Switch the active backend (e.g. an in-memory SQLite DB for benchmarks)."""
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
+    return backend
+
+
+if __name__ == "__main__":
+    # python db_backend.py  -> create any missing tables on the configured backend
+    backend = get_backend()
+    created = backend.create_schema()
+    print("Backend:", backend.describe())
+    print("Created tables:", ", ".join(created) if created else "(none, schema already there)")
@@ -0,0 +1,263 @@
+# db_pool.py
+# ✅ Thread-safe connection pool for the Transport system
+# ✅ Keeps connections open between calls instead of one connect() per query
+#
+# Opening an Access connection = file open + .laccdb lock negotiation, which costs far more
+# than the query itself. The pool hands the same connections out again and again.
+#
+# Settings (environment variables):
+#   TRANSPORT_POOL_SIZE      max open connections         (default 5)
+#   TRANSPORT_POOL_TIMEOUT   seconds to wait for a free one (default 30)
+#   TRANSPORT_POOL_IDLE      close connections idle longer than this many seconds (default 300)
+#   TRANSPORT_POOL_CHECK     ping connections idle longer than this many seconds  (default 30)
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+from db_backend import get_backend
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the timeout."""
+
+
+class PoolStats:
+    """Counters collected by the pool (read them with snapshot())."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.hits = 0            # reused an idle connection
+        self.misses = 0          # had to open a new connection
+        self.waits = 0           # pool was full, caller had to wait
+        self.wait_time = 0.0     # total seconds spent waiting
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.evicted = 0         # closed because idle too long
+        self.reconnects = 0      # failed health check or broken connection replaced
+
+    def snapshot(self) -> dict:
+        data = dict(vars(self))
+        data["hit_rate"] = self.hits / self.checkouts if self.checkouts else 0.0
+        data["avg_wait"] = self.wait_time / self.waits if self.waits else 0.0
+        return data
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool around a backend.
+    Use it as: with pool.connection() as conn: ...
+    """
+
+    def __init__(self, backend, size: int = 5, timeout: float = 30.0,
+                 max_idle: float = 300.0, check_after: float = 30.0):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.backend = backend
+        self.size = size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.stats = PoolStats()
+        self._idle = []          # stack of (conn, released_at), newest last
+        self._cursors = {}       # id(conn) -> long-lived cursor, see cursor()
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # ---------- checkout / return ----------
+    def acquire(self, timeout: float | None = None):
+        """Take a connection out of the pool (open one if allowed)."""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited_from = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                self._evict_idle()
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    self.stats.hits += 1
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    conn, released_at = None, None
+                    self.stats.misses += 1
+                    break
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                    self.stats.waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats.timeouts += 1
+                    self._record_wait(waited_from)
+                    raise PoolTimeout(f"No free connection after {timeout:.1f}s (pool size {self.size})")
+                self._cond.wait(remaining)
+
+            self.stats.checkouts += 1
+            if waited_from is not None:
+                self._record_wait(waited_from)
+
+        # connect / ping outside the lock so other threads are not blocked
+        try:
+            if conn is None:
+                return self.backend.connect()
+            if time.monotonic() - released_at >= self.check_after and not self._is_alive(conn):
+                self._close_quietly(conn)
+                self.stats.reconnects += 1
+                return self.backend.connect()
+            return conn
+        except Exception:
+            self._forget_one()
+            raise
+
+    def release(self, conn, broken: bool = False):
+        """Give a connection back. Broken connections are closed and replaced later."""
+        if not broken:
+            try:
+                conn.rollback()      # never hand out a half-finished transaction
+            except Exception:
+                broken = True
+
+        if broken or self._closed:
+            self._close_quietly(conn)
+            if broken:
+                self.stats.reconnects += 1
+            self._forget_one()
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        """Borrow a connection; commit on success, rollback on error."""
+        t0 = time.perf_counter()
+        conn = self.acquire(timeout)
+        metrics.observe("transport_pool_acquire_seconds", time.perf_counter() - t0)
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            broken = False
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            if not broken and not self._is_alive(conn):
+                broken = True
+            self.release(conn, broken=broken)
+            raise
+        else:
+            self.release(conn)
+
+    def cursor(self, conn):
+        """
+        The long-lived cursor of a pooled connection (statements.py runs on it).
+        The same SQL text on the same cursor is not prepared again by pyodbc.
+        """
+        cur = self._cursors.get(id(conn))
+        if cur is None:
+            cur = self._cursors[id(conn)] = conn.cursor()
+        return cur
+
+    # ---------- housekeeping ----------
+    def close(self):
+        """Close every idle connection; connections in use are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def info(self) -> dict:
+        """Pool size/usage plus the stats counters."""
+        with self._cond:
+            data = {"size": self.size, "open": self._open, "idle": len(self._idle),
+                    "in_use": self._open - len(self._idle)}
+        data.update(self.stats.snapshot())
+        return data
+
+    def _evict_idle(self):
+        # caller holds the lock; oldest connections are at the start of the stack
+        if not self._idle or self.max_idle <= 0:
+            return
+        now = time.monotonic()
+        keep = [(c, t) for c, t in self._idle if now - t < self.max_idle]
+        for conn, _ in self._idle[:len(self._idle) - len(keep)]:
+            self._close_quietly(conn)
+            self._open -= 1
+            self.stats.evicted += 1
+        self._idle = keep
+
+    def _forget_one(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _record_wait(self, waited_from: float):
+        waited = time.monotonic() - waited_from
+        self.stats.wait_time += waited
+        self.stats.max_wait = max(self.stats.max_wait, waited)
+
+    def _is_alive(self, conn) -> bool:
+        try:
+            cur = conn.cursor()
+            cur.execute(self.backend.ping_sql)
+            cur.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def _close_quietly(self, conn):
+        self._cursors.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+# =========================
+# SHARED POOL
+# =========================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool_from_env(backend) -> ConnectionPool:
+    return ConnectionPool(
+        backend,
+        size=int(os.environ.get("TRANSPORT_POOL_SIZE", "5")),
+        timeout=float(os.environ.get("TRANSPORT_POOL_TIMEOUT", "30")),
+        max_idle=float(os.environ.get("TRANSPORT_POOL_IDLE", "300")),
+        check_after=float(os.environ.get("TRANSPORT_POOL_CHECK", "30")),
+    )
+
+
+def get_pool() -> ConnectionPool:
+    """Return the pool for the active backend (rebuilt if the backend was switched)."""
+    global _pool
+    backend = get_backend()
+    with _pool_lock:
+        if _pool is None or _pool.backend is not backend:
+            if _pool is not None:
+                _pool.close()
+            _pool = pool_from_env(backend)
+        return _pool
+
+
+def set_pool(pool: ConnectionPool) -> ConnectionPool:
+    """Install a custom pool (e.g. a bigger one for load tests)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool is not pool:
+            _pool.close()
+        _pool = pool
+    return pool
@@ -0,0 +1,145 @@
+# entities.py
+# ✅ One place that describes the 4 main tables (columns + value types)
+# ✅ Used by bulk writes, import/export and anything else that works on "any entity"
+# ✅ Value rules are the same ones the menus use (input_int / input_float / input_non_empty)
+
+from datetime import datetime
+
+from db_backend import STATUSES
+
+ENTITIES = {
+    "customers": {
+        "table": "tbl_customers",
+        "fields": (("id", int), ("name", str), ("phone", str), ("address", str)),
+    },
+    "drivers": {
+        "table": "tbl_drivers",
+        "fields": (("id", int), ("name", str), ("phone", str), ("license", str)),
+    },
+    "vehicles": {
+        "table": "tbl_vehicles",
+        "fields": (("id", int), ("plate", str), ("vehicles_type", str), ("capacity_kg", float)),
+    },
+    "shipments": {
+        "table": "tbl_shipments",
+        "fields": (
+            ("id", int), ("customer_id", int), ("driver_id", int), ("vehicle_id", int),
+            ("origin", str), ("destination", str), ("weight_kg", float), ("price_usd", float),
+            ("status", str), ("created_at", "datetime"),
+        ),
+    },
+}
+
+
+def get_entity(name: str) -> dict:
+    if name not in ENTITIES:
+        raise ValueError(f"Unknown entity '{name}' (choose: {', '.join(ENTITIES)})")
+    return ENTITIES[name]
+
+
+def columns(name: str) -> tuple:
+    """Column names of an entity, in table order."""
+    return tuple(f for f, _ in get_entity(name)["fields"])
+
+
+def column_list(name: str) -> str:
+    """Comma separated, bracket-quoted column list (works on Access and SQLite)."""
+    return ", ".join(f"[{c}]" for c in columns(name))
+
+
+def insert_sql(name: str) -> str:
+    cols = columns(name)
+    return (
+        f"INSERT INTO {get_entity(name)['table']} ({column_list(name)})"
+        f" VALUES ({', '.join('?' * len(cols))})"
+    )
+
+
+def update_sql(name: str, changes: dict, rid: int):
+    """
+    One "UPDATE ... SET only the changed columns ... WHERE id=?" + params.
+    Column names are checked against the entity (never taken from the caller as-is).
+    """
+    fields = dict(get_entity(name)["fields"])
+    cols = [c for c in changes if c != "id"]
+    if not cols:
+        raise ValueError("Nothing to update")
+    unknown = [c for c in cols if c not in fields]
+    if unknown:
+        raise ValueError(f"Unknown field(s) for {name}: {', '.join(unknown)}")
+    sql = (
+        f"UPDATE {get_entity(name)['table']} SET {', '.join(f'[{c}]=?' for c in cols)} WHERE id=?"
+    )
+    return sql, tuple(changes[c] for c in cols) + (rid,)
+
+
+# =========================
+# VALUE RULES (shared with the input_* helpers)
+# =========================
+def to_int(raw) -> int:
+    if isinstance(raw, int) and not isinstance(raw, bool):
+        return raw
+    return int(str(raw).strip())
+
+
+def to_float(raw) -> float:
+    if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+        return float(raw)
+    return float(str(raw).strip())
+
+
+def to_text(raw) -> str:
+    s = "" if raw is None else str(raw).strip()
+    if not s:
+        raise ValueError("Cannot be empty")
+    return s
+
+
+def to_datetime(raw) -> datetime:
+    if isinstance(raw, datetime):
+        return raw
+    return datetime.fromisoformat(to_text(raw))
+
+
+CONVERTERS = {int: to_int, float: to_float, str: to_text, "datetime": to_datetime}
+
+
+def validate_row(name: str, raw: dict) -> dict:
+    """
+    Convert + check one row (e.g. from CSV). Raises ValueError naming the bad field.
+    Shipments: status must be a known status, created_at defaults to now.
+    """
+    row = {}
+    for field, ftype in get_entity(name)["fields"]:
+        value = raw.get(field)
+        if name == "shipments" and field == "created_at" and value in (None, ""):
+            row[field] = datetime.now()
+            continue
+        try:
+            row[field] = CONVERTERS[ftype](value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{field}: {e}") from None
+    if name == "shipments" and row["status"] not in STATUSES:
+        raise ValueError(f"status: must be one of {', '.join(STATUSES)}")
+    return row
+
+
+def validate_changes(name: str, raw: dict) -> dict:
+    """
+    Convert the fields of a partial update. Empty values mean "keep the old value"
+    (like pressing Enter in the edit menus) and are left out. id is never changed.
+    """
+    fields = dict(get_entity(name)["fields"])
+    changes = {}
+    for field, value in raw.items():
+        if field == "id" or value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        if field not in fields:
+            raise ValueError(f"{field}: unknown field")
+        try:
+            changes[field] = CONVERTERS[fields[field]](value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{field}: {e}") from None
+    if name == "shipments" and "status" in changes and changes["status"] not in STATUSES:
+        raise ValueError(f"status: must be one of {', '.join(STATUSES)}")
+    return changes
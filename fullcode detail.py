@@ -1,41 +1,41 @@
 # transport_access_full.py
-# ✅ Full Transport Company Information System (Python + MS Access)
+# ✅ Full Transport Company Information System (Python + MS Access / SQLite)
 # ✅ Uses your MS Access file: C:\Users\ROG\OneDrive\Documents\Database 18.accdb
 # ✅ Easy to understand, menu-driven, CRUD + shipments + search + report + join view
 #
 # REQUIREMENTS (Windows):
 #   pip install pyodbc
 #   Microsoft Access Database Engine installed (bitness must match Python)
+#
+# LINUX / TESTING (no Access engine needed):
+#   TRANSPORT_BACKEND=sqlite TRANSPORT_DB_PATH=transport.db python "fullcode detail.py"
+#
+# PROFILING (each menu action, report on stderr or in TRANSPORT_PROFILE_DIR, see metrics.py):
+#   TRANSPORT_PROFILE=cpu,memory python "fullcode detail.py"
 
-import pyodbc
 from datetime import datetime
 
-
-# =========================
-# CONFIG (YOUR DATABASE)
-# =========================
-DB_PATH = r"C:\Users\ROG\OneDrive\Documents\Database18.accdb"
-
-CONN_STR = (
-    r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
-    rf"DBQ={DB_PATH};"
-)
+import metrics
+import services
+from db_backend import get_backend
+from entities import to_float, to_int, to_text
+from render import render_pages, render_table
 
 
 # =========================
 # DB UTILITIES
 # =========================
-def get_conn():
-    """Open a connection to MS Access."""
-    return pyodbc.connect(CONN_STR)
-
-
+# connections come from the shared pool (db.py); scripts can use cli.py instead of the menus
 def test_connection():
-    """Test if database connection works."""
+    """Test if database connection works (and create missing tables / indexes)."""
     try:
-        conn = get_conn()
-        conn.close()
-        return True, "✅ Connected to MS Access successfully"
+        info = services.startup()
+        msg = f"✅ Connected to {info['backend']} successfully"
+        if info["tables"]:
+            msg += f"\n✅ Created tables: {', '.join(info['tables'])}"
+        if info["indexes"]:
+            msg += f"\n✅ Created indexes: {', '.join(info['indexes'])}"
+        return True, msg
     except Exception as e:
         return False, f"❌ Connection failed:\n{e}"
 
@@ -43,118 +43,68 @@ def test_connection():
 # =========================
 # INPUT HELPERS
 # =========================
+# same rules as file imports (entities.to_text / to_int / to_float)
 def input_non_empty(prompt: str) -> str:
     while True:
-        s = input(prompt).strip()
-        if s:
-            return s
-        print("❌ Cannot be empty")
+        try:
+            return to_text(input(prompt))
+        except ValueError:
+            print("❌ Cannot be empty")
 
 
 def input_int(prompt: str) -> int:
     while True:
         try:
-            return int(input(prompt).strip())
-        except:
+            return to_int(input(prompt))
+        except ValueError:
             print("❌ Please enter an integer (number)")
 
 
 def input_float(prompt: str) -> float:
     while True:
         try:
-            return float(input(prompt).strip())
-        except:
+            return to_float(input(prompt))
+        except ValueError:
             print("❌ Please enter a number")
 
 
 # =========================
 # PRINT HELPERS
 # =========================
+# aligned + buffered output, see render.py (TRANSPORT_OUTPUT=tsv|json for machine formats)
 def print_table(title: str, headers: list[str], rows: list[tuple]):
-    print("\n" + "=" * 100)
-    print(title)
-    print("=" * 100)
-    if not rows:
-        print("⚠️ No data")
-        print("=" * 100)
-        return
-
-    # simple text header
-    print(" | ".join(headers))
-    print("-" * 100)
-
-    for r in rows:
-        print(" | ".join(str(x) for x in r))
-
-    print("=" * 100)
-
-
-# =========================
-# GENERIC DB HELPERS
-# =========================
-def record_exists(table: str, rid: int) -> bool:
-    """Check if ID exists in a specific table."""
-    sql = f"SELECT 1 FROM {table} WHERE id=?"
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(sql, (rid,))
-        return cur.fetchone() is not None
-
-
-def safe_execute(sql: str, params: tuple = ()):
-    """
-    Execute a SQL command safely.
-    Returns (True, None) if ok, otherwise (False, error_message).
-    """
-    try:
-        with get_conn() as conn:
-            cur = conn.cursor()
-            cur.execute(sql, params)
-            conn.commit()
-        return True, None
-    except Exception as e:
-        return False, str(e)
+    render_table(title, headers, rows)
 
 
-def fetch_all(sql: str, params: tuple = ()):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(sql, params)
-        return cur.fetchall()
+def print_pages(title: str, headers: list[str], pages):
+    """Print one page at a time (pages = generator of row lists). Enter = next, q = stop."""
+    render_pages(title, headers, pages)
 
 
 # =========================
 # CUSTOMERS (tbl_customers)
 # =========================
+# the menus only ask + print; the work is done by services.py (also used by cli.py)
+# new IDs come from the server-side allocator (id_alloc.py), nobody types them any more
 def add_customer():
-    cid = input_int("Customer ID (number): ")
-    if record_exists("tbl_customers", cid):
-        print("❌ Customer ID already exists")
-        return
-
     name = input_non_empty("Name: ")
     phone = input_non_empty("Phone: ")
     address = input_non_empty("Address: ")
 
-    ok, err = safe_execute(
-        "INSERT INTO tbl_customers (id, [name], phone, address) VALUES (?, ?, ?, ?)",
-        (cid, name, phone, address)
-    )
-
+    ok, result = services.add("customers", {"name": name, "phone": phone, "address": address})
     if ok:
-        print("✅ Customer added")
+        print(f"✅ Customer added (ID {result})")
     else:
-        print("❌ Error adding customer:", err)
+        print("❌ Error adding customer:", result)
 
 
 def view_customers():
-    rows = fetch_all("SELECT id, [name], phone, address FROM tbl_customers ORDER BY id")
-    print_table("CUSTOMERS", ["ID", "Name", "Phone", "Address"], rows)
+    print_pages("CUSTOMERS", services.HEADERS["customers"], services.list_pages("customers"))
 
 
 def edit_customer():
     cid = input_int("Enter Customer ID to edit: ")
-    if not record_exists("tbl_customers", cid):
+    if not services.exists("customers", cid):
         print("❌ Customer not found")
         return
 
@@ -163,65 +113,81 @@ def edit_customer():
     new_phone = input("New Phone: ").strip()
     new_address = input("New Address: ").strip()
 
-    if new_name:
-        ok, err = safe_execute("UPDATE tbl_customers SET [name]=? WHERE id=?", (new_name, cid))
-        if not ok: print("❌", err)
-    if new_phone:
-        ok, err = safe_execute("UPDATE tbl_customers SET phone=? WHERE id=?", (new_phone, cid))
-        if not ok: print("❌", err)
-    if new_address:
-        ok, err = safe_execute("UPDATE tbl_customers SET address=? WHERE id=?", (new_address, cid))
-        if not ok: print("❌", err)
+    changes = {"name": new_name, "phone": new_phone, "address": new_address}
+    save_changes("customers", cid, changes, "Customer")
 
-    print("✅ Customer updated")
 
+def save_changes(entity: str, rid: int, changes: dict, label: str):
+    """One UPDATE with only the fields that were typed (empty = keep old value)."""
+    changes = {k: v for k, v in changes.items() if v not in ("", None)}
+    if not changes:
+        print("⚠️ Nothing changed")
+        return
+    ok, err = services.update(entity, rid, changes)
+    if ok:
+        print(f"✅ {label} updated")
+    else:
+        print("❌", err)
 
-def delete_customer():
-    cid = input_int("Enter Customer ID to delete: ")
-    if not record_exists("tbl_customers", cid):
-        print("❌ Customer not found")
+
+def delete_record(entity: str, rid: int, label: str):
+    if not services.exists(entity, rid):
+        print(f"❌ {label} not found")
         return
 
-    ok, err = safe_execute("DELETE FROM tbl_customers WHERE id=?", (cid,))
+    ok, err = services.delete(entity, rid)
     if ok:
-        print("✅ Customer deleted")
+        print(f"✅ {label} deleted")
     else:
         # If references exist, Access may block deletion (good!)
         print("❌ Cannot delete (maybe referenced by shipments).")
         print("Error:", err)
 
 
+def delete_customer():
+    delete_record("customers", input_int("Enter Customer ID to delete: "), "Customer")
+
+
+def find_records(kind: str, label: str):
+    """Typeahead-style search (search_index.py): any words, each one the start of a word."""
+    text = input_non_empty(f"Search {label} (name, phone, ...): ")
+    items = services.search(text, [kind])
+    if not items:
+        print(f"⚠️ No {label} found")
+        return
+    print_table(f"{label.upper()} MATCHING '{text}'", services.SEARCH_HEADERS, services.search_rows(items))
+
+
+def find_customers():
+    find_records("customer", "customers")
+
+
 # =========================
 # DRIVERS (tbl_drivers)
 # =========================
 def add_driver():
-    did = input_int("Driver ID (number): ")
-    if record_exists("tbl_drivers", did):
-        print("❌ Driver ID already exists")
-        return
-
     name = input_non_empty("Name: ")
     phone = input_non_empty("Phone: ")
     license_no = input_non_empty("License: ")
 
-    ok, err = safe_execute(
-        "INSERT INTO tbl_drivers (id, [name], phone, license) VALUES (?, ?, ?, ?)",
-        (did, name, phone, license_no)
-    )
+    ok, result = services.add("drivers", {"name": name, "phone": phone, "license": license_no})
     if ok:
-        print("✅ Driver added")
+        print(f"✅ Driver added (ID {result})")
     else:
-        print("❌ Error adding driver:", err)
+        print("❌ Error adding driver:", result)
 
 
 def view_drivers():
-    rows = fetch_all("SELECT id, [name], phone, license FROM tbl_drivers ORDER BY id")
-    print_table("DRIVERS", ["ID", "Name", "Phone", "License"], rows)
+    print_pages("DRIVERS", services.HEADERS["drivers"], services.list_pages("drivers"))
+
+
+def find_drivers():
+    find_records("driver", "drivers")
 
 
 def edit_driver():
     did = input_int("Enter Driver ID to edit: ")
-    if not record_exists("tbl_drivers", did):
+    if not services.exists("drivers", did):
         print("❌ Driver not found")
         return
 
@@ -230,64 +196,36 @@ def edit_driver():
     new_phone = input("New Phone: ").strip()
     new_license = input("New License: ").strip()
 
-    if new_name:
-        ok, err = safe_execute("UPDATE tbl_drivers SET [name]=? WHERE id=?", (new_name, did))
-        if not ok: print("❌", err)
-    if new_phone:
-        ok, err = safe_execute("UPDATE tbl_drivers SET phone=? WHERE id=?", (new_phone, did))
-        if not ok: print("❌", err)
-    if new_license:
-        ok, err = safe_execute("UPDATE tbl_drivers SET license=? WHERE id=?", (new_license, did))
-        if not ok: print("❌", err)
-
-    print("✅ Driver updated")
+    changes = {"name": new_name, "phone": new_phone, "license": new_license}
+    save_changes("drivers", did, changes, "Driver")
 
 
 def delete_driver():
-    did = input_int("Enter Driver ID to delete: ")
-    if not record_exists("tbl_drivers", did):
-        print("❌ Driver not found")
-        return
-
-    ok, err = safe_execute("DELETE FROM tbl_drivers WHERE id=?", (did,))
-    if ok:
-        print("✅ Driver deleted")
-    else:
-        print("❌ Cannot delete (maybe referenced by shipments).")
-        print("Error:", err)
+    delete_record("drivers", input_int("Enter Driver ID to delete: "), "Driver")
 
 
 # =========================
 # VEHICLES (tbl_vehicles)
 # =========================
 def add_vehicle():
-    vid = input_int("Vehicle ID (number): ")
-    if record_exists("tbl_vehicles", vid):
-        print("❌ Vehicle ID already exists")
-        return
-
     plate = input_non_empty("Plate: ")
     vtype = input_non_empty("Vehicle Type: ")
     capacity = input_float("Capacity (kg): ")
 
-    ok, err = safe_execute(
-        "INSERT INTO tbl_vehicles (id, plate, vehicles_type, capacity_kg) VALUES (?, ?, ?, ?)",
-        (vid, plate, vtype, capacity)
-    )
+    ok, result = services.add("vehicles", {"plate": plate, "vehicles_type": vtype, "capacity_kg": capacity})
     if ok:
-        print("✅ Vehicle added")
+        print(f"✅ Vehicle added (ID {result})")
     else:
-        print("❌ Error adding vehicle:", err)
+        print("❌ Error adding vehicle:", result)
 
 
 def view_vehicles():
-    rows = fetch_all("SELECT id, plate, vehicles_type, capacity_kg FROM tbl_vehicles ORDER BY id")
-    print_table("VEHICLES", ["ID", "Plate", "Type", "Capacity_kg"], rows)
+    print_pages("VEHICLES", services.HEADERS["vehicles"], services.list_pages("vehicles"))
 
 
 def edit_vehicle():
     vid = input_int("Enter Vehicle ID to edit: ")
-    if not record_exists("tbl_vehicles", vid):
+    if not services.exists("vehicles", vid):
         print("❌ Vehicle not found")
         return
 
@@ -296,58 +234,55 @@ def edit_vehicle():
     new_type = input("New Type: ").strip()
     new_cap = input("New Capacity (kg): ").strip()
 
-    if new_plate:
-        ok, err = safe_execute("UPDATE tbl_vehicles SET plate=? WHERE id=?", (new_plate, vid))
-        if not ok: print("❌", err)
-    if new_type:
-        ok, err = safe_execute("UPDATE tbl_vehicles SET vehicles_type=? WHERE id=?", (new_type, vid))
-        if not ok: print("❌", err)
+    changes = {"plate": new_plate, "vehicles_type": new_type}
     if new_cap:
         try:
-            cap_val = float(new_cap)
-            ok, err = safe_execute("UPDATE tbl_vehicles SET capacity_kg=? WHERE id=?", (cap_val, vid))
-            if not ok: print("❌", err)
-        except:
+            changes["capacity_kg"] = to_float(new_cap)
+        except ValueError:
             print("⚠️ Invalid capacity, keeping old value")
-
-    print("✅ Vehicle updated")
+    save_changes("vehicles", vid, changes, "Vehicle")
 
 
-def delete_vehicle():
-    vid = input_int("Enter Vehicle ID to delete: ")
-    if not record_exists("tbl_vehicles", vid):
-        print("❌ Vehicle not found")
+def plan_vehicle_loads():
+    print("1) First fit decreasing (fast)\n2) Best fit decreasing (fewer half-empty vehicles)")
+    strategy = {"1": "ffd", "2": "bfd"}.get(input_non_empty("Choose (1-2): "))
+    if strategy is None:
+        print("❌ Invalid choice")
         return
 
-    ok, err = safe_execute("DELETE FROM tbl_vehicles WHERE id=?", (vid,))
-    if ok:
-        print("✅ Vehicle deleted")
-    else:
-        print("❌ Cannot delete (maybe referenced by shipments).")
-        print("Error:", err)
+    res = services.plan_loads(strategy)
+    print_table("LOAD PLAN (Pending shipments)", services.LOAD_HEADERS, res["vehicles"])
+    print(f"{res['assigned']} of {res['shipments']} shipments fit on {res['vehicles_used']} vehicles"
+          f" ({res['fill']:.1%} full), {res['unassigned']} do not fit")
+    if res["assigned"] and input("Move shipments to these vehicles? (y/N): ").strip().lower() == "y":
+        res = services.plan_loads(strategy, apply=True)
+        print(f"✅ {res['moved']} shipment(s) moved, {res['failed']} failed")
+
+
+def delete_vehicle():
+    delete_record("vehicles", input_int("Enter Vehicle ID to delete: "), "Vehicle")
 
 
 # =========================
 # SHIPMENTS (tbl_shipments)
 # =========================
-def add_shipment():
-    sid = input_int("Shipment ID (number): ")
-    if record_exists("tbl_shipments", sid):
-        print("❌ Shipment ID already exists")
-        return
+STATUS_MAP = {"1": "Pending", "2": "In Transit", "3": "Delivered", "4": "Cancelled"}
 
+
+def add_shipment():
+    # FK checks are set lookups in the shared ID index (no query per check)
     customer_id = input_int("Customer ID: ")
-    if not record_exists("tbl_customers", customer_id):
+    if not services.exists("customers", customer_id):
         print("❌ Customer ID not found")
         return
 
     driver_id = input_int("Driver ID: ")
-    if not record_exists("tbl_drivers", driver_id):
+    if not services.exists("drivers", driver_id):
         print("❌ Driver ID not found")
         return
 
     vehicle_id = input_int("Vehicle ID: ")
-    if not record_exists("tbl_vehicles", vehicle_id):
+    if not services.exists("vehicles", vehicle_id):
         print("❌ Vehicle ID not found")
         return
 
@@ -358,155 +293,148 @@ def add_shipment():
 
     print("Status options: 1) Pending  2) In Transit  3) Delivered  4) Cancelled")
     status_choice = input_non_empty("Choose status (1-4): ")
-    status_map = {"1": "Pending", "2": "In Transit", "3": "Delivered", "4": "Cancelled"}
-    if status_choice not in status_map:
+    if status_choice not in STATUS_MAP:
         print("❌ Invalid status")
         return
 
-    status = status_map[status_choice]
-    created_at = datetime.now()
-
-    ok, err = safe_execute(
-        """
-        INSERT INTO tbl_shipments
-        (id, customer_id, driver_id, vehicle_id, origin, destination, weight_kg, price_usd, status, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (sid, customer_id, driver_id, vehicle_id, origin, destination, weight, price, status, created_at)
-    )
+    # insert + summary counters in one transaction
+    ok, result = services.add("shipments", {
+        "customer_id": customer_id, "driver_id": driver_id, "vehicle_id": vehicle_id,
+        "origin": origin, "destination": destination, "weight_kg": weight, "price_usd": price,
+        "status": STATUS_MAP[status_choice], "created_at": datetime.now(),
+    })
 
     if ok:
-        print("✅ Shipment created")
+        print(f"✅ Shipment created (ID {result})")
     else:
-        print("❌ Error creating shipment:", err)
+        print("❌ Error creating shipment:", result)
         print("💡 If you have FK references enforced, wrong IDs will be blocked automatically.")
 
 
 def view_shipments_simple():
-    rows = fetch_all("""
-        SELECT id, customer_id, driver_id, vehicle_id,
-               origin, destination, weight_kg, price_usd, status, created_at
-        FROM tbl_shipments
-        ORDER BY created_at DESC
-    """)
-    print_table(
-        "SHIPMENTS (SIMPLE VIEW)",
-        ["ID", "Customer_ID", "Driver_ID", "Vehicle_ID", "From", "To", "Kg", "$", "Status", "Created_At"],
-        rows
-    )
+    # newest first, paged by (created_at, id)
+    print_pages("SHIPMENTS (SIMPLE VIEW)", services.HEADERS["shipments"], services.list_pages("shipments"))
 
 
 def view_shipments_join():
-    """
-    JOIN view: show customer/driver names and vehicle plate (more readable).
-    Note: Access JOIN needs parentheses for multiple joins.
-    """
-    rows = fetch_all("""
-        SELECT
-            s.id,
-            c.[name] AS customer_name,
-            d.[name] AS driver_name,
-            v.plate AS vehicle_plate,
-            s.origin,
-            s.destination,
-            s.weight_kg,
-            s.price_usd,
-            s.status,
-            s.created_at
-        FROM ((tbl_shipments AS s
-        INNER JOIN tbl_customers AS c ON s.customer_id = c.id)
-        INNER JOIN tbl_drivers AS d ON s.driver_id = d.id)
-        INNER JOIN tbl_vehicles AS v ON s.vehicle_id = v.id
-        ORDER BY s.created_at DESC
-    """)
-    print_table(
-        "SHIPMENTS (JOIN VIEW)",
-        ["ID", "Customer", "Driver", "Plate", "From", "To", "Kg", "$", "Status", "Created_At"],
-        rows
-    )
+    """JOIN view: show customer/driver names and vehicle plate (more readable)."""
+    print_pages("SHIPMENTS (JOIN VIEW)", services.JOIN_HEADERS, services.shipment_join_pages())
 
 
 def update_shipment_status():
     sid = input_int("Enter Shipment ID: ")
-    if not record_exists("tbl_shipments", sid):
+    rows = services.search_shipments("id", sid)
+    if not rows:
         print("❌ Shipment not found")
         return
 
-    print("1) Pending\n2) In Transit\n3) Delivered\n4) Cancelled")
+    current = rows[0][8]
+    allowed = services.next_statuses(current)
+    if not allowed:
+        print(f"⚠️ Shipment is {current}: it cannot change any more")
+        return
+    print("Current status:", current)
+    for i, status in enumerate(allowed, 1):
+        print(f"{i}) {status}")
     choice = input_non_empty("Choose new status: ")
-    mapping = {"1": "Pending", "2": "In Transit", "3": "Delivered", "4": "Cancelled"}
-    if choice not in mapping:
+    if not choice.isdigit() or not 1 <= int(choice) <= len(allowed):
         print("❌ Invalid choice")
         return
 
-    ok, err = safe_execute("UPDATE tbl_shipments SET status=? WHERE id=?", (mapping[choice], sid))
+    ok, err = services.set_status(sid, allowed[int(choice) - 1])
     if ok:
         print("✅ Status updated")
     else:
         print("❌ Error:", err)
 
 
+def close_out_shipments():
+    """Move many shipments at once, e.g. a driver's deliveries at the end of a shift."""
+    try:
+        ids = services.parse_ids(input_non_empty("Shipment IDs (e.g. 12 13 20-25): "))
+    except ValueError as e:
+        print("❌", e)
+        return
+    print("1) In Transit\n2) Delivered\n3) Cancelled")
+    targets = {"1": "In Transit", "2": "Delivered", "3": "Cancelled"}
+    choice = input_non_empty("Move them to: ")
+    if choice not in targets:
+        print("❌ Invalid choice")
+        return
+
+    ok, res = services.transition(ids, targets[choice])
+    if not ok:
+        print("❌ Error:", res)
+        return
+    print(f"✅ {len(res['moved'])} shipment(s) moved to {targets[choice]}")
+    if res["skipped"]:
+        print_table("NOT MOVED", ["ID", "Reason"], sorted(res["skipped"].items()))
+
+
+def shipment_history():
+    sid = input_int("Enter Shipment ID: ")
+    when = input("Status at YYYY-MM-DD HH:MM (Enter = full history): ").strip()
+    if when:
+        try:
+            status = services.status_at(sid, when)
+        except ValueError as e:
+            print("❌", e)
+            return
+        print(f"Shipment {sid} at {when}: {status or '(did not exist yet)'}")
+        return
+    rows = services.shipment_history(sid)
+    if not rows:
+        print("⚠️ No history for this shipment")
+        return
+    print_table(f"SHIPMENT {sid} HISTORY", services.HISTORY_HEADERS, rows)
+
+
 def search_shipments():
-    print("Search by: 1) Shipment ID  2) Customer ID  3) Driver ID  4) Vehicle ID  5) Status")
-    choice = input_non_empty("Choose (1-5): ")
-
-    if choice == "1":
-        sid = input_int("Shipment ID: ")
-        rows = fetch_all("""
-            SELECT id, customer_id, driver_id, vehicle_id, origin, destination, weight_kg, price_usd, status, created_at
-            FROM tbl_shipments
-            WHERE id=?
-        """, (sid,))
-    elif choice == "2":
-        cid = input_int("Customer ID: ")
-        rows = fetch_all("""
-            SELECT id, customer_id, driver_id, vehicle_id, origin, destination, weight_kg, price_usd, status, created_at
-            FROM tbl_shipments
-            WHERE customer_id=?
-            ORDER BY created_at DESC
-        """, (cid,))
-    elif choice == "3":
-        did = input_int("Driver ID: ")
-        rows = fetch_all("""
-            SELECT id, customer_id, driver_id, vehicle_id, origin, destination, weight_kg, price_usd, status, created_at
-            FROM tbl_shipments
-            WHERE driver_id=?
-            ORDER BY created_at DESC
-        """, (did,))
-    elif choice == "4":
-        vid = input_int("Vehicle ID: ")
-        rows = fetch_all("""
-            SELECT id, customer_id, driver_id, vehicle_id, origin, destination, weight_kg, price_usd, status, created_at
-            FROM tbl_shipments
-            WHERE vehicle_id=?
-            ORDER BY created_at DESC
-        """, (vid,))
-    elif choice == "5":
-        status = input_non_empty("Status (Pending/In Transit/Delivered/Cancelled): ")
-        rows = fetch_all("""
-            SELECT id, customer_id, driver_id, vehicle_id, origin, destination, weight_kg, price_usd, status, created_at
-            FROM tbl_shipments
-            WHERE status=?
-            ORDER BY created_at DESC
-        """, (status,))
-    else:
+    print("Search by: 1) Shipment ID  2) Customer ID  3) Driver ID  4) Vehicle ID  5) Status  6) Route")
+    choice = input_non_empty("Choose (1-6): ")
+    if choice == "6":
+        search_route()
+        return
+    prompts = {
+        "1": ("id", "Shipment ID: "),
+        "2": ("customer", "Customer ID: "),
+        "3": ("driver", "Driver ID: "),
+        "4": ("vehicle", "Vehicle ID: "),
+        "5": ("status", "Status (Pending/In Transit/Delivered/Cancelled): "),
+    }
+    if choice not in prompts:
         print("❌ Invalid choice")
         return
 
-    print_table(
-        "SHIPMENTS SEARCH RESULTS",
-        ["ID", "Customer_ID", "Driver_ID", "Vehicle_ID", "From", "To", "Kg", "$", "Status", "Created_At"],
-        rows
-    )
+    by, prompt = prompts[choice]
+    value = input_non_empty(prompt) if by == "status" else input_int(prompt)
+    print_table("SHIPMENTS SEARCH RESULTS", services.HEADERS["shipments"], services.search_shipments(by, value))
+
+
+def search_route():
+    """Type the start of the city names, pick one of the routes found, list its shipments."""
+    routes = services.search(input_non_empty("Route (e.g. 'lis por'): "), ["route"])
+    if not routes:
+        print("⚠️ No route found")
+        return
+    rows = [(n, *row[1:]) for n, row in enumerate(services.search_rows(routes), 1)]
+    print_table("ROUTES", ["#", "Route", "Match"], rows)
+    n = input_int(f"Route number (1-{len(routes)}): ")
+    if not 1 <= n <= len(routes):
+        print("❌ Invalid choice")
+        return
+    origin, destination = routes[n - 1]["key"]
+    print_table(f"SHIPMENTS {origin} → {destination}", services.HEADERS["shipments"],
+                services.route_shipments(origin, destination))
 
 
 def delete_shipment():
     sid = input_int("Enter Shipment ID to delete: ")
-    if not record_exists("tbl_shipments", sid):
+    if not services.exists("shipments", sid):
         print("❌ Shipment not found")
         return
 
-    ok, err = safe_execute("DELETE FROM tbl_shipments WHERE id=?", (sid,))
+    ok, err = services.delete("shipments", sid)
     if ok:
         print("✅ Shipment deleted")
     else:
@@ -517,32 +445,109 @@ def delete_shipment():
 # REPORTS
 # =========================
 def report_summary():
-    total_shipments = fetch_all("SELECT COUNT(*) FROM tbl_shipments")[0][0]
+    # read the maintained counters (tbl_summary) instead of scanning tbl_shipments
+    st = services.summary()
+
+    print("\n" + "=" * 60)
+    print("REPORT SUMMARY")
+    print("=" * 60)
+    print(f"Total shipments : {st['total']}")
+    print(f"Delivered       : {st['Delivered']}")
+    print(f"In Transit      : {st['In Transit']}")
+    print(f"Pending         : {st['Pending']}")
+    print(f"Cancelled       : {st['Cancelled']}")
+    print(f"Total income($) : {st['income']:.2f}")
+    print("=" * 60)
 
-    delivered = fetch_all("SELECT COUNT(*) FROM tbl_shipments WHERE status='Delivered'")[0][0]
-    in_transit = fetch_all("SELECT COUNT(*) FROM tbl_shipments WHERE status='In Transit'")[0][0]
-    pending = fetch_all("SELECT COUNT(*) FROM tbl_shipments WHERE status='Pending'")[0][0]
-    cancelled = fetch_all("SELECT COUNT(*) FROM tbl_shipments WHERE status='Cancelled'")[0][0]
 
-    income = fetch_all("SELECT SUM(price_usd) FROM tbl_shipments WHERE status <> 'Cancelled'")[0][0]
-    if income is None:
-        income = 0
+def report_breakdown():
+    print("Breakdown by: 1) Customer  2) Driver  3) Vehicle  4) Route")
+    choice = input_non_empty("Choose (1-4): ")
+    by_map = {"1": "customer", "2": "driver", "3": "vehicle", "4": "route"}
+    if choice not in by_map:
+        print("❌ Invalid choice")
+        return
 
+    month = input("Month YYYY-MM (Enter = all time): ").strip()
+    by = by_map[choice]
+    try:
+        items = services.breakdown(by, month or None)
+    except ValueError as e:
+        print("❌", e)
+        return
+
+    print_table(
+        f"BREAKDOWN BY {by.upper()}" + (f" ({month})" if month else ""),
+        [by.capitalize()] + services.BREAKDOWN_HEADERS,
+        services.breakdown_rows(items)
+    )
+
+
+def report_transit():
+    print("Transit time by: 1) Route  2) Driver  3) Customer  4) Vehicle")
+    choice = input_non_empty("Choose (1-4): ")
+    by_map = {"1": "route", "2": "driver", "3": "customer", "4": "vehicle"}
+    if choice not in by_map:
+        print("❌ Invalid choice")
+        return
+
+    month = input("Delivered in month YYYY-MM (Enter = all time): ").strip()
+    sla = input("SLA in hours (Enter = none): ").strip()
+    by = by_map[choice]
+    try:
+        items = services.transit_times(by, month or None, float(sla) if sla else None)
+    except ValueError as e:
+        print("❌", e)
+        return
+
+    print_table(
+        f"PENDING → DELIVERED BY {by.upper()}" + (f" ({month})" if month else ""),
+        [by.capitalize()] + services.TRANSIT_HEADERS,
+        services.transit_rows(items)
+    )
+
+
+def report_pool_stats():
+    all_stats = services.stats()
+    st = all_stats["pool"]
     print("\n" + "=" * 60)
-    print("REPORT SUMMARY")
+    print("CONNECTION POOL")
+    print("=" * 60)
+    print(f"Open / idle / in use : {st['open']} / {st['idle']} / {st['in_use']} (size {st['size']})")
+    print(f"Checkouts            : {st['checkouts']}")
+    print(f"Hits / misses        : {st['hits']} / {st['misses']} (hit rate {st['hit_rate']:.1%})")
+    print(f"Waits                : {st['waits']} (avg {st['avg_wait'] * 1000:.1f} ms, max {st['max_wait'] * 1000:.1f} ms)")
+    print(f"Timeouts             : {st['timeouts']}")
+    print(f"Evicted / reconnects : {st['evicted']} / {st['reconnects']}")
+    print("=" * 60)
+
+    qc = all_stats["cache"]
+    print("QUERY CACHE")
     print("=" * 60)
-    print(f"Total shipments : {total_shipments}")
-    print(f"Delivered       : {delivered}")
-    print(f"In Transit      : {in_transit}")
-    print(f"Pending         : {pending}")
-    print(f"Cancelled       : {cancelled}")
-    print(f"Total income($) : {income:.2f}")
+    print(f"Entries              : {qc['entries']} / {qc['max_entries']}")
+    print(f"Memory (estimated)   : {qc['bytes'] / 1024:.1f} KB / {qc['max_bytes'] / 1024 / 1024:.0f} MB")
+    print(f"Hits / misses        : {qc['hits']} / {qc['misses']} (hit rate {qc['hit_rate']:.1%})")
+    print(f"Evicted / expired    : {qc['evictions']} / {qc['expired']}")
+    print(f"Invalidated          : {qc['invalidations']} ({qc['stale']} stale reads not cached)")
     print("=" * 60)
 
+    rows = services.statement_stats()
+    if rows:
+        print_table("SQL STATEMENTS (this session)", services.STATEMENT_HEADERS, rows)
+    rows = metrics.latency_rows()
+    if rows:
+        print_table("LATENCY (this session)", metrics.LATENCY_HEADERS, rows)
+
 
 # =========================
 # MENUS
 # =========================
+def run_action(action):
+    """Run one menu action (profiled when TRANSPORT_PROFILE is set)."""
+    with metrics.profile(action.__name__):
+        action()
+
+
 def menu_customers():
     while True:
         print("\n--- Customers Menu ---")
@@ -550,13 +555,15 @@ def menu_customers():
         print("2) View Customers")
         print("3) Edit Customer")
         print("4) Delete Customer")
+        print("5) Search Customers (name / phone / address)")
         print("0) Back")
         ch = input("Choose: ").strip()
 
-        if ch == "1": add_customer()
-        elif ch == "2": view_customers()
-        elif ch == "3": edit_customer()
-        elif ch == "4": delete_customer()
+        if ch == "1": run_action(add_customer)
+        elif ch == "2": run_action(view_customers)
+        elif ch == "3": run_action(edit_customer)
+        elif ch == "4": run_action(delete_customer)
+        elif ch == "5": run_action(find_customers)
         elif ch == "0": break
         else: print("❌ Invalid choice")
 
@@ -568,13 +575,15 @@ def menu_drivers():
         print("2) View Drivers")
         print("3) Edit Driver")
         print("4) Delete Driver")
+        print("5) Search Drivers (name / license)")
         print("0) Back")
         ch = input("Choose: ").strip()
 
-        if ch == "1": add_driver()
-        elif ch == "2": view_drivers()
-        elif ch == "3": edit_driver()
-        elif ch == "4": delete_driver()
+        if ch == "1": run_action(add_driver)
+        elif ch == "2": run_action(view_drivers)
+        elif ch == "3": run_action(edit_driver)
+        elif ch == "4": run_action(delete_driver)
+        elif ch == "5": run_action(find_drivers)
         elif ch == "0": break
         else: print("❌ Invalid choice")
 
@@ -586,13 +595,15 @@ def menu_vehicles():
         print("2) View Vehicles")
         print("3) Edit Vehicle")
         print("4) Delete Vehicle")
+        print("5) Plan Loads (Pending shipments by capacity)")
         print("0) Back")
         ch = input("Choose: ").strip()
 
-        if ch == "1": add_vehicle()
-        elif ch == "2": view_vehicles()
-        elif ch == "3": edit_vehicle()
-        elif ch == "4": delete_vehicle()
+        if ch == "1": run_action(add_vehicle)
+        elif ch == "2": run_action(view_vehicles)
+        elif ch == "3": run_action(edit_vehicle)
+        elif ch == "4": run_action(delete_vehicle)
+        elif ch == "5": run_action(plan_vehicle_loads)
         elif ch == "0": break
         else: print("❌ Invalid choice")
 
@@ -606,15 +617,19 @@ def menu_shipments():
         print("4) Update Shipment Status")
         print("5) Search Shipments")
         print("6) Delete Shipment")
+        print("7) Close Out Shipments (bulk status change)")
+        print("8) Shipment Status History")
         print("0) Back")
         ch = input("Choose: ").strip()
 
-        if ch == "1": add_shipment()
-        elif ch == "2": view_shipments_simple()
-        elif ch == "3": view_shipments_join()
-        elif ch == "4": update_shipment_status()
-        elif ch == "5": search_shipments()
-        elif ch == "6": delete_shipment()
+        if ch == "1": run_action(add_shipment)
+        elif ch == "2": run_action(view_shipments_simple)
+        elif ch == "3": run_action(view_shipments_join)
+        elif ch == "4": run_action(update_shipment_status)
+        elif ch == "5": run_action(search_shipments)
+        elif ch == "6": run_action(delete_shipment)
+        elif ch == "7": run_action(close_out_shipments)
+        elif ch == "8": run_action(shipment_history)
         elif ch == "0": break
         else: print("❌ Invalid choice")
 
@@ -626,18 +641,22 @@ def main():
         print("\n✅ Fix tips:")
         print("1) pip install pyodbc")
         print("2) Install Microsoft Access Database Engine (match Python 32/64-bit)")
-        print("3) Confirm file path is correct:", DB_PATH)
+        print("3) Confirm the database is correct:", get_backend().describe())
+        print("4) Or run without Access: set TRANSPORT_BACKEND=sqlite")
         return
 
     while True:
         print("\n" + "=" * 60)
-        print("TRANSPORT COMPANY INFORMATION SYSTEM (Python + MS Access)")
+        print(f"TRANSPORT COMPANY INFORMATION SYSTEM (Python + {get_backend().name})")
         print("=" * 60)
         print("1) Customers")
         print("2) Drivers")
         print("3) Vehicles")
         print("4) Shipments / Orders")
         print("5) Report Summary")
+        print("6) Breakdown Reports")
+        print("7) Connection Pool / Cache Stats")
+        print("8) Transit Time Report")
         print("0) Exit")
         ch = input("Choose: ").strip()
 
@@ -645,7 +664,10 @@ def main():
         elif ch == "2": menu_drivers()
         elif ch == "3": menu_vehicles()
         elif ch == "4": menu_shipments()
-        elif ch == "5": report_summary()
+        elif ch == "5": run_action(report_summary)
+        elif ch == "6": run_action(report_breakdown)
+        elif ch == "7": run_action(report_pool_stats)
+        elif ch == "8": run_action(report_transit)
         elif ch == "0":
             print("👋 Bye!")
             break
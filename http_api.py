@@ -0,0 +1,421 @@
+# http_api.py
+# ✅ Small HTTP/JSON server for the dispatch UI (standard library only, asyncio)
+# ✅ HTTP/1.1 keep-alive, DB work on the async worker pool (async_api.py), streamed lists
+#
+#   python http_api.py                     (127.0.0.1:8080)
+#   python http_api.py --host 0.0.0.0 --port 9000
+#
+# Endpoints (JSON in, JSON out):
+#   GET   /health
+#   GET   /shipments?view=join|simple&limit=N     all shipments, newest first, streamed
+#   GET   /shipments/search?by=customer&value=7   by = id|customer|driver|vehicle|status
+#   GET   /shipments/route?origin=A&destination=B
+#   GET   /search?q=ann+sm&kind=customer&limit=10  typeahead: customers / drivers / routes (kind repeatable)
+#   GET   /shipments/<id>
+#   POST  /shipments                              body = shipment fields (no id = next free ID)
+#   PUT   /shipments/<id>/status                  body = {"status": "Delivered"}
+#   POST  /shipments/status                       body = {"ids": [1, 2], "status": "Delivered", "from": "In Transit"}
+#                                                 -> {"moved": [...], "skipped": {"id": "reason"}}
+#   GET   /reports/summary?month=YYYY-MM
+#   GET   /shipments/<id>/history[?at=YYYY-MM-DD HH:MM]  status events / status at a past time
+#   GET   /reports/breakdown?by=customer&month=YYYY-MM&top=10
+#   GET   /reports/transit?by=route&month=YYYY-MM&sla=48   Pending -> Delivered hours
+#   GET   /stats
+#   GET   /metrics                                Prometheus text (latency histograms, see metrics.py)
+#
+# Errors: {"error": "..."} with 400 (bad input), 404, 413, 503 (busy), 504 (timeout).
+# There is no login: keep the default 127.0.0.1, or put it behind a proxy that checks users.
+#
+# Settings (environment variables):
+#   TRANSPORT_HTTP_HOST / TRANSPORT_HTTP_PORT   (default 127.0.0.1 / 8080)
+#   TRANSPORT_HTTP_IDLE                         seconds a keep-alive connection may stay idle (default 15)
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+import services
+from async_api import AsyncServices, Busy
+
+MAX_BODY = 1 << 20
+IDLE_TIMEOUT = float(os.environ.get("TRANSPORT_HTTP_IDLE", "15"))
+STREAM_PAGE = 500       # rows fetched (and sent as one chunk) per page of a streamed list
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+           504: "Gateway Timeout"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_value(v):
+    return v.isoformat(" ") if isinstance(v, datetime) else str(v)
+
+
+def dumps(obj) -> bytes:
+    return json.dumps(obj, default=_json_value, ensure_ascii=False).encode("utf-8")
+
+
+def _row_dicts(headers: list[str], rows) -> list[dict]:
+    return [dict(zip(headers, r)) for r in rows]
+
+
+def _status_for(err: str) -> int:
+    return 404 if err.endswith("not found") else 400
+
+
+# =========================
+# HANDLERS
+# =========================
+# handler(api, match, query, body) -> (status, object) or (status, async generator of bytes)
+SHIPMENT_KEYS = ["id", "customer_id", "driver_id", "vehicle_id", "origin", "destination",
+                 "weight_kg", "price_usd", "status", "created_at"]
+EVENT_KEYS = ["event", "shipment_id", "from", "to", "at"]
+JOIN_KEYS = ["id", "customer", "driver", "plate", "origin", "destination",
+             "weight_kg", "price_usd", "status", "created_at"]
+
+
+def _one(query: dict, name: str, default=None):
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def _int_param(query: dict, name: str):
+    value = _one(query, name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HttpError(400, f"{name}: must be a whole number") from None
+
+
+async def h_health(api, m, query, body):
+    return 200, {"ok": True}
+
+
+async def h_list_shipments(api, m, query, body):
+    view = _one(query, "view", "join")
+    if view not in ("join", "simple"):
+        raise HttpError(400, "view: must be join or simple")
+    limit = _int_param(query, "limit")
+    keys = JOIN_KEYS if view == "join" else SHIPMENT_KEYS
+
+    async def fetch(after):
+        if view == "join":
+            return await api.shipment_join_page(after, STREAM_PAGE)
+        return await api.list_page("shipments", after, STREAM_PAGE)
+
+    # first page before the 200 goes out, so a DB error still becomes a proper error response
+    rows, after = await fetch(None)
+
+    async def chunks():
+        nonlocal rows, after
+        sent = 0
+        yield b"["
+        while rows:
+            if limit is not None:
+                rows = rows[:limit - sent]
+            if rows:
+                part = dumps(_row_dicts(keys, rows))[1:-1]
+                yield (b"," if sent else b"") + part
+                sent += len(rows)
+            if after is None or (limit is not None and sent >= limit):
+                break
+            rows, after = await fetch(after)
+        yield b"]"
+
+    return 200, chunks()
+
+
+async def h_search(api, m, query, body):
+    by, value = _one(query, "by"), _one(query, "value")
+    if not by or value is None:
+        raise HttpError(400, "by and value are required")
+    rows = await api.search_shipments(by, value)
+    return 200, _row_dicts(SHIPMENT_KEYS, rows)
+
+
+async def h_route(api, m, query, body):
+    origin, destination = _one(query, "origin"), _one(query, "destination")
+    if not origin or not destination:
+        raise HttpError(400, "origin and destination are required")
+    rows = await api.route_shipments(origin, destination)
+    return 200, _row_dicts(SHIPMENT_KEYS, rows)
+
+
+async def h_typeahead(api, m, query, body):
+    text = _one(query, "q")
+    if not text:
+        raise HttpError(400, "q is required")
+    items = await api.search(text, query.get("kind"), _int_param(query, "limit"))
+    for item in items:
+        if item["kind"] == "route":
+            item["key"] = list(item["key"])
+    return 200, items
+
+
+async def h_get_shipment(api, m, query, body):
+    rows = await api.search_shipments("id", m.group(1))
+    if not rows:
+        raise HttpError(404, "Shipment not found")
+    return 200, dict(zip(SHIPMENT_KEYS, rows[0]))
+
+
+async def h_create_shipment(api, m, query, body):
+    if not isinstance(body, dict):
+        raise HttpError(400, "body must be a JSON object")
+    ok, result = await api.add("shipments", body)
+    if not ok:
+        raise HttpError(400, result)
+    return 201, {"ok": True, "id": result}
+
+
+async def h_set_status(api, m, query, body):
+    if not isinstance(body, dict) or "status" not in body:
+        raise HttpError(400, 'body must be {"status": "..."}')
+    ok, err = await api.set_status(int(m.group(1)), body["status"])
+    if not ok:
+        raise HttpError(_status_for(err), err)
+    return 200, {"ok": True}
+
+
+async def h_transition(api, m, query, body):
+    if not isinstance(body, dict) or not isinstance(body.get("ids"), list) or "status" not in body:
+        raise HttpError(400, 'body must be {"ids": [...], "status": "..."}')
+    ok, result = await api.transition(body["ids"], body["status"], body.get("from"))
+    if not ok:
+        raise HttpError(400, result)
+    return 200, result
+
+
+async def h_history(api, m, query, body):
+    sid, at = int(m.group(1)), _one(query, "at")
+    if at:
+        return 200, {"id": sid, "at": at, "status": await api.status_at(sid, at)}
+    rows = await api.shipment_history(sid)
+    return 200, _row_dicts(EVENT_KEYS, rows)
+
+
+async def h_summary(api, m, query, body):
+    return 200, await api.summary(_one(query, "month"))
+
+
+async def h_breakdown(api, m, query, body):
+    by = _one(query, "by", "customer")
+    items = await api.breakdown(by, _one(query, "month"), _int_param(query, "top"))
+    return 200, items
+
+
+async def h_transit(api, m, query, body):
+    sla = _one(query, "sla")
+    try:
+        sla = float(sla) if sla else None
+    except ValueError:
+        raise HttpError(400, "sla: must be a number of hours") from None
+    return 200, await api.transit_times(_one(query, "by", "route"), _one(query, "month"), sla)
+
+
+async def h_stats(api, m, query, body):
+    return 200, await api.stats_all()
+
+
+async def h_metrics(api, m, query, body):
+    return 200, metrics.prometheus().encode()     # bytes = sent as text, not JSON
+
+
+ROUTES = [
+    ("GET", re.compile(r"/health"), h_health),
+    ("GET", re.compile(r"/shipments"), h_list_shipments),
+    ("GET", re.compile(r"/shipments/search"), h_search),
+    ("GET", re.compile(r"/shipments/route"), h_route),
+    ("GET", re.compile(r"/search"), h_typeahead),
+    ("GET", re.compile(r"/shipments/(\d+)"), h_get_shipment),
+    ("POST", re.compile(r"/shipments"), h_create_shipment),
+    ("PUT", re.compile(r"/shipments/(\d+)/status"), h_set_status),
+    ("GET", re.compile(r"/shipments/(\d+)/history"), h_history),
+    ("POST", re.compile(r"/shipments/status"), h_transition),
+    ("GET", re.compile(r"/reports/summary"), h_summary),
+    ("GET", re.compile(r"/reports/breakdown"), h_breakdown),
+    ("GET", re.compile(r"/reports/transit"), h_transit),
+    ("GET", re.compile(r"/stats"), h_stats),
+    ("GET", re.compile(r"/metrics"), h_metrics),
+]
+
+
+def route(method: str, path: str):
+    """(handler, match) or raises HttpError 404 / 405."""
+    allowed = False
+    for meth, pattern, handler in ROUTES:
+        m = pattern.fullmatch(path)
+        if m:
+            if meth == method:
+                return handler, m
+            allowed = True
+    raise HttpError(405 if allowed else 404, "Method not allowed" if allowed else "Not found")
+
+
+# =========================
+# HTTP/1.1 CONNECTION
+# =========================
+class Server:
+    def __init__(self, api: AsyncServices | None = None):
+        self.api = api or AsyncServices()
+        self.requests = 0
+        self.connections = 0
+
+    @staticmethod
+    def _head(status: int, headers: list[tuple[str, str]], keep_alive: bool) -> bytes:
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}"]
+        lines += [f"{k}: {v}" for k, v in headers]
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer, status: int, obj, keep_alive: bool):
+        data = dumps(obj)
+        head = self._head(status, [("Content-Type", "application/json; charset=utf-8"),
+                                   ("Content-Length", str(len(data)))], keep_alive)
+        writer.write(head + data)
+        await writer.drain()
+
+    async def _send_text(self, writer, status: int, data: bytes, keep_alive: bool):
+        head = self._head(status, [("Content-Type", "text/plain; version=0.0.4; charset=utf-8"),
+                                   ("Content-Length", str(len(data)))], keep_alive)
+        writer.write(head + data)
+        await writer.drain()
+
+    async def _send_stream(self, writer, status: int, chunks, keep_alive: bool) -> bool:
+        """Chunked transfer encoding; drain() after each chunk so slow clients slow us down."""
+        writer.write(self._head(status, [("Content-Type", "application/json; charset=utf-8"),
+                                         ("Transfer-Encoding", "chunked")], keep_alive))
+        try:
+            async for data in chunks:
+                if data:
+                    writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    await writer.drain()
+        except Exception:
+            return False        # headers are gone already: cut the connection so the client sees it
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return True
+
+    async def _respond(self, method: str, target: str, body: bytes):
+        url = urlsplit(target)
+        handler, m = route(method, url.path.rstrip("/") or "/")
+        data = None
+        if body:
+            try:
+                data = json.loads(body)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise HttpError(400, f"bad JSON: {e}") from None
+        try:
+            return await handler(self.api, m, parse_qs(url.query), data)
+        except Busy as e:
+            raise HttpError(503, str(e)) from None
+        except TimeoutError:
+            raise HttpError(504, "Timed out") from None
+        except ValueError as e:
+            raise HttpError(400, str(e)) from None
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                if not line.strip():
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await self._send_json(writer, 400, {"error": "bad request line"}, False)
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = h.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                conn_hdr = headers.get("connection", "").lower()
+                keep_alive = conn_hdr != "close" if version == "HTTP/1.1" else conn_hdr == "keep-alive"
+                length = headers.get("content-length", "0") or "0"
+                if not length.isdigit():
+                    await self._send_json(writer, 400, {"error": "bad Content-Length"}, False)
+                    break
+                length = int(length)
+                if length > MAX_BODY:
+                    await self._send_json(writer, 413, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                self.requests += 1
+                try:
+                    status, result = await self._respond(method.upper(), target, body)
+                except HttpError as e:
+                    status, result = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, result = 500, {"error": str(e)}
+
+                if hasattr(result, "__aiter__"):
+                    if not await self._send_stream(writer, status, result, keep_alive):
+                        break
+                elif isinstance(result, bytes):
+                    await self._send_text(writer, status, result, keep_alive)
+                else:
+                    await self._send_json(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, TimeoutError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def serve(host: str, port: int, ready=None):
+    """Run the server forever. ready(server) is called once it is listening."""
+    services.startup()
+    app = Server()
+    server = await asyncio.start_server(app.handle, host, port, backlog=1024)
+    if ready:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP/JSON API for the transport system")
+    parser.add_argument("--host", default=os.environ.get("TRANSPORT_HTTP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("TRANSPORT_HTTP_PORT", "8080")))
+    args = parser.parse_args(argv)
+
+    def ready(server):
+        addr = server.sockets[0].getsockname()
+        print(f"✅ Listening on http://{addr[0]}:{addr[1]}", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        print("👋 Bye!", file=sys.stderr)
+    except OSError as e:
+        print("❌", e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
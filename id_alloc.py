@@ -0,0 +1,162 @@
+# id_alloc.py
+# ✅ Server-side IDs for new rows (hi/lo): each process reserves a BLOCK of IDs per table with
+#    one atomic "UPDATE tbl_id_blocks SET next_id = next_id + n", then hands them out from memory
+# ✅ No record_exists() probe before an insert, and no two processes ever get the same ID
+#
+# The first reservation for a table starts after MAX(id), so existing data is respected.
+# IDs typed by hand or loaded from files are claimed before the insert (claim()): the counter
+# moves past them, so no block ever contains them. An ID below the counter is refused - a block
+# of another process may hold it - unless it is in a block of this process or claimed by it.
+# IDs left in a block when the process exits are simply never used (gaps are normal).
+#
+# Settings (environment variables):
+#   TRANSPORT_ID_BLOCK   IDs reserved per round trip (default 50)
+
+import os
+import threading
+
+import entities
+import statements
+from db import get_conn
+from db_backend import get_backend
+
+RETRIES = 3     # first use of a table by two processes at once: one INSERT loses and retries
+
+
+class IdAllocator:
+    def __init__(self, block_size: int = 50):
+        if block_size < 1:
+            raise ValueError("ID block size must be at least 1")
+        self.block_size = block_size
+        self._blocks = {}           # table -> [next_id, end) still free in this process
+        self._claimed = {}          # table -> [first, end) of the last claim() of this process
+        self._lock = threading.Lock()
+        self.reservations = 0
+        self.allocated = 0
+
+    @staticmethod
+    def _check_table(table: str):
+        if table not in {e["table"] for e in entities.ENTITIES.values()}:
+            raise ValueError(f"No ID allocation for table '{table}'")
+
+    @staticmethod
+    def _reserve_once(table: str, n: int) -> int:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("UPDATE tbl_id_blocks SET next_id = next_id + ? WHERE table_name=?", (n, table))
+            if cur.rowcount:
+                cur.execute("SELECT next_id FROM tbl_id_blocks WHERE table_name=?", (table,))
+                return cur.fetchone()[0] - n
+            # first block for this table: start after the rows that are already there
+            cur.execute(statements.sql(statements.table_statement("max_id", table)))
+            start = (cur.fetchone()[0] or 0) + 1
+            cur.execute("INSERT INTO tbl_id_blocks (table_name, next_id) VALUES (?, ?)", (table, start + n))
+            return start
+
+    @staticmethod
+    def _claim_once(table: str, rid: int, n: int) -> int | None:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "UPDATE tbl_id_blocks SET next_id = ? WHERE table_name=? AND next_id <= ?", (rid + n, table, rid)
+            )
+            if cur.rowcount:
+                return None
+            cur.execute("SELECT next_id FROM tbl_id_blocks WHERE table_name=?", (table,))
+            row = cur.fetchone()
+            if row is not None:
+                return row[0]
+            # no block handed out for this table yet: every ID is still free
+            cur.execute(statements.sql(statements.table_statement("max_id", table)))
+            start = (cur.fetchone()[0] or 0) + 1
+            cur.execute("INSERT INTO tbl_id_blocks (table_name, next_id) VALUES (?, ?)", (table, max(start, rid + n)))
+            return None
+
+    @staticmethod
+    def _retried(fn, *args):
+        for attempt in range(RETRIES):
+            try:
+                return fn(*args)
+            except Exception:
+                if attempt == RETRIES - 1:
+                    raise
+
+    def _reserve(self, table: str, n: int) -> int:
+        """Reserve n IDs in the database (one transaction). Returns the first one."""
+        return self._retried(self._reserve_once, table, n)
+
+    def next_id(self, table: str, block: int | None = None) -> int:
+        """
+        Next free ID for a table. block = how many to reserve when this process runs out
+        (bigger for imports, default TRANSPORT_ID_BLOCK).
+        """
+        with self._lock:
+            nxt, end = self._blocks.get(table, (0, 0))
+            if nxt >= end:
+                self._check_table(table)
+                size = max(block or self.block_size, 1)
+                nxt = self._reserve(table, size)
+                end = nxt + size
+                self.reservations += 1
+            self._blocks[table] = (nxt + 1, end)
+            self.allocated += 1
+            return nxt
+
+    def claim(self, table: str, rid: int, ahead: int = 1):
+        """
+        Reserve an ID chosen by hand (typed / imported) before inserting it, so no block hands it out.
+        ahead = claim the next IDs too (imports with ascending IDs: one round trip per `ahead` rows).
+        Raises ValueError for an ID below the shared counter (it may be in another process's block).
+        """
+        self._check_table(table)
+        with self._lock:
+            nxt, end = self._blocks.get(table, (0, 0))
+            if nxt <= rid < end:
+                self._blocks[table] = (rid + 1, end)     # our own block: never hand it out
+                return
+            first, last = self._claimed.get(table, (0, 0))
+            if first <= rid < last:
+                return
+            n = max(ahead, 1)
+            counter = self._retried(self._claim_once, table, rid, n)
+            if counter is not None:
+                raise ValueError(f"id: {rid} is below the next server-side ID {counter} and may be handed out"
+                                 " already (leave it empty to get a new one)")
+            self._claimed[table] = (rid, rid + n)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "block_size": self.block_size,
+                "reservations": self.reservations,
+                "allocated": self.allocated,
+                "ids_per_round_trip": self.allocated / self.reservations if self.reservations else 0.0,
+                "held": {t: end - nxt for t, (nxt, end) in self._blocks.items()},
+            }
+
+
+# =========================
+# SHARED ALLOCATOR
+# =========================
+_allocator = None
+_allocator_backend = None
+_allocator_lock = threading.Lock()
+
+
+def get_allocator() -> IdAllocator:
+    """Return the shared allocator (a new one if the backend was switched: blocks belong to one DB)."""
+    global _allocator, _allocator_backend
+    backend = get_backend()
+    with _allocator_lock:
+        if _allocator is None or _allocator_backend is not backend:
+            _allocator = IdAllocator(int(os.environ.get("TRANSPORT_ID_BLOCK", "50")))
+            _allocator_backend = backend
+        return _allocator
+
+
+def next_id(table: str, block: int | None = None) -> int:
+    return get_allocator().next_id(table, block)
+
+
+def claim(table: str, rid: int, ahead: int = 1):
+    get_allocator().claim(table, rid, ahead)
@@ -0,0 +1,162 @@
+# id_index.py
+# ✅ In-memory ID sets for the tables shipments point to (customers, drivers, vehicles)
+# ✅ Shipment foreign-key checks become set lookups instead of 3 queries per shipment
+#
+# Each set is loaded with ONE "SELECT id FROM <table>" on first use and then kept in sync
+# by the add/delete code (added() / removed()). If another process writes to the DB,
+# call invalidate() (reload on next use) or refresh() (reload now), or set
+# TRANSPORT_ID_INDEX_TTL=<seconds> to reload automatically after that age.
+
+import os
+import threading
+import time
+
+import statements
+from db import fetch_iter, record_exists
+from db_backend import get_backend
+
+# shipments column -> referenced table
+FOREIGN_KEYS = {
+    "customer_id": "tbl_customers",
+    "driver_id": "tbl_drivers",
+    "vehicle_id": "tbl_vehicles",
+}
+
+FETCH_CHUNK = 10000
+
+
+class IdIndex:
+    """Lazily loaded {table: set(ids)} with explicit sync + invalidation."""
+
+    def __init__(self, tables=tuple(FOREIGN_KEYS.values()), max_age: float = 0.0):
+        self.tables = tuple(tables)
+        self.max_age = max_age          # 0 = never reload on its own
+        self._ids = {}                  # table -> set
+        self._loaded_at = {}            # table -> time.monotonic()
+        self._lock = threading.Lock()
+
+    # ---------- loading ----------
+    def _load(self, table: str) -> set:
+        sql = statements.sql(statements.table_statement("ids", table))
+        return {r[0] for r in fetch_iter(sql, chunk=FETCH_CHUNK)}
+
+    def _ids_for(self, table: str) -> set:
+        if table not in self.tables:
+            raise ValueError(f"Table '{table}' is not indexed")
+        with self._lock:
+            ids = self._ids.get(table)
+            if ids is not None and (not self.max_age
+                                    or time.monotonic() - self._loaded_at[table] < self.max_age):
+                return ids
+        ids = self._load(table)         # query outside the lock
+        with self._lock:
+            self._ids[table] = ids
+            self._loaded_at[table] = time.monotonic()
+        return ids
+
+    def refresh(self, table: str | None = None):
+        """Reload one table (or all) from the database now."""
+        for t in ([table] if table else self.tables):
+            ids = self._load(t)
+            with self._lock:
+                self._ids[t] = ids
+                self._loaded_at[t] = time.monotonic()
+
+    def invalidate(self, table: str | None = None):
+        """Forget one table (or all); it is reloaded on next use."""
+        with self._lock:
+            for t in ([table] if table else self.tables):
+                self._ids.pop(t, None)
+                self._loaded_at.pop(t, None)
+
+    # ---------- sync from our own writes ----------
+    def added(self, table: str, *ids: int):
+        with self._lock:
+            if table in self._ids:
+                self._ids[table].update(ids)
+
+    def removed(self, table: str, *ids: int):
+        with self._lock:
+            if table in self._ids:
+                self._ids[table].difference_update(ids)
+
+    # ---------- lookups ----------
+    def exists(self, table: str, rid: int, verify: bool = True) -> bool:
+        """
+        Set lookup. verify=True double-checks a miss against the DB (one query, only on misses),
+        so rows added by another process are still found.
+        """
+        if rid in self._ids_for(table):
+            return True
+        if verify and record_exists(table, rid):
+            self.added(table, rid)
+            return True
+        return False
+
+    def check_shipment(self, row: dict, verify: bool = True) -> list[str]:
+        """Problems with the customer/driver/vehicle IDs of one shipment ([] = OK)."""
+        return [
+            f"{col}: {row[col]} not found in {table}"
+            for col, table in FOREIGN_KEYS.items()
+            if not self.exists(table, row[col], verify)
+        ]
+
+    def check_shipments(self, rows, verify: bool = False) -> list[tuple[int, list[str]]]:
+        """Batch version: [(row_number, problems), ...] for the rows that fail. Pure set lookups."""
+        sets = {table: self._ids_for(table) for table in FOREIGN_KEYS.values()}
+        bad = []
+        for i, row in enumerate(rows):
+            problems = [
+                f"{col}: {row[col]} not found in {table}"
+                for col, table in FOREIGN_KEYS.items()
+                if row[col] not in sets[table]
+            ]
+            if problems and verify:
+                problems = self.check_shipment(row, verify=True)
+            if problems:
+                bad.append((i, problems))
+        return bad
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {t: len(s) for t, s in self._ids.items()}
+
+
+# =========================
+# SHARED INDEX
+# =========================
+_index = None
+_index_backend = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> IdIndex:
+    """Return the shared index (a new, empty one if the backend was switched)."""
+    global _index, _index_backend
+    backend = get_backend()
+    with _index_lock:
+        if _index is None or _index_backend is not backend:
+            _index = IdIndex(max_age=float(os.environ.get("TRANSPORT_ID_INDEX_TTL", "0")))
+            _index_backend = backend
+        return _index
+
+
+def exists(table: str, rid: int) -> bool:
+    """Drop-in for record_exists() on customers / drivers / vehicles."""
+    return get_index().exists(table, rid)
+
+
+def added(table: str, *ids: int):
+    get_index().added(table, *ids)
+
+
+def removed(table: str, *ids: int):
+    get_index().removed(table, *ids)
+
+
+def invalidate(table: str | None = None):
+    get_index().invalidate(table)
+
+
+def refresh(table: str | None = None):
+    get_index().refresh(table)
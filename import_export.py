@@ -0,0 +1,218 @@
+# import_export.py
+# ✅ Non-interactive import / export for customers, drivers, vehicles, shipments
+# ✅ CSV or JSONL (optionally .gz), streamed row by row -> constant memory for any file size
+#
+# Import: read -> validate (same rules as the menus) -> check foreign keys -> bulk insert
+#         (rows without an id get the next free ID from id_alloc.py)
+# Export: fetchmany() -> write, a few thousand rows in memory at a time
+#
+# Examples:
+#   python import_export.py import customers customers.csv
+#   python import_export.py import shipments shipments.jsonl.gz --batch-size 5000
+#   python import_export.py export shipments shipments.csv
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+from datetime import datetime
+
+import bulk
+import entities
+import id_alloc
+import id_index
+import statements
+from db import fetch_iter
+from db_backend import get_backend
+
+MAX_REPORTED_ERRORS = 100   # keep the error list bounded on huge bad files
+EXPORT_CHUNK = 5000
+
+
+# =========================
+# FILE HELPERS
+# =========================
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".jsonl") or name.endswith(".ndjson"):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    raise ValueError(f"Cannot tell the format of '{path}', use --format csv|jsonl")
+
+
+def open_text(path: str, mode: str):
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def read_rows(f, fmt: str):
+    """
+    Yield (line_number, row) from an open CSV / JSONL file.
+    CSV rows are dicts, JSONL rows the text of the line: turn them into a dict with row_dict()
+    inside the per-row error handling, so one bad line is reported instead of ending the import.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if line:
+                yield line_no, line
+
+
+def row_dict(raw) -> dict:
+    """A row of read_rows() as a dict. Raises ValueError for bad JSON or a line that is not an object."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON ({e})") from None
+    if not isinstance(raw, dict):
+        raise ValueError("not a JSON object")
+    return raw
+
+
+# =========================
+# IMPORT
+# =========================
+class ImportReport:
+    def __init__(self):
+        self.read = 0
+        self.invalid = 0
+        self.errors = []        # first MAX_REPORTED_ERRORS messages
+        self.result = None      # bulk.BulkResult
+
+    def error(self, msg: str):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(msg)
+
+
+def valid_rows(entity: str, rows, report: ImportReport):
+    """Generator: validated dicts only; problems go into the report."""
+    table = entities.get_entity(entity)["table"]
+    index = None
+    if entity == "shipments":
+        # fresh ID sets once, then every FK check is a set lookup
+        index = id_index.get_index()
+        index.refresh()
+    for line_no, raw in rows:
+        report.read += 1
+        try:
+            raw = row_dict(raw)
+            typed_id = raw.get("id") not in (None, "")
+            row = entities.validate_row(entity, raw if typed_id else {**raw, "id": 0})
+            if index:
+                problems = index.check_shipment(row, verify=False)
+                if problems:
+                    raise ValueError("; ".join(problems))
+            if typed_id:
+                id_alloc.claim(table, row["id"], ahead=bulk.DEFAULT_BATCH_SIZE)
+            else:
+                row["id"] = id_alloc.next_id(table, block=bulk.DEFAULT_BATCH_SIZE)    # only for valid rows
+        except ValueError as e:
+            report.invalid += 1
+            report.error(f"line {line_no}: {e}")
+            continue
+        yield row
+
+
+def import_file(entity: str, path: str, fmt: str | None = None,
+                batch_size: int | None = None) -> ImportReport:
+    """Stream a CSV/JSONL file into a table through the batched insert path."""
+    entities.get_entity(entity)
+    fmt = fmt or detect_format(path)
+    report = ImportReport()
+    f = open_text(path, "r")
+    try:
+        report.result = bulk.bulk_insert(entity, valid_rows(entity, read_rows(f, fmt), report), batch_size)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    for _, params, msg in report.result.errors[:MAX_REPORTED_ERRORS - len(report.errors)]:
+        report.error(f"id {params[0]}: {msg}")
+    return report
+
+
+# =========================
+# EXPORT
+# =========================
+def iter_table(entity: str, chunk: int = EXPORT_CHUNK):
+    """Yield every row of a table in id order, fetching `chunk` rows at a time."""
+    name = statements.table_statement("all_by_id", entities.get_entity(entity)["table"])
+    return fetch_iter(statements.sql(name), chunk=chunk)
+
+
+def _json_value(v):
+    return v.isoformat(" ") if isinstance(v, datetime) else v
+
+
+def export_table(entity: str, path: str, fmt: str | None = None) -> int:
+    """Write a whole table to CSV/JSONL. Returns the number of rows written."""
+    fmt = fmt or detect_format(path)
+    cols = entities.columns(entity)
+    count = 0
+    f = open_text(path, "w")
+    try:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(cols)
+            for row in iter_table(entity):
+                writer.writerow([_json_value(v) for v in row])
+                count += 1
+        else:
+            for row in iter_table(entity):
+                f.write(json.dumps(dict(zip(cols, (_json_value(v) for v in row))), ensure_ascii=False))
+                f.write("\n")
+                count += 1
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    return count
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import / export transport tables as CSV or JSONL")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_imp = sub.add_parser("import", help="load a file into a table")
+    p_imp.add_argument("entity", choices=list(entities.ENTITIES))
+    p_imp.add_argument("path", help="file path (.csv/.jsonl, optionally .gz; '-' = stdin)")
+    p_imp.add_argument("--format", choices=["csv", "jsonl"])
+    p_imp.add_argument("--batch-size", type=int)
+
+    p_exp = sub.add_parser("export", help="write a table to a file")
+    p_exp.add_argument("entity", choices=list(entities.ENTITIES))
+    p_exp.add_argument("path", help="file path (.csv/.jsonl, optionally .gz; '-' = stdout)")
+    p_exp.add_argument("--format", choices=["csv", "jsonl"])
+
+    args = parser.parse_args(argv)
+    if args.path == "-" and not args.format:
+        parser.error("--format is required when using stdin/stdout")
+    get_backend().create_schema()
+
+    if args.cmd == "import":
+        rep = import_file(args.entity, args.path, args.format, args.batch_size)
+        res = rep.result
+        print(f"✅ Read {rep.read} rows: {res.written} inserted, {rep.invalid} invalid, "
+              f"{res.failed} rejected by the database ({res.rows_per_sec:.0f} rows/sec)", file=sys.stderr)
+        for msg in rep.errors:
+            print("❌", msg, file=sys.stderr)
+        return 0 if not rep.invalid and not res.failed else 1
+
+    n = export_table(args.entity, args.path, args.format)
+    print(f"✅ Exported {n} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# indexes.py
+# ✅ Declares the indexes the shipment search / list / report paths need
+# ✅ ensure_indexes() creates the missing ones (called at startup)
+# ✅ plans() shows the query plan of every canned query and flags full scans (SQLite)
+#
+#   python indexes.py ensure    create missing indexes
+#   python indexes.py plans     print query plans + warnings (exit code 1 if any full scan)
+
+import sys
+from datetime import datetime
+
+import search_index
+import statements
+from db import get_conn
+from db_backend import get_backend
+from pagination import page_query
+from statements import JOIN_SELECT, SHIPMENT_SELECT
+
+# (index name, table, columns) - composite ones match "WHERE x=? ORDER BY created_at DESC"
+INDEXES = [
+    ("ix_shipments_created", "tbl_shipments", ("created_at", "id")),
+    ("ix_shipments_customer_created", "tbl_shipments", ("customer_id", "created_at")),
+    ("ix_shipments_driver_created", "tbl_shipments", ("driver_id", "created_at")),
+    ("ix_shipments_vehicle_created", "tbl_shipments", ("vehicle_id", "created_at")),
+    ("ix_shipments_status_created", "tbl_shipments", ("status", "created_at")),
+    # shipment_events.py: one shipment's history / all changes to one status in a period
+    ("ix_events_shipment", "tbl_shipment_events", ("shipment_id", "changed_at")),
+    ("ix_events_status", "tbl_shipment_events", ("new_status", "changed_at")),
+    # shipments on one route (search_index.py finds the route)
+    ("ix_shipments_route_created", "tbl_shipments", ("origin", "destination", "created_at")),
+    # search_index.py: re-index / delete one doc, match the other words of a question
+    ("ix_search_terms_ref", "tbl_search_terms", ("kind", "ref", "term")),
+]
+
+
+# reports read the whole table on purpose; a scan there is expected, not a warning
+EXPECTED_SCANS = {"report_summary", "report_breakdown_customer"}
+
+
+def ensure_indexes() -> list[str]:
+    """Create every declared index that does not exist yet. Returns the names created."""
+    backend = get_backend()
+    created = []
+    with get_conn() as conn:
+        existing = {}
+        cur = conn.cursor()
+        for name, table, cols in INDEXES:
+            if table not in existing:
+                existing[table] = {n.lower() for n in backend.index_names(conn, table)}
+            if name.lower() not in existing[table]:
+                cur.execute(f"CREATE INDEX {name} ON {table} ({', '.join(cols)})")
+                created.append(name)
+    return created
+
+
+def canned_queries() -> dict:
+    """name -> (sql, sample params) for every query the menus run on the hot paths."""
+    now = datetime.now()
+    newest_first = [("created_at", 9), ("id", 0)]
+    return {
+        "search_by_id": (statements.sql("shipment_by_id"), (1,)),
+        "search_by_customer": (statements.sql("shipments_by_customer"), (1,)),
+        "search_by_driver": (statements.sql("shipments_by_driver"), (1,)),
+        "search_by_vehicle": (statements.sql("shipments_by_vehicle"), (1,)),
+        "search_by_status": (statements.sql("shipments_by_status"), ("Pending",)),
+        "search_by_route": (statements.sql("shipments_by_route"), ("A", "B")),
+        "typeahead_two_words": (search_index.search_sql(2, 20), ("customer", "ann", "ano", "sm", "sn")),
+        "view_shipments_simple_first_page": page_query(SHIPMENT_SELECT, newest_first, desc=True),
+        "view_shipments_simple_next_page": page_query(SHIPMENT_SELECT, newest_first, (now, 1), desc=True),
+        "view_shipments_join_next_page": page_query(
+            JOIN_SELECT, [("s.created_at", 9), ("s.id", 0)], (now, 1), desc=True),
+        "record_exists": (statements.sql("exists:tbl_shipments"), (1,)),
+        "report_summary": (
+            "SELECT status, COUNT(*), SUM(price_usd), SUM(weight_kg) FROM tbl_shipments GROUP BY status", ()),
+        "report_breakdown_customer": (
+            "SELECT customer_id, status, COUNT(*), SUM(price_usd), SUM(weight_kg) FROM tbl_shipments"
+            " GROUP BY customer_id, status", ()),
+        "status_at": (
+            "SELECT new_status FROM tbl_shipment_events"
+            " WHERE shipment_id=? AND changed_at<=? ORDER BY changed_at DESC, id DESC", (1, now)),
+        "transit_times_route": (
+            "SELECT e.shipment_id, b.changed_at, e.changed_at, s.origin, s.destination"
+            " FROM (tbl_shipment_events AS e"
+            " INNER JOIN tbl_shipment_events AS b ON b.shipment_id = e.shipment_id)"
+            " INNER JOIN tbl_shipments AS s ON s.id = e.shipment_id"
+            " WHERE e.new_status=? AND b.new_status=? AND e.changed_at >= ? AND e.changed_at < ?",
+            ("Delivered", "Pending", now, now)),
+        "summary_read": (
+            "SELECT status, shipments, price_usd, weight_kg FROM tbl_summary WHERE scope=? AND scope_key=?",
+            ("all", "")),
+    }
+
+
+def _problems(plan: list[str]) -> list[str]:
+    found = []
+    for line in plan:
+        text = line.strip()
+        # "SCAN t USING INDEX ..." walks an index in order (fine with TOP/LIMIT)
+        if text.startswith("SCAN ") and " USING " not in text:
+            found.append(f"full table scan: {text}")
+        elif "USE TEMP B-TREE" in text:
+            found.append(f"extra sort: {text}")
+    return found
+
+
+def plans(queries: dict | None = None) -> list[dict]:
+    """
+    [{"name", "sql", "plan" (list or None), "problems" (list)}] for each canned query.
+    plan is None when the backend cannot show plans (MS Access).
+    """
+    backend = get_backend()
+    queries = queries or canned_queries()
+    report = []
+    with get_conn() as conn:
+        for name, (sql, params) in queries.items():
+            plan = backend.explain(conn, sql, params)
+            problems = [] if plan is None or name in EXPECTED_SCANS else _problems(plan)
+            report.append({"name": name, "sql": sql, "plan": plan, "problems": problems})
+    return report
+
+
+def main(argv: list[str]) -> int:
+    cmd = argv[0] if argv else "plans"
+    get_backend().create_schema()
+    if cmd == "ensure":
+        created = ensure_indexes()
+        print("✅ Created:", ", ".join(created) if created else "(nothing, all indexes exist)")
+        return 0
+    if cmd != "plans":
+        print("Usage: python indexes.py [ensure|plans]")
+        return 2
+
+    bad = 0
+    for item in plans():
+        print("\n" + "=" * 60)
+        print(item["name"])
+        print("=" * 60)
+        if item["plan"] is None:
+            print(f"(query plans not available on {get_backend().describe()})")
+            continue
+        for line in item["plan"]:
+            print("  ", line)
+        for p in item["problems"]:
+            print("⚠️ ", p)
+        bad += bool(item["problems"])
+    print(f"\n{'✅ No full scans' if not bad else f'❌ {bad} query plan(s) need attention'}")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,318 @@
+# load_planner.py
+# ✅ Packs Pending shipments onto vehicles by capacity_kg (first-fit / best-fit decreasing)
+# ✅ O(1) over-capacity check for new shipments, from the maintained counters (summary_store.py)
+#
+#   python load_planner.py plan                 show the plan for all Pending shipments
+#   python load_planner.py plan --strategy bfd --apply
+#   python load_planner.py check 3 250          would 250 kg more fit on vehicle 3?
+#
+# Load of a vehicle = weight of its Pending + In Transit shipments. A plan re-packs every
+# Pending shipment; In Transit weight stays on its vehicle and only the room left is used.
+# Shipments that fit nowhere keep their vehicle and are listed as unassigned; their weight is
+# reserved on that vehicle and the others are packed again, so --apply never overloads a vehicle.
+#
+# Strategies (shipments heaviest first, vehicles biggest first):
+#   ffd  first fit decreasing: first vehicle with room   (O(log vehicles) per shipment, tree of free room)
+#   bfd  best fit decreasing : vehicle with the least room that still fits (fewer part-empty trucks)
+
+import argparse
+import sys
+import time
+from array import array
+from bisect import bisect_left, insort
+
+import summary_store
+import updates
+from db import fetch_all, get_conn, query
+from db_backend import get_backend
+from render import render_table
+
+ACTIVE_STATUSES = ("Pending", "In Transit")    # these count as load on the vehicle
+STRATEGIES = ("ffd", "bfd")
+EPS = 1e-9          # float weights: 0.1 + 0.2 kg must still fit in 0.3 kg
+FETCH_ROWS = 10000  # rows per fetchmany() while reading Pending shipments
+LOAD_HEADERS = ["Vehicle", "Capacity_kg", "Kept kg", "Planned kg", "Fill %"]
+
+
+# =========================
+# O(1) CAPACITY CHECK (used by services.add / services.update)
+# =========================
+def vehicle_load(vehicle_id: int) -> float:
+    """Pending + In Transit kg on a vehicle (two primary-key rows of tbl_summary)."""
+    per_status = summary_store.weights("vehicle", vehicle_id)
+    return sum(per_status.get(s, 0.0) for s in ACTIVE_STATUSES)
+
+
+def check_capacity(vehicle_id: int, weight_kg: float) -> str | None:
+    """Error message if weight_kg more would overload the vehicle, None if it fits."""
+    rows = query("vehicle_capacity", (vehicle_id,))
+    if not rows:
+        return "Vehicle not found"
+    capacity = float(rows[0][0] or 0)
+    load = vehicle_load(vehicle_id)
+    if load + weight_kg > capacity + EPS:
+        return _over(vehicle_id, load, capacity, weight_kg)
+    return None
+
+
+def _over(vehicle_id: int, load: float, capacity: float, weight_kg: float) -> str:
+    if weight_kg > 0:
+        return (f"Vehicle {vehicle_id} is over capacity: {load:.1f} of {capacity:.1f} kg loaded,"
+                f" {weight_kg:.1f} kg more does not fit")
+    return f"Vehicle {vehicle_id} carries {load:.1f} kg (Pending + In Transit), more than {capacity:.1f} kg"
+
+
+def _overload(cur, vehicle_id: int, added_kg: float) -> str | None:
+    """Error if the vehicle is over capacity now, read on `cur` after a write that added added_kg."""
+    cur.execute("SELECT capacity_kg FROM tbl_vehicles WHERE id=?", (vehicle_id,))
+    row = cur.fetchone()
+    if row is None:
+        return "Vehicle not found"
+    capacity = float(row[0] or 0)
+    cur.execute(
+        "SELECT SUM(weight_kg) FROM tbl_summary WHERE scope=? AND scope_key=? AND status IN (?, ?)",
+        ("vehicle", str(vehicle_id), *ACTIVE_STATUSES),
+    )
+    load = float(cur.fetchone()[0] or 0)
+    if load > capacity + EPS:
+        return _over(vehicle_id, load - added_kg, capacity, added_kg)
+    return None
+
+
+# write checks: run by shipments.py / updates.py after the write, in the same transaction, so two
+# writers cannot both pass on the old load (the second one waits for the first one's commit)
+def shipment_check(cur, old: dict | None, new: dict) -> str | None:
+    """A new, heavier or moved Pending / In Transit shipment must fit on its vehicle."""
+    if new["status"] not in ACTIVE_STATUSES:
+        return None
+    same = old is not None and old["status"] in ACTIVE_STATUSES and old["vehicle_id"] == new["vehicle_id"]
+    extra = float(new["weight_kg"] or 0) - (float(old["weight_kg"] or 0) if same else 0.0)
+    return _overload(cur, new["vehicle_id"], extra) if extra > EPS else None
+
+
+def vehicle_check(cur, old, new: dict) -> str | None:
+    """A vehicle's capacity_kg cannot go below the load it carries now."""
+    return _overload(cur, new["id"], 0.0) if "capacity_kg" in new else None
+
+
+# =========================
+# PACKING (pure in-memory, no DB)
+# =========================
+class LoadPlan:
+    """Result of pack(): which vehicle gets each shipment + running load per vehicle."""
+
+    def __init__(self, strategy: str, ship_ids, weights, vehicle_ids, capacities, base_load):
+        self.strategy = strategy
+        self.ship_ids = ship_ids                    # array('q')
+        self.weights = weights                      # array('d')
+        self.vehicle_ids = list(vehicle_ids)
+        self.capacities = list(capacities)
+        self.load = list(base_load)                 # kg per vehicle (kept + planned)
+        self.base_load = list(base_load)            # In Transit + unassigned Pending kg
+        self.slot = array("q", [-1]) * len(ship_ids)   # vehicle index per shipment, -1 = no room
+        self.seconds = 0.0
+
+    def assignments(self):
+        """(shipment_id, vehicle_id) for every shipment that got a vehicle."""
+        vids = self.vehicle_ids
+        for sid, v in zip(self.ship_ids, self.slot):
+            if v >= 0:
+                yield sid, vids[v]
+
+    def unassigned(self) -> list[int]:
+        return [sid for sid, v in zip(self.ship_ids, self.slot) if v < 0]
+
+    def vehicle_rows(self) -> list[tuple]:
+        """(vehicle_id, capacity, kept kg, planned kg, fill %) for each vehicle."""
+        return [
+            (vid, cap, base, load - base, 100.0 * load / cap if cap else 0.0)
+            for vid, cap, base, load in zip(self.vehicle_ids, self.capacities, self.base_load, self.load)
+        ]
+
+    def stats(self) -> dict:
+        n = len(self.ship_ids)
+        left = sum(1 for v in self.slot if v < 0)
+        used = [i for i, (load, base) in enumerate(zip(self.load, self.base_load)) if load > base]
+        cap_used = sum(self.capacities[i] for i in used)
+        return {
+            "strategy": self.strategy,
+            "shipments": n,
+            "assigned": n - left,
+            "unassigned": left,
+            "vehicles": len(self.vehicle_ids),
+            "vehicles_used": len(used),
+            "fill": sum(self.load[i] for i in used) / cap_used if cap_used else 0.0,
+            "seconds": self.seconds,
+            "shipments_per_sec": n / self.seconds if self.seconds else 0.0,
+        }
+
+
+def _first_fit(order, weights, room, slot):
+    # max-tree over the free room of each vehicle: the leftmost vehicle with room >= w in O(log m)
+    size = 1
+    while size < len(room):
+        size *= 2
+    tree = [-1.0] * (2 * size)
+    tree[size:size + len(room)] = room
+    for i in range(size - 1, 0, -1):
+        tree[i] = max(tree[2 * i], tree[2 * i + 1])
+    for k in order:
+        w = weights[k] - EPS
+        if tree[1] < w:
+            continue                    # fits nowhere (the biggest free room is too small)
+        i = 1
+        while i < size:
+            i = 2 * i if tree[2 * i] >= w else 2 * i + 1
+        slot[k] = i - size
+        tree[i] -= weights[k]
+        i //= 2
+        while i:
+            best = max(tree[2 * i], tree[2 * i + 1])
+            if tree[i] == best:
+                break                   # nothing above changes either
+            tree[i] = best
+            i //= 2
+    return tree[size:size + len(room)]
+
+
+def _best_fit(order, weights, room, slot):
+    # sorted (free room, vehicle) list: the smallest room that still fits, by bisection
+    free = sorted((r, v) for v, r in enumerate(room))
+    for k in order:
+        w = weights[k]
+        if not free or free[-1][0] < w - EPS:
+            continue
+        j = bisect_left(free, (w - EPS, -1))
+        r, v = free.pop(j)
+        slot[k] = v
+        insort(free, (r - w, v))
+    out = list(room)
+    for r, v in free:
+        out[v] = r
+    return out
+
+
+def pack(ship_ids, weights, vehicle_ids, capacities, base_load=None, strategy: str = "ffd",
+         current=None) -> LoadPlan:
+    """
+    Assign shipments (ids + kg, parallel sequences) to vehicles (ids + capacity kg).
+    base_load = kg already on each vehicle (In Transit). Heaviest shipment first.
+    current = vehicle id of each shipment now: shipments that fit nowhere stay there, so their kg
+    is reserved on that vehicle and the rest is packed again (until nothing more is left over).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}' (choose: {', '.join(STRATEGIES)})")
+    t0 = time.perf_counter()
+    ship_ids = ship_ids if isinstance(ship_ids, array) else array("q", ship_ids)
+    weights = weights if isinstance(weights, array) else array("d", weights)
+    base_load = list(base_load) if base_load is not None else [0.0] * len(vehicle_ids)
+
+    # biggest free room first, so first fit fills the big trucks before opening small ones
+    vorder = sorted(range(len(vehicle_ids)), key=lambda v: capacities[v] - base_load[v], reverse=True)
+    plan = LoadPlan(strategy, ship_ids, weights, [vehicle_ids[v] for v in vorder],
+                    [float(capacities[v]) for v in vorder], [float(base_load[v]) for v in vorder])
+    order = sorted(range(len(weights)), key=weights.__getitem__, reverse=True)
+    position = {vid: v for v, vid in enumerate(plan.vehicle_ids)}
+
+    fit = _first_fit if strategy == "ffd" else _best_fit
+    while True:
+        room = [max(cap - base, 0.0) for cap, base in zip(plan.capacities, plan.base_load)]
+        left = fit(order, weights, room, plan.slot)
+        stuck = [k for k in order if plan.slot[k] < 0 and current is not None and current[k] in position]
+        if not stuck:
+            break
+        for k in stuck:
+            plan.base_load[position[current[k]]] += weights[k]
+        stuck = set(stuck)
+        order = [k for k in order if k not in stuck]
+        for k in order:
+            plan.slot[k] = -1
+    plan.load = [base + (r0 - r1) for base, r0, r1 in zip(plan.base_load, room, left)]
+    plan.seconds = time.perf_counter() - t0
+    return plan
+
+
+def load_rows(vehicle_rows: list[tuple]) -> list[tuple]:
+    """LoadPlan.vehicle_rows() formatted for a table, see LOAD_HEADERS."""
+    return [(v, f"{c:.1f}", f"{b:.1f}", f"{p:.1f}", f"{f:.1f}") for v, c, b, p, f in vehicle_rows]
+
+
+# =========================
+# DATABASE
+# =========================
+def load_pending():
+    """(ids, weights, current vehicle ids) of every Pending shipment, as compact arrays."""
+    ids, weights, current = array("q"), array("d"), array("q")
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT id, weight_kg, vehicle_id FROM tbl_shipments WHERE status=?", ("Pending",))
+        while True:
+            rows = cur.fetchmany(FETCH_ROWS)
+            if not rows:
+                break
+            for sid, kg, vid in rows:
+                ids.append(sid)
+                weights.append(float(kg or 0))
+                current.append(vid)
+    return ids, weights, current
+
+
+def load_vehicles():
+    """(vehicle ids, capacities, In Transit kg per vehicle)."""
+    vehicles = query("vehicle_capacities")
+    in_transit = {}
+    if not summary_store.is_built():
+        summary_store.rebuild()
+    for key, kg in fetch_all(
+        "SELECT scope_key, weight_kg FROM tbl_summary WHERE scope=? AND status=?", ("vehicle", "In Transit")
+    ):
+        in_transit[key] = kg or 0.0
+    ids = [vid for vid, _ in vehicles]
+    return ids, [float(cap or 0) for _, cap in vehicles], [in_transit.get(str(vid), 0.0) for vid in ids]
+
+
+def plan_pending(strategy: str = "ffd"):
+    """Plan every Pending shipment. Returns (LoadPlan, current vehicle id per shipment)."""
+    ids, weights, current = load_pending()
+    vids, caps, base = load_vehicles()
+    return pack(ids, weights, vids, caps, base, strategy, current), current
+
+
+def apply_plan(plan: LoadPlan, current):
+    """Move shipments whose vehicle changes (through shipments.py, so the counters follow)."""
+    vehicle_of = dict(plan.assignments())
+    rows = ({"id": sid, "vehicle_id": vehicle_of[sid]}
+            for sid, old in zip(plan.ship_ids, current) if sid in vehicle_of and vehicle_of[sid] != old)
+    return updates.bulk_patch("shipments", rows)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Vehicle load planning")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("plan", help="pack Pending shipments onto vehicles")
+    p.add_argument("--strategy", choices=STRATEGIES, default="ffd")
+    p.add_argument("--apply", action="store_true", help="write the new vehicle_id of moved shipments")
+    p = sub.add_parser("check", help="would more kg fit on a vehicle?")
+    p.add_argument("vehicle_id", type=int)
+    p.add_argument("kg", type=float)
+    args = parser.parse_args(argv)
+
+    get_backend().create_schema()
+    if args.cmd == "check":
+        err = check_capacity(args.vehicle_id, args.kg)
+        print(f"❌ {err}" if err else f"✅ Fits ({vehicle_load(args.vehicle_id):.1f} kg loaded now)")
+        return 1 if err else 0
+
+    plan, current = plan_pending(args.strategy)
+    st = plan.stats()
+    render_table("LOAD PLAN", LOAD_HEADERS, load_rows(plan.vehicle_rows()))
+    print(f"✅ {st['assigned']} of {st['shipments']} Pending shipments planned on {st['vehicles_used']}"
+          f" vehicles ({st['fill']:.1%} full) in {st['seconds']:.2f}s; {st['unassigned']} do not fit")
+    if args.apply:
+        res = apply_plan(plan, current)
+        print(f"✅ {res.written} shipment(s) moved to another vehicle, {res.failed} failed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# metrics.py
+# ✅ Latency histograms + counters for the hot paths: pool checkout, SQL execute / fetch, rendering
+# ✅ Prometheus text format: GET /metrics (http_api.py) or a file written when the process ends
+# ✅ Optional cProfile / tracemalloc capture around one CLI command or menu action
+#
+# Metrics:
+#   transport_pool_acquire_seconds             histogram  wait for + open / ping a pooled connection
+#   transport_db_execute_seconds{statement}    histogram  cursor.execute()
+#   transport_db_fetch_seconds{statement}      histogram  fetchall()
+#   transport_db_rows_total{statement}         counter    rows returned (SELECT) / changed (writes)
+#   transport_render_seconds{format}           histogram  render_table()
+# statement = catalog name from statements.py; SQL run through db.fetch_all() is "adhoc".
+#
+#   python cli.py --profile cpu report summary
+#   TRANSPORT_PROFILE=cpu,memory python "fullcode detail.py"      every menu action
+#   TRANSPORT_METRICS_FILE=/var/lib/node_exporter/transport.prom python cli.py batch jobs.jsonl
+#
+# Settings (environment variables):
+#   TRANSPORT_METRICS        0 = off (default on: two perf_counter() calls + one bisect per observation)
+#   TRANSPORT_METRICS_FILE   write the Prometheus text to this file when the process ends
+#   TRANSPORT_PROFILE        cpu / memory / cpu,memory: profile every CLI command / menu action
+#   TRANSPORT_PROFILE_DIR    save .prof / .txt reports here (default: top lines printed to stderr)
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("TRANSPORT_METRICS", "1") != "0"
+METRICS_FILE = os.environ.get("TRANSPORT_METRICS_FILE")
+PROFILE = {p.strip() for p in os.environ.get("TRANSPORT_PROFILE", "").split(",") if p.strip()}
+PROFILE_DIR = os.environ.get("TRANSPORT_PROFILE_DIR")
+PROFILE_KINDS = ("cpu", "memory")
+
+# upper bounds in seconds (0.5 ms .. 10 s); slower calls land in +Inf
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_LINES = 25      # functions / allocation sites shown per profile
+
+HELP = {
+    "transport_pool_acquire_seconds": "Time to get a connection from the pool",
+    "transport_db_execute_seconds": "cursor.execute() time per statement",
+    "transport_db_fetch_seconds": "fetchall() time per statement",
+    "transport_db_rows_total": "Rows returned or changed per statement",
+    "transport_render_seconds": "render_table() time per output format",
+}
+LATENCY_HEADERS = ["Metric", "Labels", "Count", "Avg ms", "p50 ms", "p95 ms", "p99 ms", "Max ms"]
+
+
+class Histogram:
+    """Counts per bucket + sum + max (buckets are not cumulative until exported)."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th value (max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+
+_lock = threading.Lock()
+_histograms = {}    # (name, labels) -> Histogram, labels = tuple of (key, value)
+_counters = {}      # (name, labels) -> number
+_db_hists = {}      # statement -> (execute, fetch) histograms, see db_call()
+
+
+# =========================
+# RECORDING
+# =========================
+def observe(name: str, seconds: float, **labels):
+    if not ENABLED:
+        return
+    key = (name, tuple(labels.items()))
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = Histogram()
+        h.observe(seconds)
+
+
+def inc(name: str, n: float = 1, **labels):
+    if not ENABLED:
+        return
+    key = (name, tuple(labels.items()))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def db_call(statement: str, execute_s: float, fetch_s: float | None, rows: int):
+    """One SQL call: both histograms + the row counter under one lock (the hottest path)."""
+    if not ENABLED:
+        return
+    labels = (("statement", statement),)
+    with _lock:
+        hists = _db_hists.get(statement)
+        if hists is None:
+            hists = _db_hists[statement] = (
+                _histograms.setdefault(("transport_db_execute_seconds", labels), Histogram()),
+                _histograms.setdefault(("transport_db_fetch_seconds", labels), Histogram()),
+            )
+        hists[0].observe(execute_s)
+        if fetch_s is not None:
+            hists[1].observe(fetch_s)
+        key = ("transport_db_rows_total", labels)
+        _counters[key] = _counters.get(key, 0) + rows
+
+
+@contextmanager
+def timed(name: str, **labels):
+    """with timed("transport_render_seconds", format="text"): ..."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0, **labels)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _db_hists.clear()
+
+
+# =========================
+# OUTPUT
+# =========================
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}" if labels else ""
+
+
+def prometheus() -> str:
+    """Everything recorded so far in the Prometheus text exposition format."""
+    with _lock:
+        hists = {k: (list(h.counts), h.count, h.total) for k, h in _histograms.items() if h.count}
+        counters = dict(_counters)
+    lines = []
+    for name in sorted({n for n, _ in hists}):
+        lines.append(f"# HELP {name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} histogram")
+        for (n, labels), (counts, count, total) in sorted(hists.items()):
+            if n != name:
+                continue
+            running = 0
+            for bound, c in zip(BUCKETS, counts):
+                running += c
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {running}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# HELP {name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path: str | None = None) -> str | None:
+    """Write prometheus() to a file (atomically: temp file + rename). Returns the path."""
+    path = path or METRICS_FILE
+    if not path:
+        return None
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus())
+    os.replace(tmp, path)
+    return path
+
+
+def latency_rows() -> list[tuple]:
+    """One row per histogram, slowest total first, see LATENCY_HEADERS."""
+    with _lock:
+        items = [(name, labels, h.count, h.total, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99), h.max)
+                 for (name, labels), h in _histograms.items() if h.count]
+    items.sort(key=lambda t: -t[3])
+    return [
+        (name.removeprefix("transport_").removesuffix("_seconds"), ",".join(f"{k}={v}" for k, v in labels),
+         count, f"{1000 * total / count:.2f}", f"{1000 * p50:.2f}", f"{1000 * p95:.2f}", f"{1000 * p99:.2f}",
+         f"{1000 * top:.2f}")
+        for name, labels, count, total, p50, p95, p99, top in items
+    ]
+
+
+if METRICS_FILE:
+    atexit.register(write_file)
+
+
+# =========================
+# PROFILING
+# =========================
+def _report_path(label: str, ext: str) -> str:
+    safe = re.sub(r"[^\w.-]+", "_", label).strip("_") or "run"
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    return os.path.join(PROFILE_DIR, f"{safe}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.{ext}")
+
+
+def _emit(label: str, kind: str, text: str):
+    if PROFILE_DIR:
+        path = _report_path(f"{label}-{kind}", "txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"💡 {kind} profile of '{label}' saved to {path}", file=sys.stderr)
+    else:
+        print(f"\n===== {kind.upper()} PROFILE: {label} =====\n{text}", file=sys.stderr)
+
+
+@contextmanager
+def profile(label: str, kinds=None):
+    """
+    Profile the block with cProfile ("cpu") and / or tracemalloc ("memory").
+    kinds defaults to TRANSPORT_PROFILE; nothing is done (and nothing costs) when it is empty.
+    """
+    kinds = set(PROFILE if kinds is None else kinds)
+    unknown = kinds - set(PROFILE_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown profile kind '{', '.join(sorted(unknown))}' (choose: {', '.join(PROFILE_KINDS)})")
+    if not kinds:
+        yield
+        return
+
+    prof = cProfile.Profile() if "cpu" in kinds else None
+    trace = "memory" in kinds and not tracemalloc.is_tracing()
+    if trace:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    if prof:
+        prof.enable()
+    try:
+        yield
+    finally:
+        if prof:
+            prof.disable()
+        seconds = time.perf_counter() - t0
+        if prof:
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            if PROFILE_DIR:
+                prof.dump_stats(_report_path(f"{label}-cpu", "prof"))   # for snakeviz / pstats
+            _emit(label, "cpu", f"{seconds:.3f}s wall\n{buf.getvalue()}")
+        if "memory" in kinds and tracemalloc.is_tracing():
+            snap = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if trace:
+                tracemalloc.stop()
+            top = snap.statistics("lineno")[:PROFILE_LINES]
+            lines = [f"current {current / 1024 / 1024:.1f} MB, peak {peak / 1024 / 1024:.1f} MB"]
+            lines += [str(s) for s in top]
+            _emit(label, "memory", "\n".join(lines) + "\n")
@@ -0,0 +1,89 @@
+# pagination.py
+# ✅ Keyset ("seek") pagination for the list views
+# ✅ Each page is one small query: WHERE (key) after (last key seen) ORDER BY key, TOP/LIMIT n
+#
+# Unlike OFFSET paging, page 1000 costs the same as page 1, and only one page of rows
+# is ever in memory. The last key column must be unique (use id as the tie-breaker).
+#
+# Page size: argument, or TRANSPORT_PAGE_SIZE (default 50).
+
+import os
+
+from db import fetch_all
+from db_backend import get_backend
+
+DEFAULT_PAGE_SIZE = int(os.environ.get("TRANSPORT_PAGE_SIZE", "50"))
+
+
+def _after_clause(keys: list[tuple[str, int]], desc: bool):
+    """
+    (k1, k2) after (v1, v2) ->  k1 > ? OR (k1 = ? AND k2 > ?)
+    Returns (sql, builder) where builder(values) makes the params in the right order.
+    """
+    op = "<" if desc else ">"
+    parts = []
+    for i, (col, _) in enumerate(keys):
+        eqs = [f"{c} = ?" for c, _ in keys[:i]]
+        parts.append("(" + " AND ".join(eqs + [f"{col} {op} ?"]) + ")")
+
+    def build(values: tuple) -> tuple:
+        params = []
+        for i in range(len(keys)):
+            params.extend(values[:i + 1])
+        return tuple(params)
+
+    return "(" + " OR ".join(parts) + ")", build
+
+
+def page_query(select_sql: str, keys: list[tuple[str, int]], after: tuple | None = None,
+               desc: bool = False, where: str = "", params: tuple = (),
+               page_size: int | None = None):
+    """(sql, params) for one page; asks for one extra row to know if there is a next page."""
+    size = page_size or DEFAULT_PAGE_SIZE
+    conds, all_params = [], list(params)
+    if where:
+        conds.append(f"({where})")
+    if after is not None:
+        clause, build = _after_clause(keys, desc)
+        conds.append(clause)
+        all_params.extend(build(tuple(after)))
+
+    direction = " DESC" if desc else ""
+    sql = select_sql
+    if conds:
+        sql += " WHERE " + " AND ".join(conds)
+    sql += " ORDER BY " + ", ".join(col + direction for col, _ in keys)
+    return get_backend().limit(sql, size + 1), tuple(all_params)
+
+
+def fetch_page(select_sql: str, keys: list[tuple[str, int]], after: tuple | None = None,
+               desc: bool = False, where: str = "", params: tuple = (),
+               page_size: int | None = None):
+    """
+    One page of a SELECT ordered by `keys`.
+      select_sql : "SELECT ... FROM ..." (no WHERE / ORDER BY)
+      keys       : [(sql column, position in the result row), ...], last one unique
+      after      : cursor returned by the previous call (None = first page)
+      where      : extra filter, e.g. "s.customer_id = ?", with its params
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    size = page_size or DEFAULT_PAGE_SIZE
+    sql, all_params = page_query(select_sql, keys, after, desc, where, params, size)
+    rows = fetch_all(sql, all_params)
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    last = rows[-1]
+    return rows, tuple(last[pos] for _, pos in keys)
+
+
+def iter_pages(select_sql: str, keys: list[tuple[str, int]], desc: bool = False,
+               where: str = "", params: tuple = (), page_size: int | None = None):
+    """Generator of pages (lists of rows), fetched lazily one query at a time."""
+    after = None
+    while True:
+        rows, after = fetch_page(select_sql, keys, after, desc, where, params, page_size)
+        if rows:
+            yield rows
+        if after is None:
+            return
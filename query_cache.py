@@ -0,0 +1,207 @@
+# query_cache.py
+# ✅ LRU + TTL cache for SELECT results, keyed by (SQL, params)
+# ✅ Writes drop every cached result that read from the written table
+#
+# db.fetch_all() looks here first; db.safe_execute() and the other write paths call
+# invalidate_sql() / invalidate() after a successful write. Results from other processes
+# are only as fresh as the TTL, so keep it short (or set the size to 0 to turn caching off).
+# A miss takes generation() before it reads the database: if a write invalidates one of its
+# tables meanwhile, put() drops the (possibly stale) rows instead of caching them.
+#
+# Settings (environment variables):
+#   TRANSPORT_CACHE_SIZE      max cached results            (default 256, 0 = off)
+#   TRANSPORT_CACHE_TTL       seconds a result stays valid  (default 5)
+#   TRANSPORT_CACHE_MAX_MB    memory budget, estimated      (default 64)
+#   TRANSPORT_CACHE_MAX_ROWS  larger results are not cached (default 10000)
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+# tables a SELECT reads: FROM tbl / JOIN tbl / FROM ((tbl AS s ...
+READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s*\(*\s*\[?(\w+)", re.IGNORECASE)
+# table a write statement changes
+WRITE_TABLE = re.compile(r"^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+\[?(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def tables_read(sql: str) -> frozenset:
+    return frozenset(t.lower() for t in READ_TABLES.findall(sql))
+
+
+def table_written(sql: str) -> str | None:
+    """Table changed by an INSERT/UPDATE/DELETE, or None for anything else (DDL, ...)."""
+    m = WRITE_TABLE.match(sql)
+    return m.group(1).lower() if m else None
+
+
+def _estimate_bytes(rows) -> int:
+    size = sys.getsizeof(rows)
+    for r in rows:
+        size += sys.getsizeof(r)
+        for v in r:
+            size += sys.getsizeof(v)
+    return size
+
+
+class QueryCache:
+    def __init__(self, max_entries: int = 256, ttl: float = 5.0,
+                 max_bytes: int = 64 << 20, max_rows: int = 10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self._data = OrderedDict()      # key -> (rows, tables, expires_at, nbytes); oldest first
+        self._by_table = {}             # table -> set(keys)
+        self._generations = {}          # table -> invalidations so far, see generation()
+        self._generation_all = 0        # invalidate() without tables
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.invalidations = 0
+        self.stale = 0                  # results not cached: their table was written during the read
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    # ---------- lookups ----------
+    def get(self, sql: str, params: tuple):
+        """Cached rows (a fresh list) or None."""
+        key = (sql, tuple(params))
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[2] < time.monotonic():
+                self._drop(key)
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def generation(self, sql: str) -> tuple:
+        """Take before running a query on a miss; pass to put() with its rows."""
+        tables = tables_read(sql)
+        with self._lock:
+            return self._generation_of(tables)
+
+    def _generation_of(self, tables) -> tuple:
+        # caller holds the lock
+        return (self._generation_all, *(self._generations.get(t, 0) for t in sorted(tables)))
+
+    def put(self, sql: str, params: tuple, rows, generation: tuple | None = None):
+        """Cache rows; skipped if one of the tables was invalidated since generation() was taken."""
+        if not self.enabled or len(rows) > self.max_rows:
+            return
+        key = (sql, tuple(params))
+        tables = tables_read(sql)
+        nbytes = _estimate_bytes(rows)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation_of(tables):
+                self.stale += 1
+                return
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (tuple(rows), tables, time.monotonic() + self.ttl, nbytes)
+            self._bytes += nbytes
+            for t in tables:
+                self._by_table.setdefault(t, set()).add(key)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    # ---------- invalidation ----------
+    def invalidate(self, *tables: str):
+        """Drop every result that read from any of these tables (no tables = drop everything)."""
+        with self._lock:
+            if not tables:
+                self._generation_all += 1
+                self.invalidations += len(self._data)
+                self._data.clear()
+                self._by_table.clear()
+                self._bytes = 0
+                return
+            for t in tables:
+                t = t.lower()
+                self._generations[t] = self._generations.get(t, 0) + 1
+                for key in list(self._by_table.get(t, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def invalidate_sql(self, sql: str):
+        """Invalidate after a write statement; unknown statements (DDL, ...) clear the cache."""
+        table = table_written(sql)
+        if table:
+            self.invalidate(table)
+        else:
+            self.invalidate()
+
+    def _drop(self, key):
+        # caller holds the lock
+        rows, tables, _, nbytes = self._data.pop(key)
+        self._bytes -= nbytes
+        for t in tables:
+            keys = self._by_table.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[t]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "stale": self.stale,
+            }
+
+
+# =========================
+# SHARED CACHE
+# =========================
+_cache = QueryCache(
+    max_entries=int(os.environ.get("TRANSPORT_CACHE_SIZE", "256")),
+    ttl=float(os.environ.get("TRANSPORT_CACHE_TTL", "5")),
+    max_bytes=int(float(os.environ.get("TRANSPORT_CACHE_MAX_MB", "64")) * (1 << 20)),
+    max_rows=int(os.environ.get("TRANSPORT_CACHE_MAX_ROWS", "10000")),
+)
+
+
+def get_cache() -> QueryCache:
+    return _cache
+
+
+def set_cache(cache: QueryCache) -> QueryCache:
+    global _cache
+    _cache = cache
+    return cache
+
+
+def invalidate(*tables: str):
+    _cache.invalidate(*tables)
+
+
+def invalidate_sql(sql: str):
+    _cache.invalidate_sql(sql)
@@ -0,0 +1,206 @@
+# render.py
+# ✅ Fast table output for the menus: aligned columns, one buffered write per block of rows
+# ✅ Text (aligned), TSV or JSON; long cells cut to max_width; optional row limit + paging
+#
+# Column widths come from the headers + a bounded sample of rows (the first ones, plus rows
+# spread over the list when the whole list is known), so a 50k-row result is not scanned twice.
+#
+# Default format for the menus: TRANSPORT_OUTPUT = text | tsv | json
+
+import json
+import os
+import sys
+from datetime import datetime
+from itertools import islice
+
+import metrics
+
+DEFAULT_FORMAT = os.environ.get("TRANSPORT_OUTPUT", "text")
+SAMPLE_ROWS = 200       # rows looked at to size the columns
+MAX_WIDTH = 40          # longest cell shown in text mode (longer ones are cut with "…")
+BLOCK_ROWS = 5000       # rows formatted per write() call
+LINE = "=" * 100
+
+
+def _cell(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, datetime):
+        return str(v)[:19]          # drop microseconds
+    return str(v)
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _column_layout(headers, sample, max_width: int):
+    """(widths, right_align, is_datetime) from the headers and a sample of rows."""
+    n = len(headers)
+    widths = [len(h) for h in headers]
+    numeric = [True] * n
+    dates = [False] * n
+    seen = [False] * n
+    for r in sample:
+        for i, v in enumerate(r):
+            size = 19 if isinstance(v, datetime) else len(str(v))
+            if size > widths[i]:
+                widths[i] = size
+            if v is not None:
+                seen[i] = True
+                if isinstance(v, datetime):
+                    dates[i] = True
+                if numeric[i] and not _is_number(v):
+                    numeric[i] = False
+    widths = [min(w, max_width) for w in widths]
+    right = [numeric[i] and seen[i] for i in range(n)]
+    return widths, right, dates
+
+
+def _text_formatter(widths, right, dates):
+    """
+    Returns fmt(row) -> line. Fast path: one "%"-format per row, which calls str() on every
+    cell itself (datetime columns are cut to seconds by the precision, None shows as "None"
+    like the old print_table). Only rows whose line comes out longer than expected
+    (a cell wider than its column) take the slow path, which cuts text cells with "…"
+    and lets numbers overflow rather than lose digits.
+    """
+    specs = []
+    for w, r, d in zip(widths, right, dates):
+        specs.append(f"%-{w}.{w}s" if d else (f"%{w}s" if r else f"%-{w}s"))
+    template = " | ".join(specs)
+    line_len = sum(widths) + 3 * (len(widths) - 1)
+
+    def fmt(row) -> str:
+        line = template % (row if type(row) is tuple else tuple(row))
+        if len(line) == line_len:
+            return line
+        cells = list(map(str, row))
+        for i, w in enumerate(widths):
+            if len(cells[i]) > w and not right[i] and not dates[i]:
+                cells[i] = cells[i][:w - 1] + "…"
+        return template % tuple(cells)
+
+    return fmt
+
+
+def _sample(rows, first: list, size: int) -> list:
+    """The first rows, plus (for lists) rows spread over the whole list, so late wide values count."""
+    if not isinstance(rows, (list, tuple)) or len(rows) <= len(first):
+        return first
+    step = max(1, len(rows) // size)
+    return first + list(rows[len(first)::step]) + [rows[-1]]
+
+
+def _tsv_cell(v) -> str:
+    return _cell(v).replace("\t", " ").replace("\r", " ").replace("\n", " ")
+
+
+def _tsv_formatter(n: int):
+    """One "%"-format per row; rows with tabs/newlines inside a cell take the slow, cleaning path."""
+    template = "\t".join(["%s"] * n)
+
+    def fmt(row) -> str:
+        line = template % (row if type(row) is tuple else tuple(row))
+        if line.count("\t") == n - 1 and "\n" not in line and "\r" not in line and "None" not in line:
+            return line
+        return "\t".join(map(_tsv_cell, row))
+
+    return fmt
+
+
+def render_table(title: str, headers: list[str], rows, out=None, fmt: str | None = None,
+                 max_rows: int | None = None, max_width: int = MAX_WIDTH,
+                 sample: int = SAMPLE_ROWS) -> int:
+    """
+    Write a table. rows can be a list or any iterable (streamed in blocks).
+    max_rows: stop after that many rows and say how many were left out (lists only know the total).
+    Returns the number of rows written. Timed as transport_render_seconds (metrics.py);
+    for a streamed iterable that includes fetching the rows.
+    """
+    fmt = fmt or DEFAULT_FORMAT
+    with metrics.timed("transport_render_seconds", format=fmt):
+        return _render(title, headers, rows, out or sys.stdout, fmt, max_rows, max_width, sample)
+
+
+def _render(title, headers, rows, out, fmt, max_rows, max_width, sample) -> int:
+    it = iter(rows)
+    first = list(islice(it, sample))
+    total_known = len(rows) if isinstance(rows, (list, tuple)) else None
+
+    if fmt == "tsv":
+        line_fmt = _tsv_formatter(len(headers))
+        write_block = lambda block: "\n".join(map(line_fmt, block)) + "\n"
+        out.write("\t".join(headers) + "\n")
+    elif fmt == "json":
+        keys = list(headers)
+        write_block = None
+    elif fmt == "text":
+        out.write(f"\n{LINE}\n{title}\n{LINE}\n")
+        if not first:
+            out.write(f"⚠️ No data\n{LINE}\n")
+            return 0
+        widths, right, dates = _column_layout(headers, _sample(rows, first, sample), max_width)
+        line_fmt = _text_formatter(widths, right, dates)
+        out.write(line_fmt(tuple(headers)).rstrip() + "\n" + "-" * 100 + "\n")
+        write_block = lambda block: "\n".join(map(line_fmt, block)) + "\n"
+    else:
+        raise ValueError(f"Unknown output format '{fmt}' (choose: text, tsv, json)")
+
+    count = 0
+    block = first
+    if fmt == "json":
+        out.write("[")
+    while block:
+        if max_rows is not None and count + len(block) > max_rows:
+            block = block[:max_rows - count]
+        if fmt == "json":
+            # one dumps() per block; strip the [ ] so blocks join into one array
+            text = json.dumps([dict(zip(keys, r)) for r in block], default=_cell, ensure_ascii=False)
+            out.write(("," if count else "") + text[1:-1])
+        else:
+            out.write(write_block(block))
+        count += len(block)
+        if max_rows is not None and count >= max_rows:
+            break
+        block = list(islice(it, BLOCK_ROWS))
+    if fmt == "json":
+        out.write("]\n")
+
+    if fmt == "text":
+        if max_rows is not None and count >= max_rows and (total_known is None or total_known > count):
+            more = f"{total_known - count} more rows" if total_known is not None else "more rows"
+            out.write(f"... ({more} not shown)\n")
+        out.write(LINE + "\n")
+    out.flush()
+    return count
+
+
+def render_pages(title: str, headers: list[str], pages, out=None, fmt: str | None = None,
+                 ask=input) -> int:
+    """
+    Show pages (iterable of row lists) one at a time; ask() decides whether to go on
+    (Enter = next page, q = stop). Machine formats print every page without asking.
+    """
+    fmt = fmt or DEFAULT_FORMAT
+    it = iter(pages)
+    rows = next(it, None)
+    if rows is None:
+        return render_table(title, headers, [], out, fmt)
+    if fmt != "text":
+        def all_rows():
+            r = rows
+            while r is not None:
+                yield from r
+                r = next(it, None)
+        return render_table(title, headers, all_rows(), out, fmt)
+
+    page, shown = 1, 0
+    while True:
+        shown += render_table(f"{title} - page {page}", headers, rows, out, fmt)
+        rows = next(it, None)
+        if rows is None:
+            return shown
+        if ask("Enter = next page, q = stop: ").strip().lower() == "q":
+            return shown
+        page += 1
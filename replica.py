@@ -0,0 +1,395 @@
+# replica.py
+# ✅ Incremental one-way copy of the database (Access) into a SQLite file for read-only readers
+# ✅ Each pass pulls only what changed since the last one (watermarks) and applies it in batches
+# ✅ Reports rows/sec and replication lag
+#
+#   python replica.py sync                  one pass (the first pass copies everything, resumable)
+#   python replica.py sync --every 30       keep syncing every 30 seconds (Ctrl+C stops)
+#   python replica.py sync --full           empty the replica and copy everything again
+#   python replica.py status                watermarks, changes waiting, lag
+#   python replica.py prune --days 30       drop change log rows the replica already has (on the source)
+#
+# Readers use the replica like any database: TRANSPORT_BACKEND=sqlite TRANSPORT_DB_PATH=replica.db
+# It has the same tables, indexes, summary counters and search index. Never write to it.
+#
+# What a pass pulls (watermarks are kept in the replica, tbl_sync_state):
+#   tbl_shipments        first pass: every row by id; the id watermark is saved with each batch,
+#                        so a broken copy continues where it stopped.
+#                        Then: the shipments named in tbl_change_log after the seq watermark.
+#                        A shipment that is gone on the source is a tombstone -> deleted here.
+#   tbl_shipment_events  append-only: rows after the id watermark
+#   customers / drivers / vehicles   small tables: compared in full every pass
+#
+# tbl_change_log gets one row per shipment insert / update / delete from the shipments.py write
+# hook, in the same transaction. Shipments have no "updated_at", and hi/lo IDs (id_alloc.py) are
+# not committed in id order, so an id / created_at watermark alone would miss edits and late blocks.
+# Each pass re-reads the last OVERLAP log rows and events, so a writer that committed late with a
+# smaller number is still picked up (applying a row twice changes nothing).
+#
+# Lag = age of the oldest change the replica does not have yet (0 when it is up to date).
+# Both sides use local time, so the clocks of the two machines must agree.
+#
+# Settings (environment variables):
+#   TRANSPORT_REPLICA_PATH   replica file (default replica.db)
+#   TRANSPORT_REPLICA_BATCH  rows per batch; one replica transaction each (default 5000)
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import entities
+import query_cache
+import search_index
+import summary_store
+from db import get_conn
+from db_backend import SQLiteBackend, get_backend
+from indexes import INDEXES
+
+DEFAULT_REPLICA_PATH = os.environ.get("TRANSPORT_REPLICA_PATH", "replica.db")
+DEFAULT_BATCH = int(os.environ.get("TRANSPORT_REPLICA_BATCH", "5000"))
+OVERLAP = 500       # log rows / events re-read at the start of each pass
+IN_CHUNK = 200      # IDs per "WHERE id IN (...)"
+
+SHIPMENT_COLUMNS = entities.columns("shipments")
+EVENT_COLUMNS = ("id", "shipment_id", "old_status", "new_status", "changed_at")
+DIMENSIONS = ("customers", "drivers", "vehicles")
+
+STATE_DDL = "CREATE TABLE IF NOT EXISTS tbl_sync_state (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+# emptied by --full, in this order
+REPLICATED = ("tbl_shipment_events", "tbl_shipments", "tbl_summary", "tbl_search_terms", "tbl_search_docs",
+              "tbl_vehicles", "tbl_drivers", "tbl_customers", "tbl_sync_state")
+
+
+# =========================
+# CHANGE LOG (write hook, called by shipments.py)
+# =========================
+def on_shipment_write(cur, changes: list):
+    """Write hook: one tbl_change_log row per inserted / updated / deleted shipment."""
+    now = datetime.now()
+    rows = []
+    for old, new in changes:
+        op = "I" if old is None else "D" if new is None else "U"
+        rows.append(("tbl_shipments", (new or old)["id"], op, now))
+    if rows:
+        cur.executemany(
+            "INSERT INTO tbl_change_log (table_name, row_id, op, changed_at) VALUES (?, ?, ?, ?)", rows
+        )
+
+
+# =========================
+# REPLICA
+# =========================
+class Replica:
+    """The SQLite replica, on its own connection (the pool serves the source)."""
+
+    def __init__(self, path: str = DEFAULT_REPLICA_PATH):
+        self.path = path
+        self.backend = SQLiteBackend(path)
+        self.backend.create_schema()
+        self.conn = self.backend.connect()
+        # readers keep reading while a batch is written
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        # the source already checked the foreign keys; rows arrive in any order here
+        self.conn.execute("PRAGMA foreign_keys = OFF")
+        cur = self.conn.cursor()
+        cur.execute(STATE_DDL)
+        existing = {n.lower() for table in {t for _, t, _ in INDEXES}
+                    for n in self.backend.index_names(self.conn, table)}
+        for name, table, cols in INDEXES:
+            if name.lower() not in existing:
+                cur.execute(f"CREATE INDEX {name} ON {table} ({', '.join(cols)})")
+        self.conn.commit()
+
+    def get(self, name: str, default=None):
+        cur = self.conn.cursor()
+        cur.execute("SELECT value FROM tbl_sync_state WHERE name=?", (name,))
+        row = cur.fetchone()
+        return row[0] if row else default
+
+    def put(self, cur, name: str, value):
+        """Save a watermark (inside the caller's transaction, together with the rows)."""
+        value = value.isoformat(" ") if isinstance(value, datetime) else str(value)
+        cur.execute("INSERT OR REPLACE INTO tbl_sync_state (name, value) VALUES (?, ?)", (name, value))
+
+    def reset(self):
+        """Empty every replicated table and forget the watermarks (next pass copies everything)."""
+        cur = self.conn.cursor()
+        for table in REPLICATED:
+            cur.execute(f"DELETE FROM {table}")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+        self.backend.close()
+
+
+def _plain(row) -> tuple:
+    # Access CURRENCY comes back as Decimal, the replica stores REAL
+    return tuple(float(v) if isinstance(v, Decimal) else v for v in row)
+
+
+def _source_rows(scur, table: str, cols, ids) -> dict:
+    """{id: row} for a list of IDs (works on the replica cursor too)."""
+    out = {}
+    for i in range(0, len(ids), IN_CHUNK):
+        chunk = ids[i:i + IN_CHUNK]
+        scur.execute(f"SELECT {', '.join(cols)} FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})",
+                     chunk)
+        out.update((r[0], _plain(r)) for r in scur.fetchall())
+    return out
+
+
+def _upsert(cur, table: str, cols, rows: list):
+    cur.executemany(
+        f"INSERT OR REPLACE INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})", rows
+    )
+
+
+def _as_dict(row):
+    return dict(zip(SHIPMENT_COLUMNS, row)) if row is not None else None
+
+
+# =========================
+# ONE PASS
+# =========================
+def _sync_dimensions(scur, replica: Replica) -> int:
+    """Copy customers / drivers / vehicles that differ, delete the ones gone. Returns rows written."""
+    cur = replica.conn.cursor()
+    written = 0
+    for entity in DIMENSIONS:
+        table, cols = f"tbl_{entity}", entities.columns(entity)
+        scur.execute(f"SELECT {', '.join(cols)} FROM {table}")
+        src = {r[0]: _plain(r) for r in scur.fetchall()}
+        cur.execute(f"SELECT {', '.join(cols)} FROM {table}")
+        have = {r[0]: tuple(r) for r in cur.fetchall()}
+        changed = [row for rid, row in src.items() if have.get(rid) != row]
+        gone = [(rid,) for rid in have if rid not in src]
+        _upsert(cur, table, cols, changed)
+        cur.executemany(f"DELETE FROM {table} WHERE id=?", gone)
+        search_index.sync_rows(cur, entity, [r[0] for r in changed] + [g[0] for g in gone])
+        written += len(changed) + len(gone)
+    replica.conn.commit()
+    return written
+
+
+def _copy_shipments(scur, replica: Replica, batch: int, stats: dict):
+    """First pass: every shipment by id, one batch per transaction."""
+    sql = get_backend().limit(
+        f"SELECT {', '.join(SHIPMENT_COLUMNS)} FROM tbl_shipments WHERE id > ? ORDER BY id", batch
+    )
+    after = int(replica.get("copy_id", 0))
+    cur = replica.conn.cursor()
+    while True:
+        scur.execute(sql, (after,))
+        rows = [_plain(r) for r in scur.fetchall()]
+        if not rows:
+            break
+        _upsert(cur, "tbl_shipments", SHIPMENT_COLUMNS, rows)
+        added = [(None, _as_dict(r)) for r in rows]
+        summary_store.on_shipment_write(cur, added)
+        search_index.on_shipment_write(cur, added)
+        after = rows[-1][0]
+        replica.put(cur, "copy_id", after)
+        replica.conn.commit()
+        stats["shipments"] += len(rows)
+    # the counters + search index were kept while copying, so readers need no rebuild()
+    cur.execute(
+        "INSERT OR REPLACE INTO tbl_summary (scope, scope_key, status, shipments, price_usd, weight_kg)"
+        " VALUES (?, ?, ?, 0, 0, 0)",
+        summary_store.BUILT_MARKER,
+    )
+    cur.execute("INSERT OR REPLACE INTO tbl_search_docs (kind, ref, label, uses) VALUES (?, ?, '', 0)",
+                search_index.BUILT_MARKER)
+    replica.put(cur, "copy_id", "done")
+    replica.conn.commit()
+
+
+def _apply_changes(scur, replica: Replica, batch: int, stats: dict):
+    """Shipments named in the change log after the watermark: copy them, or delete the ones gone."""
+    sql = get_backend().limit(
+        "SELECT seq, row_id, changed_at FROM tbl_change_log WHERE seq > ? AND table_name=? ORDER BY seq", batch
+    )
+    mark = int(replica.get("change_seq", 0))
+    after = max(mark - OVERLAP, 0)
+    cur = replica.conn.cursor()
+    while True:
+        scur.execute(sql, (after, "tbl_shipments"))
+        log = scur.fetchall()
+        if not log:
+            break
+        ids = list(dict.fromkeys(rid for _, rid, _ in log))
+        new = _source_rows(scur, "tbl_shipments", SHIPMENT_COLUMNS, ids)
+        old = _source_rows(cur, "tbl_shipments", SHIPMENT_COLUMNS, ids)
+        changes = [(old.get(rid), new.get(rid)) for rid in ids if old.get(rid) != new.get(rid)]
+        _upsert(cur, "tbl_shipments", SHIPMENT_COLUMNS, [n for _, n in changes if n is not None])
+        cur.executemany("DELETE FROM tbl_shipments WHERE id=?", [(o[0],) for o, n in changes if n is None])
+        pairs = [(_as_dict(o), _as_dict(n)) for o, n in changes]
+        summary_store.on_shipment_write(cur, pairs)
+        search_index.on_shipment_write(cur, pairs)
+        after = log[-1][0]
+        if after > mark:
+            mark = after
+            replica.put(cur, "change_seq", mark)
+        replica.conn.commit()
+        stats["shipments"] += sum(1 for _, n in changes if n is not None)
+        stats["deleted"] += sum(1 for _, n in changes if n is None)
+        if len(log) < batch:
+            break
+
+
+def _copy_events(scur, replica: Replica, batch: int, stats: dict):
+    """Append-only event log: rows after the id watermark (re-read rows are ignored)."""
+    sql = get_backend().limit(
+        f"SELECT {', '.join(EVENT_COLUMNS)} FROM tbl_shipment_events WHERE id > ? ORDER BY id", batch
+    )
+    mark = int(replica.get("event_id", 0))
+    after = max(mark - OVERLAP, 0)
+    cur = replica.conn.cursor()
+    while True:
+        scur.execute(sql, (after,))
+        rows = [_plain(r) for r in scur.fetchall()]
+        if not rows:
+            break
+        before = replica.conn.total_changes
+        cur.executemany(
+            f"INSERT OR IGNORE INTO tbl_shipment_events ({', '.join(EVENT_COLUMNS)})"
+            f" VALUES ({', '.join('?' * len(EVENT_COLUMNS))})",
+            rows,
+        )
+        stats["events"] += replica.conn.total_changes - before
+        after = rows[-1][0]
+        if after > mark:
+            mark = after
+            replica.put(cur, "event_id", mark)
+        replica.conn.commit()
+        if len(rows) < batch:
+            break
+
+
+def _behind(scur, replica: Replica) -> tuple[int, float]:
+    """(change log rows the replica has not applied, age in seconds of the oldest one)."""
+    mark = int(replica.get("change_seq", 0))
+    scur.execute("SELECT COUNT(*) FROM tbl_change_log WHERE seq > ?", (mark,))
+    pending = scur.fetchone()[0]
+    if not pending:
+        return 0, 0.0
+    scur.execute(get_backend().limit("SELECT changed_at FROM tbl_change_log WHERE seq > ? ORDER BY seq", 1),
+                 (mark,))
+    oldest = scur.fetchone()[0]
+    return pending, max((datetime.now() - oldest).total_seconds(), 0.0)
+
+
+def sync(replica: Replica, batch: int = DEFAULT_BATCH, full: bool = False) -> dict:
+    """
+    One pass: source -> replica. Returns
+    {"rows", "shipments", "deleted", "events", "dimensions", "seconds", "rows_per_sec", "pending", "lag_seconds"}
+    (pending / lag_seconds = what is still missing when the pass ends).
+    """
+    t0 = time.perf_counter()
+    stats = {"shipments": 0, "deleted": 0, "events": 0, "dimensions": 0}
+    if full:
+        replica.reset()
+    with get_conn() as src:
+        scur = src.cursor()
+        if replica.get("change_seq") is None:
+            # first pass: start the log watermark BEFORE copying, so writes during the copy are replayed
+            scur.execute("SELECT MAX(seq) FROM tbl_change_log")
+            cur = replica.conn.cursor()
+            replica.put(cur, "change_seq", scur.fetchone()[0] or 0)
+            replica.conn.commit()
+        stats["dimensions"] = _sync_dimensions(scur, replica)
+        if replica.get("copy_id") != "done":
+            _copy_shipments(scur, replica, batch, stats)
+        _apply_changes(scur, replica, batch, stats)
+        _copy_events(scur, replica, batch, stats)
+        stats["pending"], stats["lag_seconds"] = _behind(scur, replica)
+
+    cur = replica.conn.cursor()
+    replica.put(cur, "synced_at", datetime.now())
+    replica.conn.commit()
+    stats["rows"] = stats["shipments"] + stats["deleted"] + stats["events"] + stats["dimensions"]
+    stats["seconds"] = time.perf_counter() - t0
+    stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def status(replica: Replica) -> dict:
+    """Watermarks of the replica + how far behind the source it is."""
+    with get_conn() as src:
+        pending, lag = _behind(src.cursor(), replica)
+    return {
+        "replica": replica.path,
+        "copy": "done" if replica.get("copy_id") == "done" else f"up to id {replica.get('copy_id', 0)}",
+        "change_seq": int(replica.get("change_seq", 0)),
+        "event_id": int(replica.get("event_id", 0)),
+        "synced_at": replica.get("synced_at", "never"),
+        "pending": pending,
+        "lag_seconds": lag,
+    }
+
+
+def prune(replica: Replica, days: float) -> int:
+    """
+    Delete change log rows older than `days` that this replica has already applied (minus OVERLAP).
+    With several replicas, prune against the one that is furthest behind. Returns rows deleted.
+    """
+    keep_from = int(replica.get("change_seq", 0)) - OVERLAP
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM tbl_change_log WHERE seq <= ? AND changed_at < ?",
+                    (keep_from, datetime.now() - timedelta(days=days)))
+        deleted = cur.rowcount
+    query_cache.invalidate("tbl_change_log")
+    return deleted
+
+
+def _report(st: dict):
+    print(f"✅ {st['rows']:,} rows in {st['seconds']:.2f}s ({st['rows_per_sec']:,.0f} rows/sec):"
+          f" {st['shipments']:,} shipments, {st['deleted']:,} deleted, {st['events']:,} events,"
+          f" {st['dimensions']:,} customers/drivers/vehicles")
+    print(f"   lag: {st['pending']:,} change(s) waiting, oldest {st['lag_seconds']:.1f}s old")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Copy the database into a SQLite replica")
+    parser.add_argument("--replica", default=DEFAULT_REPLICA_PATH, help="replica file")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("sync")
+    p.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="rows per batch")
+    p.add_argument("--every", type=float, help="seconds between passes (default: one pass)")
+    p.add_argument("--full", action="store_true", help="empty the replica and copy everything again")
+    sub.add_parser("status")
+    p = sub.add_parser("prune")
+    p.add_argument("--days", type=float, default=30)
+    args = parser.parse_args(argv)
+
+    source = get_backend()
+    if getattr(source, "db_path", None) and os.path.abspath(source.db_path) == os.path.abspath(args.replica):
+        print("❌ The replica cannot be the source database")
+        return 1
+    source.create_schema()   # older databases may not have tbl_change_log yet
+    replica = Replica(args.replica)
+    print(f"Source: {source.describe()}  ->  replica: {args.replica}")
+    try:
+        if args.cmd == "status":
+            for k, v in status(replica).items():
+                print(f"  {k:<12} {v:.1f}" if isinstance(v, float) else f"  {k:<12} {v}")
+        elif args.cmd == "prune":
+            print(f"✅ {prune(replica, args.days):,} change log row(s) deleted")
+        else:
+            _report(sync(replica, args.batch, args.full))
+            while args.every:
+                time.sleep(args.every)
+                _report(sync(replica, args.batch))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        replica.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# reports.py
+# ✅ Report engine: one grouped scan of tbl_shipments per report
+# ✅ Summary (all status counts + income) and month-end breakdowns
+#
+# Every report is a single "GROUP BY ..., status" query; the per-status columns are folded
+# together in Python, so the SQL stays plain enough for both MS Access and SQLite.
+
+from datetime import datetime
+
+from db import fetch_all
+from db_backend import STATUSES
+
+
+# entity -> (group columns in tbl_shipments, lookup SQL for display names or None)
+BREAKDOWNS = {
+    "customer": (("customer_id",), "SELECT id, [name] FROM tbl_customers"),
+    "driver": (("driver_id",), "SELECT id, [name] FROM tbl_drivers"),
+    "vehicle": (("vehicle_id",), "SELECT id, plate FROM tbl_vehicles"),
+    "route": (("origin", "destination"), None),
+}
+
+
+def _period_filter(since: datetime | None, until: datetime | None):
+    """WHERE clause + params for an optional [since, until) created_at range."""
+    parts, params = [], []
+    if since is not None:
+        parts.append("created_at >= ?")
+        params.append(since)
+    if until is not None:
+        parts.append("created_at < ?")
+        params.append(until)
+    where = (" WHERE " + " AND ".join(parts)) if parts else ""
+    return where, tuple(params)
+
+
+def _empty_totals() -> dict:
+    totals = {"total": 0, "income": 0.0, "weight_kg": 0.0}
+    for status in STATUSES:
+        totals[status] = 0
+    return totals
+
+
+def _add(totals: dict, status: str, count: int, price_sum, weight_sum):
+    totals["total"] += count
+    totals[status] = totals.get(status, 0) + count
+    totals["weight_kg"] += weight_sum or 0
+    if status != "Cancelled":
+        totals["income"] += price_sum or 0
+
+
+def summary(since: datetime | None = None, until: datetime | None = None) -> dict:
+    """
+    Total shipments, count per status and non-cancelled income, in ONE query.
+    Returns {"total": n, "Pending": n, ..., "income": x, "weight_kg": x}.
+    """
+    where, params = _period_filter(since, until)
+    rows = fetch_all(
+        "SELECT status, COUNT(*), SUM(price_usd), SUM(weight_kg) FROM tbl_shipments"
+        + where + " GROUP BY status",
+        params,
+    )
+    totals = _empty_totals()
+    for status, count, price_sum, weight_sum in rows:
+        _add(totals, status, count, price_sum, weight_sum)
+    return totals
+
+
+def breakdown(by: str, since: datetime | None = None, until: datetime | None = None,
+              top: int | None = None) -> list[dict]:
+    """
+    Per-customer / per-driver / per-vehicle / per-route totals, sorted by income (highest first).
+    Each row: {"key": ..., "label": ..., "total": n, "<status>": n, "income": x, "weight_kg": x}
+    """
+    if by not in BREAKDOWNS:
+        raise ValueError(f"Unknown breakdown '{by}' (choose: {', '.join(BREAKDOWNS)})")
+    cols, names_sql = BREAKDOWNS[by]
+    col_list = ", ".join(cols)
+    where, params = _period_filter(since, until)
+
+    rows = fetch_all(
+        f"SELECT {col_list}, status, COUNT(*), SUM(price_usd), SUM(weight_kg) FROM tbl_shipments"
+        + where + f" GROUP BY {col_list}, status",
+        params,
+    )
+
+    groups = {}
+    n = len(cols)
+    for r in rows:
+        key = r[0] if n == 1 else tuple(r[:n])
+        status, count, price_sum, weight_sum = r[n], r[n + 1], r[n + 2], r[n + 3]
+        totals = groups.get(key)
+        if totals is None:
+            totals = groups[key] = _empty_totals()
+        _add(totals, status, count, price_sum, weight_sum)
+
+    names = dict(fetch_all(names_sql)) if names_sql and groups else {}
+    result = []
+    for key, totals in groups.items():
+        label = names.get(key, f"#{key}") if names_sql else f"{key[0]} → {key[1]}"
+        result.append({"key": key, "label": label, **totals})
+
+    result.sort(key=lambda t: (-t["income"], -t["total"]))
+    return result[:top] if top else result
+
+
+def month_range(year: int, month: int):
+    """(since, until) covering one calendar month, for month-end reports."""
+    since = datetime(year, month, 1)
+    until = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return since, until
@@ -0,0 +1,404 @@
+# search_index.py
+# ✅ Prefix search ("typeahead") over customers (name / phone / address), drivers (name / license)
+#    and shipment routes (origin / destination)
+# ✅ A word index in the database (tbl_search_terms -> tbl_search_docs): every lookup is one index
+#    range scan, whatever the size of the tables
+# ✅ Kept in sync on every write: routes by the shipments.py write hook (same transaction),
+#    customers / drivers by services.py, updates.py and bulk.py
+#
+#   import search_index
+#   search_index.search("ann smi")                      customers, drivers and routes
+#   search_index.search("lis por", kinds=["route"])
+#
+# Commands:
+#   python search_index.py find ann smi [--kind customer] [--limit 20]
+#   python search_index.py rebuild    index everything again from the tables
+#   python search_index.py check      compare the index with the tables
+#
+# Each row becomes one tbl_search_docs row (kind, ref, label) + one tbl_search_terms row per word.
+# Words are lower case without accents; phone numbers and licences are also indexed with the
+# separators removed ("555-0100" -> 555, 0100, 5550100). Every word of the question must be the
+# start of a word of the row: "ann sm" finds "Ann Smith", "smith ann" too.
+# A route doc counts the shipments on it and goes away with the last one.
+# Rows written behind the system's back (another tool, SQL by hand): run rebuild.
+
+import argparse
+import re
+import sys
+import threading
+import unicodedata
+
+import entities
+import query_cache
+from db import fetch_all, get_conn
+from db_backend import get_backend
+from render import render_table
+
+# kind -> (entity, indexed fields); routes come from tbl_shipments
+SOURCES = {
+    "customer": ("customers", ("name", "phone", "address")),
+    "driver": ("drivers", ("name", "license")),
+}
+KINDS = ("customer", "driver", "route")
+JOINED = {"phone", "license"}       # also indexed as one word without separators
+ROUTE_SEP = "\t"                    # ref of a route = origin + ROUTE_SEP + destination
+
+BUILT_MARKER = ("meta", "built")    # doc written by rebuild(); without it the index was never filled
+TERM_MAX = 64                       # longest word stored (tbl_search_terms.term is TEXT(64) on Access)
+LABEL_MAX = 255
+MAX_WORDS = 4                       # words of a question used for the lookup (the longest ones)
+PROBE_ROWS = 200                    # rows counted per word to pick the rarest one to drive the lookup
+DEFAULT_LIMIT = 20
+IN_CHUNK = 200                      # IDs per "WHERE id IN (...)"
+WRITE_CHUNK = 5000                  # docs per executemany() in rebuild()
+
+SEARCH_HEADERS = ["Kind", "ID / Route", "Match"]
+
+_WORD = re.compile(r"\w+")
+_sql_cache = {}                     # (backend name, words, rows) -> SQL of search()
+_build_lock = threading.Lock()
+
+
+# =========================
+# WORDS
+# =========================
+def words(text) -> list[str]:
+    """'Zoë Smith-Jones' -> ['zoe', 'smith', 'jones']"""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return _WORD.findall(text)
+
+
+def terms(values: dict, fields) -> set:
+    """Every word stored for one row."""
+    out = set()
+    for field in fields:
+        ws = words(values.get(field))
+        out.update(ws)
+        if field in JOINED and len(ws) > 1:
+            out.add("".join(ws))
+    return {t[:TERM_MAX] for t in out}
+
+
+def _label(values: dict, fields) -> str:
+    return " · ".join(str(values.get(f) or "") for f in fields)[:LABEL_MAX]
+
+
+def _entity_doc(kind: str, row: dict) -> tuple:
+    fields = SOURCES[kind][1]
+    return str(row["id"]), _label(row, fields), 0, terms(row, fields)
+
+
+def _route_doc(origin: str, destination: str, uses: int) -> tuple:
+    return (f"{origin}{ROUTE_SEP}{destination}", f"{origin} → {destination}"[:LABEL_MAX], uses,
+            terms({"origin": origin, "destination": destination}, ("origin", "destination")))
+
+
+def _kind_of(entity: str) -> str | None:
+    for kind, (name, _) in SOURCES.items():
+        if name == entity:
+            return kind
+    return None
+
+
+def indexed(entity: str) -> bool:
+    """True for the entities with rows in the index (customers, drivers)."""
+    return _kind_of(entity) is not None
+
+
+# =========================
+# WRITES (on the caller's cursor, inside its transaction)
+# =========================
+def _put(cur, kind: str, docs: list):
+    """Insert docs = [(ref, label, uses, terms), ...] (their refs must not be indexed yet)."""
+    if not docs:
+        return
+    cur.executemany(
+        "INSERT INTO tbl_search_docs (kind, ref, label, uses) VALUES (?, ?, ?, ?)",
+        [(kind, ref, label, uses) for ref, label, uses, _ in docs],
+    )
+    cur.executemany(
+        "INSERT INTO tbl_search_terms (kind, term, ref) VALUES (?, ?, ?)",
+        [(kind, term, ref) for ref, _, _, ts in docs for term in ts],
+    )
+
+
+def _drop(cur, kind: str, refs: list):
+    params = [(kind, ref) for ref in refs]
+    if params:
+        cur.executemany("DELETE FROM tbl_search_terms WHERE kind=? AND ref=?", params)
+        cur.executemany("DELETE FROM tbl_search_docs WHERE kind=? AND ref=?", params)
+
+
+def index_rows(cur, entity: str, rows: list):
+    """New customers / drivers (dicts by column name), e.g. from bulk.bulk_insert(). Others are ignored."""
+    kind = _kind_of(entity)
+    if kind and rows:
+        _put(cur, kind, [_entity_doc(kind, row) for row in rows])
+
+
+def sync_rows(cur, entity: str, ids):
+    """
+    Re-index customers / drivers by ID after an insert, update or delete: the rows are read again
+    on `cur` (so it sees the caller's own uncommitted write), gone rows leave the index.
+    """
+    kind = _kind_of(entity)
+    if kind is None:
+        return
+    ids = list(dict.fromkeys(ids))
+    table, cols = entities.get_entity(entity)["table"], entities.columns(entity)
+    rows = []
+    for i in range(0, len(ids), IN_CHUNK):
+        chunk = ids[i:i + IN_CHUNK]
+        cur.execute(f"SELECT {entities.column_list(entity)} FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk)
+        rows.extend(dict(zip(cols, r)) for r in cur.fetchall())
+    _drop(cur, kind, [str(rid) for rid in ids])
+    _put(cur, kind, [_entity_doc(kind, row) for row in rows])
+
+
+def refresh(entity: str, ids):
+    """sync_rows() in its own transaction (after a write that did not give us its cursor)."""
+    if _kind_of(entity) is None:
+        return
+    with get_conn() as conn:
+        sync_rows(conn.cursor(), entity, ids)
+
+
+def on_shipment_write(cur, changes: list):
+    """
+    Write hook (shipments.py). changes = [(old_row, new_row), ...], None = insert / delete.
+    Only the shipment count of a route changes; status changes cost nothing.
+    """
+    deltas = {}
+    for old, new in changes:
+        if old is not None:
+            key = (old["origin"], old["destination"])
+            deltas[key] = deltas.get(key, 0) - 1
+        if new is not None:
+            key = (new["origin"], new["destination"])
+            deltas[key] = deltas.get(key, 0) + 1
+    for (origin, destination), n in deltas.items():
+        if not n:
+            continue
+        doc = _route_doc(origin, destination, n)
+        cur.execute("UPDATE tbl_search_docs SET uses = uses + ? WHERE kind=? AND ref=?", (n, "route", doc[0]))
+        if cur.rowcount == 0:
+            if n > 0:
+                _put(cur, "route", [doc])
+        elif n < 0:
+            cur.execute("SELECT uses FROM tbl_search_docs WHERE kind=? AND ref=?", ("route", doc[0]))
+            row = cur.fetchone()
+            if row is not None and row[0] <= 0:
+                _drop(cur, "route", [doc[0]])
+
+
+# =========================
+# SEARCH
+# =========================
+def _after(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def search_sql(n_words: int, rows: int) -> str:
+    """The first (rarest) word drives an index range scan in term order; every other word must match the same doc."""
+    backend = get_backend()
+    key = (backend.name, n_words, rows)
+    sql = _sql_cache.get(key)
+    if sql is None:
+        sql = (
+            "SELECT d.ref, d.label, d.uses FROM tbl_search_terms AS t"
+            " INNER JOIN tbl_search_docs AS d ON (d.kind = t.kind AND d.ref = t.ref)"
+            " WHERE t.kind=? AND t.term >= ? AND t.term < ?"
+        )
+        for i in range(1, n_words):
+            sql += (
+                f" AND EXISTS (SELECT 1 FROM tbl_search_terms AS t{i}"
+                f" WHERE t{i}.kind = t.kind AND t{i}.ref = t.ref AND t{i}.term >= ? AND t{i}.term < ?)"
+            )
+        sql = _sql_cache[key] = backend.limit(sql + " ORDER BY t.term, t.ref", rows)
+    return sql
+
+
+def _probe_sql() -> str:
+    backend = get_backend()
+    key = (backend.name, "probe")
+    sql = _sql_cache.get(key)
+    if sql is None:
+        inner = backend.limit("SELECT term FROM tbl_search_terms WHERE kind=? AND term >= ? AND term < ?", PROBE_ROWS)
+        sql = _sql_cache[key] = f"SELECT COUNT(*) FROM ({inner}) AS p"
+    return sql
+
+
+def _rarest_first(kind: str, ws: list[str]) -> list[str]:
+    """Order the words by how many terms start with them (counted up to PROBE_ROWS), rarest first."""
+    if len(ws) < 2:
+        return ws
+    counts = {w: fetch_all(_probe_sql(), (kind, w, _after(w)), cache=False)[0][0] for w in ws}
+    return sorted(ws, key=lambda w: counts[w])
+
+
+def _result(kind: str, ref: str, label: str, uses) -> dict:
+    if kind == "route":
+        origin, _, destination = ref.partition(ROUTE_SEP)
+        return {"kind": kind, "key": (origin, destination), "label": label, "shipments": uses}
+    return {"kind": kind, "key": int(ref), "label": label}
+
+
+def search(text: str, kinds=None, limit: int = DEFAULT_LIMIT) -> list[dict]:
+    """
+    Rows whose words start with every word of `text`, per kind in KINDS order (up to `limit` each).
+    [{"kind", "key" (ID, or (origin, destination) for routes), "label", "shipments" (routes)}]
+    """
+    kinds = list(kinds or KINDS)
+    bad = [k for k in kinds if k not in KINDS]
+    if bad:
+        raise ValueError(f"Unknown search kind '{bad[0]}' (choose: {', '.join(KINDS)})")
+    if limit < 1:
+        raise ValueError("limit: must be at least 1")
+    ws = sorted({w[:TERM_MAX] for w in words(text)}, key=len, reverse=True)[:MAX_WORDS]
+    # "ann" is implied by "annabel": drop words that are the start of a longer one
+    ws = [w for i, w in enumerate(ws) if not any(o.startswith(w) for o in ws[:i])]
+    if not ws:
+        return []
+    _ensure_built()
+    out = []
+    for kind in kinds:
+        params = (kind, *(b for w in _rarest_first(kind, ws) for b in (w, _after(w))))
+        # LIMIT counts term rows and a doc can match the first word more than once ("ann annex"):
+        # read twice as many rows until `limit` docs are found or there are no more rows
+        rows = 2 * limit
+        while True:
+            found = fetch_all(search_sql(len(ws), rows), params, cache=False)
+            docs = {}
+            for ref, label, uses in found:
+                docs.setdefault(ref, (label, uses))
+                if len(docs) == limit:
+                    break
+            if len(docs) == limit or len(found) < rows:
+                break
+            rows *= 2
+        out += [_result(kind, ref, label, uses) for ref, (label, uses) in docs.items()]
+    return out
+
+
+def result_rows(items: list[dict]) -> list[tuple]:
+    """search() result as table rows, see SEARCH_HEADERS."""
+    return [
+        (i["kind"].capitalize(), " → ".join(i["key"]) if i["kind"] == "route" else i["key"],
+         f"{i['label']} ({i['shipments']} shipments)" if i["kind"] == "route" else i["label"])
+        for i in items
+    ]
+
+
+# =========================
+# REBUILD / CHECK
+# =========================
+def _expected(cur) -> dict:
+    """{(kind, ref): (label, uses, terms)} straight from the tables, read on `cur`."""
+    docs = {}
+    for kind, (entity, _) in SOURCES.items():
+        table, cols = entities.get_entity(entity)["table"], entities.columns(entity)
+        cur.execute(f"SELECT {entities.column_list(entity)} FROM {table}")
+        for r in cur.fetchall():
+            ref, label, uses, ts = _entity_doc(kind, dict(zip(cols, r)))
+            docs[(kind, ref)] = (label, uses, ts)
+    cur.execute("SELECT origin, destination, COUNT(*) FROM tbl_shipments GROUP BY origin, destination")
+    for origin, destination, count in cur.fetchall():
+        ref, label, uses, ts = _route_doc(origin, destination, count)
+        docs[("route", ref)] = (label, uses, ts)
+    return docs
+
+
+def is_built() -> bool:
+    return bool(fetch_all("SELECT 1 FROM tbl_search_docs WHERE kind=? AND ref=?", BUILT_MARKER, cache=False))
+
+
+def _ensure_built():
+    """Build the index on first use, once per process even when many searches arrive together."""
+    if is_built():
+        return
+    with _build_lock:
+        if not is_built():
+            rebuild()
+
+
+def rebuild() -> dict:
+    """
+    Throw the index away and build it again in one transaction. Returns docs per kind.
+    The tables are read after the DELETEs on the same cursor, so writes wait and none is lost.
+    """
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM tbl_search_terms")
+        cur.execute("DELETE FROM tbl_search_docs")
+        by_kind = {kind: [] for kind in KINDS}
+        for (kind, ref), (label, uses, ts) in _expected(cur).items():
+            by_kind[kind].append((ref, label, uses, ts))
+        for kind, docs in by_kind.items():
+            for i in range(0, len(docs), WRITE_CHUNK):
+                _put(cur, kind, docs[i:i + WRITE_CHUNK])
+        _put(cur, BUILT_MARKER[0], [(BUILT_MARKER[1], "", 0, ())])
+    query_cache.invalidate("tbl_search_docs", "tbl_search_terms")
+    return {kind: len(docs) for kind, docs in by_kind.items()}
+
+
+def check() -> list[str]:
+    """Compare the index with the tables. Returns a list of differences (empty = OK)."""
+    with get_conn() as conn:
+        expected = _expected(conn.cursor())
+    docs = fetch_all("SELECT kind, ref, label, uses FROM tbl_search_docs", cache=False)
+    stored = {(kind, ref): (label, uses, set()) for kind, ref, label, uses in docs if (kind, ref) != BUILT_MARKER}
+    problems = []
+    for kind, term, ref in fetch_all("SELECT kind, term, ref FROM tbl_search_terms", cache=False):
+        if (kind, ref) in stored:
+            stored[(kind, ref)][2].add(term)
+        else:
+            problems.append(f"{kind}:{ref}: word '{term}' without a doc")
+    for key in sorted(set(expected) | set(stored)):
+        kind, ref = key
+        exp, got = expected.get(key), stored.get(key)
+        name = ref.replace(ROUTE_SEP, " → ")
+        if got is None:
+            problems.append(f"{kind}:{name}: missing")
+        elif exp is None:
+            problems.append(f"{kind}:{name}: indexed but gone from the table")
+        elif exp != got:
+            problems.append(f"{kind}:{name}: expected {exp[0]!r} x{exp[1]} {sorted(exp[2])},"
+                            f" stored {got[0]!r} x{got[1]} {sorted(got[2])}")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prefix search over customers, drivers and routes")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("find", help="search (every word must start a word of the row)")
+    p.add_argument("text", nargs="+")
+    p.add_argument("--kind", choices=KINDS, action="append", help="only this kind (repeatable)")
+    p.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="rows per kind")
+    sub.add_parser("rebuild", help="index everything again")
+    sub.add_parser("check", help="compare the index with the tables")
+    args = parser.parse_args(argv)
+
+    get_backend().create_schema()   # older databases have no search tables yet
+    if args.cmd == "rebuild":
+        counts = rebuild()
+        print("✅ Search index rebuilt (" + ", ".join(f"{n} {k}s" for k, n in counts.items()) + ")")
+    elif args.cmd == "check":
+        problems = check()
+        if problems:
+            print(f"❌ {len(problems)} difference(s):")
+            for p in problems:
+                print("  ", p)
+            print("💡 Run: python search_index.py rebuild")
+            return 1
+        print("✅ Search index matches the tables")
+    else:
+        rows = result_rows(search(" ".join(args.text), args.kind, args.limit))
+        render_table("SEARCH RESULTS", SEARCH_HEADERS, rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
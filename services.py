@@ -0,0 +1,365 @@
+# services.py
+# ✅ Service layer: every operation of the system as a plain function (data in, data out)
+# ✅ No input() / print() here - the menus, cli.py and scripts all call the same functions
+#
+# Writes return (ok, error_message) like db.safe_execute(); reads return rows / dicts.
+#
+#   import services
+#   services.startup()
+#   ok, err = services.add("customers", {"id": 7, "name": "Ann", "phone": "555", "address": "Main St"})
+#   rows = services.search_shipments("customer", 7)
+
+from datetime import datetime
+
+import entities
+import id_alloc
+import id_index
+import import_export
+import load_planner
+import reports
+import search_index
+import shipment_events
+import shipments
+import statements
+import summary_store
+import updates
+from db import cache_stats, execute, get_conn, pool_stats, query, record_exists
+from db_backend import STATUSES, get_backend
+from indexes import ensure_indexes
+from pagination import fetch_page, iter_pages
+from statements import JOIN_SELECT, SHIPMENT_SELECT
+
+LABELS = {"customers": "Customer", "drivers": "Driver", "vehicles": "Vehicle", "shipments": "Shipment"}
+
+HEADERS = {
+    "customers": ["ID", "Name", "Phone", "Address"],
+    "drivers": ["ID", "Name", "Phone", "License"],
+    "vehicles": ["ID", "Plate", "Type", "Capacity_kg"],
+    "shipments": ["ID", "Customer_ID", "Driver_ID", "Vehicle_ID", "From", "To", "Kg", "$", "Status", "Created_At"],
+}
+JOIN_HEADERS = ["ID", "Customer", "Driver", "Plate", "From", "To", "Kg", "$", "Status", "Created_At"]
+BREAKDOWN_HEADERS = ["Total", "Pending", "In Transit", "Delivered", "Cancelled", "Kg", "Income $"]
+HISTORY_HEADERS = shipment_events.HISTORY_HEADERS
+TRANSIT_HEADERS = shipment_events.TRANSIT_HEADERS
+TRANSIT_BY = list(shipment_events.TRANSIT_BY)
+LOAD_HEADERS = load_planner.LOAD_HEADERS
+STATEMENT_HEADERS = statements.STATS_HEADERS
+SEARCH_HEADERS = search_index.SEARCH_HEADERS
+SEARCH_KINDS = list(search_index.KINDS)
+
+# search field -> catalog statement (every one is covered by an index, see indexes.py)
+SEARCH_BY = {
+    "id": "shipment_by_id",
+    "customer": "shipments_by_customer",
+    "driver": "shipments_by_driver",
+    "vehicle": "shipments_by_vehicle",
+    "status": "shipments_by_status",
+}
+NEWEST_FIRST = [("created_at", 9), ("id", 0)]
+# capacity checks run inside the write transaction of update(), see load_planner.py
+WRITE_CHECKS = {"shipments": load_planner.shipment_check, "vehicles": load_planner.vehicle_check}
+
+
+# =========================
+# STARTUP
+# =========================
+def startup() -> dict:
+    """Check the connection, create missing tables + indexes. Raises if the DB is unreachable."""
+    backend = get_backend()
+    with get_conn():
+        pass
+    return {
+        "backend": backend.describe(),
+        "tables": backend.create_schema(),
+        "indexes": ensure_indexes(),
+    }
+
+
+# =========================
+# ANY ENTITY (customers / drivers / vehicles / shipments)
+# =========================
+def exists(entity: str, rid: int) -> bool:
+    """Customers / drivers / vehicles are looked up in the shared ID index, shipments in the DB."""
+    table = entities.get_entity(entity)["table"]
+    if table in id_index.FOREIGN_KEYS.values():
+        return id_index.exists(table, rid)
+    return record_exists(table, rid)
+
+
+def add(entity: str, raw: dict):
+    """
+    Validate + insert one row (shipments: FK checks + summary counters, one transaction).
+    Leave "id" out (or empty) to get the next server-side ID (id_alloc.py, no existence probe).
+    Returns (True, new_id) or (False, error_message).
+    """
+    table = entities.get_entity(entity)["table"]
+    typed_id = raw.get("id") not in (None, "")
+    try:
+        row = entities.validate_row(entity, raw if typed_id else {**raw, "id": 0})    # ID comes after the checks
+    except ValueError as e:
+        return False, str(e)
+    if typed_id and record_exists(table, row["id"]):
+        return False, f"{LABELS[entity]} ID already exists"
+
+    if entity == "shipments":
+        problems = id_index.get_index().check_shipment(row)
+        if problems:
+            return False, "; ".join(problems)
+        if row["status"] in load_planner.ACTIVE_STATUSES:
+            # early answer before an ID is taken; shipment_check() decides inside the transaction
+            err = load_planner.check_capacity(row["vehicle_id"], row["weight_kg"])
+            if err:
+                return False, err
+    if typed_id:
+        try:
+            id_alloc.claim(table, row["id"])
+        except ValueError as e:
+            return False, str(e)
+    else:
+        row["id"] = id_alloc.next_id(table)
+    if entity == "shipments":
+        ok, err = shipments.create(row, load_planner.shipment_check)
+    else:
+        values = tuple(row[c] for c in entities.columns(entity))
+        ok, err = execute(statements.table_statement("insert", table), values)
+        if ok:
+            id_index.added(table, row["id"])
+            search_index.refresh(entity, [row["id"]])
+    if not ok:
+        return False, err
+    return True, row["id"]
+
+
+def update(entity: str, rid: int, raw: dict):
+    """
+    Change only the given fields (empty values = keep the old value), one UPDATE.
+    A heavier or moved Pending / In Transit shipment gets the same capacity check as add(),
+    and a vehicle's capacity_kg cannot go below its load (both checked in the UPDATE's transaction).
+    """
+    try:
+        changes = entities.validate_changes(entity, raw)
+    except ValueError as e:
+        return False, str(e)
+    if not changes:
+        return False, "Nothing to update"
+    if entity == "shipments" and "status" in changes:
+        return False, "status: change it with set_status (Pending -> In Transit -> Delivered / Cancelled)"
+    check = WRITE_CHECKS.get(entity)
+    if check and not summary_store.is_built():
+        summary_store.rebuild()         # the checks read the load from the counters
+    ok, err = updates.patch(entity, rid, changes, check)
+    if not ok and err == "Not found":
+        err = f"{LABELS[entity]} not found"
+    return ok, err
+
+
+def delete(entity: str, rid: int):
+    """Delete one row. Customers / drivers / vehicles still used by shipments are refused by the DB."""
+    if entity == "shipments":
+        return shipments.delete(rid)
+    table = entities.get_entity(entity)["table"]
+    if not record_exists(table, rid):
+        return False, f"{LABELS[entity]} not found"
+    ok, err = execute(statements.table_statement("delete", table), (rid,))
+    if ok:
+        id_index.removed(table, rid)
+        search_index.refresh(entity, [rid])
+    return ok, err
+
+
+def list_pages(entity: str, page_size: int | None = None):
+    """Generator of pages (lists of rows); shipments newest first, the others by id."""
+    if entity == "shipments":
+        return iter_pages(SHIPMENT_SELECT, NEWEST_FIRST, desc=True, page_size=page_size)
+    sql = statements.sql(statements.table_statement("all", entities.get_entity(entity)["table"]))
+    return iter_pages(sql, [("id", 0)], page_size=page_size)
+
+
+def list_page(entity: str, after: tuple | None = None, page_size: int | None = None):
+    """One page of list_pages(): (rows, next_cursor), next_cursor None on the last page."""
+    if entity == "shipments":
+        return fetch_page(SHIPMENT_SELECT, NEWEST_FIRST, after, desc=True, page_size=page_size)
+    sql = statements.sql(statements.table_statement("all", entities.get_entity(entity)["table"]))
+    return fetch_page(sql, [("id", 0)], after, page_size=page_size)
+
+
+def import_rows(entity: str, path: str, fmt: str | None = None, batch_size: int | None = None):
+    """Load a CSV / JSONL file. Returns an import_export.ImportReport."""
+    return import_export.import_file(entity, path, fmt, batch_size)
+
+
+def export_rows(entity: str, path: str, fmt: str | None = None) -> int:
+    return import_export.export_table(entity, path, fmt)
+
+
+# =========================
+# SHIPMENTS
+# =========================
+JOIN_KEYS = [("s.created_at", 9), ("s.id", 0)]
+
+
+def shipment_join_pages(page_size: int | None = None):
+    """Pages of shipments with customer / driver names and vehicle plate, newest first."""
+    return iter_pages(JOIN_SELECT, JOIN_KEYS, desc=True, page_size=page_size)
+
+
+def shipment_join_page(after: tuple | None = None, page_size: int | None = None):
+    """One page of shipment_join_pages(): (rows, next_cursor)."""
+    return fetch_page(JOIN_SELECT, JOIN_KEYS, after, desc=True, page_size=page_size)
+
+
+def search_shipments(by: str, value) -> list:
+    """Shipments where <by> = value (by: id, customer, driver, vehicle, status), newest first."""
+    if by not in SEARCH_BY:
+        raise ValueError(f"Unknown search field '{by}' (choose: {', '.join(SEARCH_BY)})")
+    try:
+        value = entities.to_text(value) if by == "status" else entities.to_int(value)
+    except ValueError:
+        raise ValueError(f"{by}: {'cannot be empty' if by == 'status' else 'must be a whole number'}") from None
+    return query(SEARCH_BY[by], (value,))
+
+
+def route_shipments(origin: str, destination: str) -> list:
+    """Shipments from origin to destination (exact names, e.g. a route from search()), newest first."""
+    return query("shipments_by_route", (entities.to_text(origin), entities.to_text(destination)))
+
+
+def set_status(sid: int, status: str):
+    if status not in STATUSES:
+        return False, f"Invalid status (choose: {', '.join(STATUSES)})"
+    return shipments.set_status(sid, status)
+
+
+def next_statuses(status: str) -> tuple:
+    """Statuses a shipment in `status` may change to (empty = final)."""
+    return shipments.NEXT_STATUSES.get(status, ())
+
+
+def parse_ids(text: str) -> list[int]:
+    """'12 13, 20-25' -> [12, 13, 20, 21, ..., 25]. Raises ValueError."""
+    ids = []
+    for part in text.replace(",", " ").split():
+        first, sep, last = part.partition("-")
+        try:
+            if sep:
+                lo, hi = int(first), int(last)
+                if hi < lo or hi - lo > 100_000:
+                    raise ValueError
+                ids.extend(range(lo, hi + 1))
+            else:
+                ids.append(int(part))
+        except ValueError:
+            raise ValueError(f"Invalid ID or range: {part}") from None
+    return ids
+
+
+def transition(ids, status: str, from_status: str | None = None):
+    """
+    Move many shipments to one status (set-based, in batches).
+    Returns (True, {"moved": [ids], "skipped": {id: reason}}) or (False, error) for a bad status.
+    """
+    for s in (status, from_status):
+        if s and s not in STATUSES:
+            return False, f"Invalid status (choose: {', '.join(STATUSES)})"
+    try:
+        moved, skipped = shipments.transition(ids, status, from_status)
+    except (TypeError, ValueError):
+        return False, "ids: must be a list of whole numbers"
+    return True, {"moved": moved, "skipped": skipped}
+
+
+def shipment_history(sid: int) -> list[tuple]:
+    """Status events of one shipment, oldest first (see HISTORY_HEADERS)."""
+    return shipment_events.history(sid)
+
+
+def parse_time(text: str) -> datetime:
+    """'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM[:SS]'. Raises ValueError("Invalid date/time")."""
+    try:
+        return datetime.fromisoformat(text.strip())
+    except ValueError:
+        raise ValueError("Invalid date/time (use YYYY-MM-DD HH:MM)") from None
+
+
+def status_at(sid: int, when) -> str | None:
+    """Status of a shipment at a past moment (datetime or text), None = it did not exist then."""
+    return shipment_events.status_at(sid, parse_time(when) if isinstance(when, str) else when)
+
+
+def plan_loads(strategy: str = "ffd", apply: bool = False) -> dict:
+    """
+    Pack every Pending shipment onto the vehicles by capacity (load_planner.py).
+    Returns plan stats + "vehicles" rows (see LOAD_HEADERS); apply=True also moves the shipments.
+    """
+    plan, current = load_planner.plan_pending(strategy)
+    result = plan.stats()
+    result["vehicles"] = load_planner.load_rows(plan.vehicle_rows())
+    if apply:
+        res = load_planner.apply_plan(plan, current)
+        result["moved"], result["failed"] = res.written, res.failed
+    return result
+
+
+# =========================
+# SEARCH (customers / drivers / routes by the start of their words)
+# =========================
+def search(text: str, kinds=None, limit: int | None = None) -> list[dict]:
+    """Typeahead: [{"kind", "key", "label", ...}] per kind (customer, driver, route), see search_index.py."""
+    return search_index.search(text, kinds, limit or search_index.DEFAULT_LIMIT)
+
+
+def search_rows(items: list[dict]) -> list[tuple]:
+    return search_index.result_rows(items)
+
+
+# =========================
+# REPORTS
+# =========================
+def parse_month(text: str):
+    """'YYYY-MM' -> (since, until). Raises ValueError("Invalid month")."""
+    try:
+        year, month = (int(x) for x in text.strip().split("-"))
+        return reports.month_range(year, month)
+    except ValueError:
+        raise ValueError("Invalid month") from None
+
+
+def summary(month: str | None = None) -> dict:
+    """All-time totals come from the maintained counters; one month is one GROUP BY query."""
+    if not month:
+        return summary_store.read()
+    return reports.summary(*parse_month(month))
+
+
+def breakdown(by: str, month: str | None = None, top: int | None = None) -> list[dict]:
+    since, until = parse_month(month) if month else (None, None)
+    return reports.breakdown(by, since, until, top)
+
+
+def transit_times(by: str, month: str | None = None, sla_hours: float | None = None) -> list[dict]:
+    """Pending -> Delivered hours per route / driver / customer / vehicle (delivered in `month`)."""
+    since, until = parse_month(month) if month else (None, None)
+    return shipment_events.transit_times(by, since, until, sla_hours=sla_hours)
+
+
+def transit_rows(items: list[dict]) -> list[tuple]:
+    return shipment_events.transit_rows(items)
+
+
+def breakdown_rows(items: list[dict]) -> list[tuple]:
+    """breakdown() result as table rows (first column = label), see BREAKDOWN_HEADERS."""
+    return [
+        (t["label"], t["total"], t["Pending"], t["In Transit"], t["Delivered"], t["Cancelled"],
+         f"{t['weight_kg']:.1f}", f"{t['income']:.2f}")
+        for t in items
+    ]
+
+
+def stats() -> dict:
+    return {"pool": pool_stats(), "cache": cache_stats(), "id_index": id_index.get_index().stats(),
+            "id_alloc": id_alloc.get_allocator().stats(), "statements": statements.stats()}
+
+
+def statement_stats() -> list[tuple]:
+    """Calls / cache hits / timings per catalog statement, see STATEMENT_HEADERS."""
+    return statements.stats_rows(statements.stats())
@@ -0,0 +1,211 @@
+# shipment_events.py
+# ✅ Append-only status history of every shipment (tbl_shipment_events)
+# ✅ Written by shipments.py inside the same transaction as each write, never updated
+# ✅ Indexed questions: "status of shipment X at time T", "average Pending -> Delivered time per route"
+#
+# One row per change:
+#   created   old_status = NULL      new_status = first status   changed_at = created_at
+#   status    old_status = before    new_status = after          changed_at = time of the change
+#   deleted   old_status = last      new_status = NULL
+#
+# Commands:
+#   python shipment_events.py history 12
+#   python shipment_events.py at 12 "2024-05-03 14:00"
+#   python shipment_events.py transit route [--month 2024-05] [--sla 48]
+#   python shipment_events.py backfill    one "created" event for shipments that have none yet
+#                                         (databases from before the event log)
+
+import argparse
+import sys
+from datetime import datetime
+
+import query_cache
+from db import fetch_all, get_conn
+from db_backend import get_backend
+from indexes import ensure_indexes
+from render import render_table
+from reports import month_range
+
+EVENT_COLUMNS = ["id", "shipment_id", "old_status", "new_status", "changed_at"]
+
+# group -> (columns of tbl_shipments, lookup SQL for display names or None), like reports.BREAKDOWNS
+TRANSIT_BY = {
+    "route": (("origin", "destination"), None),
+    "driver": (("driver_id",), "SELECT id, [name] FROM tbl_drivers"),
+    "customer": (("customer_id",), "SELECT id, [name] FROM tbl_customers"),
+    "vehicle": (("vehicle_id",), "SELECT id, plate FROM tbl_vehicles"),
+}
+TRANSIT_HEADERS = ["Shipments", "Avg hours", "Max hours", "Late"]
+HISTORY_HEADERS = ["Event", "Shipment", "From", "To", "At"]
+
+
+# =========================
+# WRITE HOOK (called by shipments.py)
+# =========================
+def on_shipment_write(cur, changes: list):
+    """
+    Write hook. changes = [(old_row, new_row), ...] (None = insert / delete).
+    Only inserts, deletes and real status changes are logged; other edits leave no event.
+    """
+    now = datetime.now()
+    events = []
+    for old, new in changes:
+        if old is None:
+            events.append((new["id"], None, new["status"], new["created_at"] or now))
+        elif new is None:
+            events.append((old["id"], old["status"], None, now))
+        elif old["status"] != new["status"]:
+            events.append((new["id"], old["status"], new["status"], now))
+    if events:
+        cur.executemany(
+            "INSERT INTO tbl_shipment_events (shipment_id, old_status, new_status, changed_at)"
+            " VALUES (?, ?, ?, ?)",
+            events,
+        )
+
+
+# =========================
+# QUERIES (each one starts from an index, see indexes.py)
+# =========================
+def history(sid: int) -> list[tuple]:
+    """Every event of one shipment, oldest first."""
+    return fetch_all(
+        f"SELECT {', '.join(EVENT_COLUMNS)} FROM tbl_shipment_events"
+        " WHERE shipment_id=? ORDER BY changed_at, id",
+        (sid,),
+    )
+
+
+def status_at(sid: int, when: datetime) -> str | None:
+    """Status of a shipment at a moment in the past (None = did not exist / deleted by then)."""
+    sql = get_backend().limit(
+        "SELECT new_status FROM tbl_shipment_events"
+        " WHERE shipment_id=? AND changed_at<=? ORDER BY changed_at DESC, id DESC",
+        1,
+    )
+    rows = fetch_all(sql, (sid, when))
+    return rows[0][0] if rows else None
+
+
+def transit_times(by: str = "route", since: datetime | None = None, until: datetime | None = None,
+                  start: str = "Pending", end: str = "Delivered", sla_hours: float | None = None) -> list[dict]:
+    """
+    Time from `start` to `end` per route / driver / customer / vehicle, for shipments that
+    reached `end` in [since, until). Slowest first.
+    Each row: {"key", "label", "shipments", "avg_hours", "max_hours", "late"} (late = over sla_hours).
+    Reads only the `end` events of the period (+ one index lookup per shipment), not the history.
+    """
+    if by not in TRANSIT_BY:
+        raise ValueError(f"Unknown grouping '{by}' (choose: {', '.join(TRANSIT_BY)})")
+    cols, names_sql = TRANSIT_BY[by]
+    where, params = ["e.new_status=?", "b.new_status=?"], [end, start]
+    if since is not None:
+        where.append("e.changed_at >= ?")
+        params.append(since)
+    if until is not None:
+        where.append("e.changed_at < ?")
+        params.append(until)
+    rows = fetch_all(
+        f"SELECT e.shipment_id, b.changed_at, e.changed_at, {', '.join('s.' + c for c in cols)}"
+        " FROM (tbl_shipment_events AS e"
+        " INNER JOIN tbl_shipment_events AS b ON b.shipment_id = e.shipment_id)"
+        " INNER JOIN tbl_shipments AS s ON s.id = e.shipment_id"
+        " WHERE " + " AND ".join(where),
+        tuple(params),
+    )
+
+    # one span per shipment: first time it entered `start`, last time it entered `end`
+    spans = {}
+    n = len(cols)
+    for sid, began, ended, *key in rows:
+        key = key[0] if n == 1 else tuple(key)
+        span = spans.get(sid)
+        if span is None:
+            spans[sid] = [began, ended, key]
+        else:
+            span[0] = min(span[0], began)
+            span[1] = max(span[1], ended)
+
+    groups = {}
+    for began, ended, key in spans.values():
+        hours = (ended - began).total_seconds() / 3600
+        if hours < 0:
+            continue
+        g = groups.setdefault(key, [0, 0.0, 0.0, 0])
+        g[0] += 1
+        g[1] += hours
+        g[2] = max(g[2], hours)
+        if sla_hours is not None and hours > sla_hours:
+            g[3] += 1
+
+    names = dict(fetch_all(names_sql)) if names_sql and groups else {}
+    result = []
+    for key, (count, total, longest, late) in groups.items():
+        label = names.get(key, f"#{key}") if names_sql else f"{key[0]} → {key[1]}"
+        result.append({"key": key, "label": label, "shipments": count,
+                       "avg_hours": total / count, "max_hours": longest, "late": late})
+    result.sort(key=lambda t: (-t["avg_hours"], -t["shipments"]))
+    return result
+
+
+def transit_rows(items: list[dict]) -> list[tuple]:
+    """transit_times() result as table rows (first column = label), see TRANSIT_HEADERS."""
+    return [(t["label"], t["shipments"], f"{t['avg_hours']:.1f}", f"{t['max_hours']:.1f}", t["late"])
+            for t in items]
+
+
+# =========================
+# BACKFILL
+# =========================
+def backfill() -> int:
+    """Give every shipment without events a "created" event with its current status. Returns rows added."""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO tbl_shipment_events (shipment_id, old_status, new_status, changed_at)"
+            " SELECT s.id, NULL, s.status, s.created_at FROM tbl_shipments AS s"
+            " WHERE NOT EXISTS (SELECT 1 FROM tbl_shipment_events AS e WHERE e.shipment_id = s.id)"
+        )
+        added = cur.rowcount
+    query_cache.invalidate("tbl_shipment_events")
+    return added
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Shipment status history")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("history")
+    p.add_argument("id", type=int)
+    p = sub.add_parser("at")
+    p.add_argument("id", type=int)
+    p.add_argument("when", help='"YYYY-MM-DD HH:MM"')
+    p = sub.add_parser("transit")
+    p.add_argument("by", choices=list(TRANSIT_BY))
+    p.add_argument("--month", help="YYYY-MM (default: all time)")
+    p.add_argument("--sla", type=float, help="hours; count shipments slower than this")
+    sub.add_parser("backfill")
+    args = parser.parse_args(argv)
+
+    get_backend().create_schema()   # older databases may not have tbl_shipment_events yet
+    ensure_indexes()
+    try:
+        if args.cmd == "history":
+            render_table(f"SHIPMENT {args.id} HISTORY", HISTORY_HEADERS, history(args.id))
+        elif args.cmd == "at":
+            when = datetime.fromisoformat(args.when)
+            print(f"Shipment {args.id} at {when}: {status_at(args.id, when) or '(did not exist)'}")
+        elif args.cmd == "transit":
+            since, until = month_range(*map(int, args.month.split("-"))) if args.month else (None, None)
+            title = f"PENDING → DELIVERED BY {args.by.upper()}" + (f" ({args.month})" if args.month else "")
+            render_table(title, [args.by.capitalize()] + TRANSIT_HEADERS,
+                         transit_rows(transit_times(args.by, since, until, sla_hours=args.sla)))
+        else:
+            print(f"✅ {backfill()} shipment(s) got a created event")
+    except ValueError as e:
+        print("❌", e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+# shipments.py
+# ✅ Every write to tbl_shipments goes through here
+# ✅ Each write runs in ONE transaction together with its hooks (summary counters, ...)
+#
+# ✅ Status changes follow one flow: Pending -> In Transit -> Delivered / Cancelled
+#
+# All functions return (True, None) if ok, otherwise (False, error_message),
+# the same contract as db.safe_execute (transition() returns which IDs moved / were skipped).
+# create() / update_fields() take check(cur, old_row, new_row) -> error or None: it runs after the
+# write and its hooks, in the same transaction, and an error rolls the write back.
+
+import entities
+import query_cache
+import replica
+import search_index
+import shipment_events
+import statements
+import summary_store
+from db import get_conn
+from db_backend import get_backend
+
+SHIPMENT_COLUMNS = entities.columns("shipments")
+
+# status -> statuses it may change to (Delivered and Cancelled are final)
+NEXT_STATUSES = {
+    "Pending": ("In Transit", "Cancelled"),
+    "In Transit": ("Delivered", "Cancelled"),
+    "Delivered": (),
+    "Cancelled": (),
+}
+TRANSITION_BATCH = 200      # IDs per "WHERE id IN (...)" statement
+TRANSITION_RETRIES = 3      # a batch whose rows changed under it is read + tried again
+
+# hook(cur, changes) runs inside the write transaction, changes = [(old_row, new_row), ...]
+#   insert: old_row=None   delete: new_row=None
+WRITE_HOOKS = [
+    summary_store.on_shipment_write,
+    shipment_events.on_shipment_write,
+    replica.on_shipment_write,
+    search_index.on_shipment_write,
+]
+
+
+class _Rejected(Exception):
+    """A write check refused the change (the transaction is rolled back)."""
+
+
+def _load(cur, sid: int) -> dict | None:
+    cur.execute(statements.sql("shipment_by_id"), (sid,))   # columns in SHIPMENT_COLUMNS order
+    row = cur.fetchone()
+    return dict(zip(SHIPMENT_COLUMNS, row)) if row is not None else None
+
+
+def run_hooks(cur, changes: list):
+    """Run every write hook for a list of (old_row, new_row) pairs."""
+    if changes:
+        for hook in WRITE_HOOKS:
+            hook(cur, changes)
+
+
+def _written():
+    """Forget cached reads of the tables a shipment write touches."""
+    query_cache.invalidate("tbl_shipments", "tbl_summary", "tbl_shipment_events")
+
+
+def insert_row(cur, row: dict):
+    """INSERT one shipment + hooks on an open cursor (caller owns the transaction)."""
+    cur.execute(entities.insert_sql("shipments"), tuple(row[c] for c in SHIPMENT_COLUMNS))
+    run_hooks(cur, [(None, row)])
+
+
+def create(row: dict, check=None):
+    """Insert one shipment (dict with every SHIPMENT_COLUMNS key)."""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            insert_row(cur, row)
+            if check and (err := check(cur, None, row)):
+                raise _Rejected(err)
+        _written()
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def update_rows(cur, items: list) -> list:
+    """
+    Partial UPDATE of several shipments on an open cursor (caller owns the transaction).
+    items = [(sid, {column: new_value}), ...]. Returns [(item_number, error), ...].
+    A status change must follow NEXT_STATUSES, like transition().
+    """
+    changes, errors = [], []
+    for i, (sid, fields) in enumerate(items):
+        old = _load(cur, sid)
+        if old is None:
+            errors.append((i, "Shipment not found"))
+            continue
+        if "status" in fields and fields["status"] != old["status"]:
+            err = transition_error(old["status"], fields["status"])
+            if err:
+                errors.append((i, err))
+                continue
+        try:
+            sql, params = entities.update_sql("shipments", fields, sid)
+            cur.execute(sql, params)
+        except Exception as e:
+            errors.append((i, str(e)))
+            continue
+        changes.append((old, {**old, **fields}))
+    run_hooks(cur, changes)
+    return errors
+
+
+def update_fields(sid: int, fields: dict, check=None):
+    """Change some columns of one shipment in one statement."""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            old = _load(cur, sid) if check else None
+            errors = update_rows(cur, [(sid, fields)])
+            if errors:
+                return False, errors[0][1]
+            if check and (err := check(cur, old, {**old, **fields})):
+                raise _Rejected(err)
+        _written()
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def delete(sid: int):
+    """Delete one shipment."""
+    try:
+        with get_conn() as conn:
+            cur = conn.cursor()
+            old = _load(cur, sid)
+            if old is None:
+                return False, "Shipment not found"
+            cur.execute("DELETE FROM tbl_shipments WHERE id=?", (sid,))
+            run_hooks(cur, [(old, None)])
+        _written()
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+# =========================
+# STATUS FLOW
+# =========================
+class _Changed(Exception):
+    """A row left its status between the SELECT and the UPDATE (another user was faster)."""
+
+
+def transition_error(old: str, new: str) -> str | None:
+    """Why old -> new is not allowed, or None if it is."""
+    if new in NEXT_STATUSES.get(old, ()):
+        return None
+    if not NEXT_STATUSES.get(old):
+        return f"Shipment is {old} (final)"
+    return f"{old} cannot change to {new} (allowed: {', '.join(NEXT_STATUSES[old])})"
+
+
+def _transition_batch(cur, ids: list, status: str, from_status: str | None, skipped: dict) -> list:
+    """One batch in one transaction: 1 SELECT + 1 set-based UPDATE per current status."""
+    marks = ", ".join("?" * len(ids))
+    cur.execute(f"SELECT {', '.join(SHIPMENT_COLUMNS)} FROM tbl_shipments WHERE id IN ({marks})", ids)
+    old_rows = {r[0]: dict(zip(SHIPMENT_COLUMNS, r)) for r in cur.fetchall()}
+
+    groups = {}         # current status -> ids that may move
+    for sid in ids:
+        old = old_rows.get(sid)
+        if old is None:
+            skipped[sid] = "Shipment not found"
+        elif from_status and old["status"] != from_status:
+            skipped[sid] = f"Shipment is {old['status']}, not {from_status}"
+        elif (err := transition_error(old["status"], status)) is not None:
+            skipped[sid] = err
+        else:
+            groups.setdefault(old["status"], []).append(sid)
+
+    moved, changes = [], []
+    for current, group in groups.items():
+        cur.execute(
+            f"UPDATE tbl_shipments SET status=? WHERE id IN ({', '.join('?' * len(group))})"
+            f" AND {get_backend().no_index('status')}=?",
+            (status, *group, current),
+        )
+        if cur.rowcount != len(group):
+            raise _Changed()
+        moved += group
+        changes += [(old_rows[sid], {**old_rows[sid], "status": status}) for sid in group]
+    run_hooks(cur, changes)
+    return moved
+
+
+def transition(ids, status: str, from_status: str | None = None, batch_size: int | None = None):
+    """
+    Move many shipments to `status` with set-based UPDATEs (end of shift: close out 300 deliveries).
+    from_status = only move shipments that are in that status now.
+    Returns (moved_ids, {id: reason}) for the IDs that did not qualify.
+    Raises ValueError for an unknown status.
+    """
+    if status not in NEXT_STATUSES or (from_status and from_status not in NEXT_STATUSES):
+        raise ValueError(f"status: must be one of {', '.join(NEXT_STATUSES)}")
+    ids = list(dict.fromkeys(int(i) for i in ids))      # no duplicates, keep the order
+    size = max(batch_size or TRANSITION_BATCH, 1)
+    moved, skipped = [], {}
+    for start in range(0, len(ids), size):
+        chunk = ids[start:start + size]
+        for attempt in range(TRANSITION_RETRIES):
+            batch_skipped = {}
+            try:
+                with get_conn() as conn:
+                    batch_moved = _transition_batch(conn.cursor(), chunk, status, from_status, batch_skipped)
+                moved += batch_moved
+                skipped.update(batch_skipped)
+                break
+            except _Changed:
+                if attempt == TRANSITION_RETRIES - 1:
+                    skipped.update({sid: "Changed by another user, try again" for sid in chunk})
+            except Exception as e:
+                skipped.update({sid: str(e) for sid in chunk})
+                break
+    if moved:
+        _written()
+    return moved, skipped
+
+
+def set_status(sid: int, status: str):
+    """Change the status of one shipment (only along NEXT_STATUSES)."""
+    try:
+        _, skipped = transition([sid], status)
+    except ValueError as e:
+        return False, str(e)
+    if skipped:
+        return False, skipped[sid]
+    return True, None
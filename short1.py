@@ -1,50 +1,44 @@
 # transport_access_simple.py
-# Simple Transport System (Python + MS Access)
+# Simple Transport System (Python + MS Access, or SQLite with TRANSPORT_BACKEND=sqlite)
 # Tables: tbl_customers, tbl_drivers, tbl_vehicles, tbl_shipments
 
-import pyodbc
 from datetime import datetime
 
-DB_PATH = r"C:\Users\ROG\OneDrive\Documents\Database18.accdb"
-CONN_STR = r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};DBQ=" + DB_PATH + ";"
+import query_cache
+import services
+from db import fetch_all, get_conn, query, record_exists
+from render import render_table
 
 # -------------------------
-# 1) CONNECT + BASIC DB HELPERS
+# 1) CONNECT + BASIC DB HELPERS (pooled, see db_pool.py)
 # -------------------------
 def connect():
-    return pyodbc.connect(CONN_STR)
+    """Borrow a pooled connection (use with 'with')"""
+    return get_conn()
 
 def run(sql, params=()):
     """For INSERT/UPDATE/DELETE"""
     with connect() as conn:
         cur = conn.cursor()
         cur.execute(sql, params)
-        conn.commit()
+    query_cache.invalidate_sql(sql)
 
 def fetch(sql, params=()):
-    """For SELECT"""
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(sql, params)
-        return cur.fetchall()
+    """For SELECT (answered from the query cache when possible)"""
+    return fetch_all(sql, params)
 
 def exists(table, rid):
-    rows = fetch(f"SELECT 1 FROM {table} WHERE id=?", (rid,))
-    return len(rows) > 0
+    return record_exists(table, rid)
 
 
 # -------------------------
 # 2) SIMPLE PRINT
 # -------------------------
-def show(title, rows):
-    print("\n" + "="*60)
-    print(title)
-    print("="*60)
-    if not rows:
-        print("No data")
-        return
-    for r in rows:
-        print(r)
+def show(title, rows, headers=None):
+    # aligned columns, one buffered write (render.py)
+    if headers is None:
+        headers = [f"#{i + 1}" for i in range(len(rows[0]))] if rows else []
+    render_table(title, headers, rows)
 
 
 # -------------------------
@@ -57,25 +51,20 @@ def customer_menu():
         ch = input("Choose: ").strip()
 
         if ch == "1":
-            cid = int(input("Customer ID: "))
-            if exists("tbl_customers", cid):
-                print("ID already exists!")
-                continue
             name = input("Name: ")
             phone = input("Phone: ")
             address = input("Address: ")
-            run("INSERT INTO tbl_customers (id, [name], phone, address) VALUES (?, ?, ?, ?)",
-                (cid, name, phone, address))
-            print("✅ Added customer")
+            ok, result = services.add("customers", {"name": name, "phone": phone, "address": address})
+            print(f"✅ Added customer (ID {result})" if ok else f"❌ Error: {result}")
 
         elif ch == "2":
-            rows = fetch("SELECT id, [name], phone, address FROM tbl_customers ORDER BY id")
-            show("CUSTOMERS", rows)
+            rows = query("all_by_id:tbl_customers")
+            show("CUSTOMERS", rows, ["ID", "Name", "Phone", "Address"])
 
         elif ch == "3":
             cid = int(input("Customer ID to delete: "))
-            run("DELETE FROM tbl_customers WHERE id=?", (cid,))
-            print("✅ Deleted customer (if not referenced)")
+            ok, err = services.delete("customers", cid)
+            print("✅ Deleted customer" if ok else f"❌ Not deleted (maybe referenced): {err}")
 
         elif ch == "0":
             break
@@ -91,11 +80,6 @@ def shipment_menu():
         ch = input("Choose: ").strip()
 
         if ch == "1":
-            sid = int(input("Shipment ID: "))
-            if exists("tbl_shipments", sid):
-                print("Shipment ID exists!")
-                continue
-
             customer_id = int(input("Customer ID: "))
             driver_id = int(input("Driver ID: "))
             vehicle_id = int(input("Vehicle ID: "))
@@ -106,30 +90,22 @@ def shipment_menu():
             status = "Pending"
             created_at = datetime.now()
 
-            run("""
-                INSERT INTO tbl_shipments
-                (id, customer_id, driver_id, vehicle_id, origin, destination, weight_kg, price_usd, status, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (sid, customer_id, driver_id, vehicle_id, origin, destination, weight, price, status, created_at))
+            ok, result = services.add("shipments", {
+                "customer_id": customer_id, "driver_id": driver_id,
+                "vehicle_id": vehicle_id, "origin": origin, "destination": destination,
+                "weight_kg": weight, "price_usd": price, "status": status, "created_at": created_at,
+            })
 
-            print("✅ Shipment created")
+            print(f"✅ Shipment created (ID {result})" if ok else f"❌ Error: {result}")
 
         elif ch == "2":
-            rows = fetch("""
-                SELECT s.id, c.[name], d.[name], v.plate,
-                       s.origin, s.destination, s.weight_kg, s.price_usd, s.status, s.created_at
-                FROM ((tbl_shipments AS s
-                INNER JOIN tbl_customers AS c ON s.customer_id = c.id)
-                INNER JOIN tbl_drivers AS d ON s.driver_id = d.id)
-                INNER JOIN tbl_vehicles AS v ON s.vehicle_id = v.id
-                ORDER BY s.created_at DESC
-            """)
-            show("SHIPMENTS (JOIN VIEW)", rows)
+            rows = query("shipments_join_newest")
+            show("SHIPMENTS (JOIN VIEW)", rows,
+                 ["ID", "Customer", "Driver", "Plate", "From", "To", "Kg", "$", "Status", "Created_At"])
 
         elif ch == "3":
-            total = fetch("SELECT COUNT(*) FROM tbl_shipments")[0][0]
-            delivered = fetch("SELECT COUNT(*) FROM tbl_shipments WHERE status='Delivered'")[0][0]
-            income = fetch("SELECT SUM(price_usd) FROM tbl_shipments WHERE status<>'Cancelled'")[0][0] or 0
+            st = services.summary()   # maintained counters, no table scan
+            total, delivered, income = st["total"], st["Delivered"], st["income"]
 
             print("\n===== REPORT =====")
             print("Total shipments :", total)
@@ -146,8 +122,8 @@ def shipment_menu():
 def main():
     # Quick connection test
     try:
-        connect().close()
-        print("✅ Connected to MS Access!")
+        info = services.startup()   # connection + missing tables / indexes
+        print(f"✅ Connected to {info['backend']}!")
     except Exception as e:
         print("❌ Connection failed:", e)
         return
@@ -0,0 +1,363 @@
+# snapshot.py
+# ✅ Columnar in-memory copy of tbl_shipments + customer / driver / vehicle columns for ad-hoc analysis
+# ✅ Compact arrays (array module, NumPy views when NumPy is installed), dictionary-encoded strings
+# ✅ group_by / where / top_k / histogram over whole columns instead of Row tuples one by one
+#
+#   snap = snapshot.get_snapshot()
+#   snap.group_by("route")                                  income / weight / count per route
+#   snap.top_k("customer", "income", 10, snap.where(status="Delivered", since=datetime(2024, 5, 1)))
+#   snap.histogram("weight_kg", [10, 100, 1000], by="vehicle_type")
+#
+#   python snapshot.py group route --status Delivered --month 2024-05 --top 10
+#   python snapshot.py hist weight_kg 10 100 1000 --by vehicle_type
+#
+# The snapshot is a copy: writes after load() are not in it. get_snapshot() loads a new one
+# when the old one is older than TRANSPORT_SNAPSHOT_TTL seconds (default 300).
+# NumPy is optional: without it the same operations run as tight loops over the arrays.
+
+import argparse
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from itertools import compress
+
+from db import get_conn, query
+from db_backend import get_backend
+from render import render_table
+from reports import month_range
+from statements import SHIPMENT_SELECT
+
+try:
+    import numpy as np
+except ImportError:     # optional, see the header
+    np = None
+
+SNAPSHOT_SELECT = SHIPMENT_SELECT
+FETCH_ROWS = 10000
+NUMERIC = ("id", "customer_id", "driver_id", "vehicle_id", "weight_kg", "price_usd", "income", "created_at")
+MEASURES = ("count", "weight_kg", "price_usd", "income")
+# group key -> what the key is (labels of customer / driver / vehicle come from their tables)
+GROUPS = ("status", "origin", "destination", "route", "customer", "driver", "vehicle", "vehicle_type")
+
+
+class _Codes(dict):
+    """value -> small int code, a new code for every new value (dictionary encoding)."""
+
+    def __missing__(self, value):
+        code = self[value] = len(self)
+        return code
+
+
+class Snapshot:
+    def __init__(self):
+        self.n = 0
+        self.num = {name: array("q" if name.endswith("id") else "d") for name in NUMERIC}
+        self.codes = {name: array("i") for name in GROUPS}
+        self.values = {name: [] for name in GROUPS}     # code -> value
+        self.labels = {}                                # group -> {value: display label}
+        self.loaded_at = 0.0
+        self.seconds = 0.0
+        self._np = None
+
+    # ---------- loading ----------
+    @classmethod
+    def from_rows(cls, rows, customers=(), drivers=(), vehicles=(), use_numpy: bool | None = None) -> "Snapshot":
+        """
+        Build from (id, customer_id, driver_id, vehicle_id, origin, destination, weight_kg,
+        price_usd, status, created_at) tuples (any iterable) + dimension rows:
+        customers/drivers = (id, name), vehicles = (id, plate, vehicles_type).
+        """
+        t0 = time.perf_counter()
+        snap = cls()
+        vtype = {vid: vt for vid, _, vt in vehicles}
+        enc = {name: _Codes() for name in GROUPS}
+        num, codes = snap.num, snap.codes
+        a_id, a_cust, a_drv, a_veh = num["id"].append, num["customer_id"].append, \
+            num["driver_id"].append, num["vehicle_id"].append
+        a_kg, a_price, a_time = num["weight_kg"].append, num["price_usd"].append, num["created_at"].append
+        a_income = num["income"].append
+        e_status, e_origin, e_dest, e_route = enc["status"], enc["origin"], enc["destination"], enc["route"]
+        e_cust, e_drv, e_veh, e_vtype = enc["customer"], enc["driver"], enc["vehicle"], enc["vehicle_type"]
+        c_status, c_origin, c_dest, c_route = (codes[g].append for g in ("status", "origin", "destination", "route"))
+        c_cust, c_drv, c_veh, c_vtype = (codes[g].append for g in ("customer", "driver", "vehicle", "vehicle_type"))
+
+        for sid, cid, did, vid, origin, dest, kg, price, status, created in rows:
+            a_id(sid)
+            a_cust(cid)
+            a_drv(did)
+            a_veh(vid)
+            a_kg(float(kg or 0))
+            price = float(price or 0)
+            a_price(price)
+            a_income(0.0 if status == "Cancelled" else price)     # income = price of non-Cancelled
+            a_time(created.timestamp() if created else float("nan"))
+            c_status(e_status[status])
+            c_origin(e_origin[origin])
+            c_dest(e_dest[dest])
+            c_route(e_route[(origin, dest)])
+            c_cust(e_cust[cid])
+            c_drv(e_drv[did])
+            c_veh(e_veh[vid])
+            c_vtype(e_vtype[vtype.get(vid, "?")])
+
+        snap.n = len(num["id"])
+        for name, e in enc.items():
+            snap.values[name] = list(e)             # dicts keep insertion order = code order
+        snap.labels = {
+            "customer": {cid: name for cid, name in customers},
+            "driver": {did: name for did, name in drivers},
+            "vehicle": {vid: plate for vid, plate, _ in vehicles},
+        }
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy:
+            if np is None:
+                raise ValueError("NumPy is not installed")
+            # zero-copy views over the numeric arrays; codes once as intp (what bincount indexes with)
+            snap._np = {name: np.frombuffer(col, dtype=np.float64 if col.typecode == "d" else np.int64)
+                        for name, col in num.items()}
+            snap._np.update({name: np.frombuffer(col, dtype=np.int32).astype(np.intp)
+                             for name, col in codes.items()})
+        snap.loaded_at = time.time()
+        snap.seconds = time.perf_counter() - t0
+        return snap
+
+    @property
+    def uses_numpy(self) -> bool:
+        return self._np is not None
+
+    def nbytes(self) -> int:
+        """Memory of the column arrays (the dictionaries of values are small)."""
+        cols = list(self.num.values()) + list(self.codes.values())
+        return sum(len(c) * c.itemsize for c in cols)
+
+    def _label(self, group: str, value) -> str:
+        if group == "route":
+            return f"{value[0]} → {value[1]}"
+        names = self.labels.get(group)
+        if names is not None:
+            return str(names.get(value, f"#{value}"))
+        return str(value)
+
+    def _code_of(self, group: str, value) -> int:
+        try:
+            return self.values[group].index(value)
+        except ValueError:
+            return -1
+
+    # ---------- filter ----------
+    def where(self, since: datetime | None = None, until: datetime | None = None, **equals):
+        """
+        Row mask: created_at in [since, until) and group == value (or in a list of values),
+        e.g. where(status="Delivered", vehicle_type=["Van", "Truck"]). None = all rows.
+        """
+        for group in equals:
+            if group not in GROUPS:
+                raise ValueError(f"Unknown column '{group}' (choose: {', '.join(GROUPS)})")
+        if since is None and until is None and not equals:
+            return None
+        if self._np is not None:
+            mask = np.ones(self.n, dtype=bool)
+            created = self._np["created_at"]
+            if since is not None:
+                mask &= created >= since.timestamp()
+            if until is not None:
+                mask &= created < until.timestamp()
+            for group, wanted in equals.items():
+                if isinstance(wanted, (list, tuple, set)):
+                    mask &= np.isin(self._np[group], [self._code_of(group, w) for w in wanted])
+                else:
+                    mask &= self._np[group] == self._code_of(group, wanted)
+            return mask
+
+        keep = None
+        if since is not None or until is not None:
+            lo = since.timestamp() if since is not None else float("-inf")
+            hi = until.timestamp() if until is not None else float("inf")
+            keep = bytearray(lo <= t < hi for t in self.num["created_at"])
+        for group, wanted in equals.items():
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            codes = {self._code_of(group, w) for w in wanted}
+            part = bytearray(c in codes for c in self.codes[group])
+            keep = part if keep is None else bytearray(a & b for a, b in zip(keep, part))
+        return keep
+
+    def count(self, mask=None) -> int:
+        if mask is None:
+            return self.n
+        return int(mask.sum()) if self._np is not None else sum(mask)
+
+    # ---------- group by ----------
+    def _sums(self, group: str, mask):
+        """(count, weight, price, income) lists indexed by the group's code."""
+        m = len(self.values[group])
+        if self._np is not None:
+            codes, kg, price, income = (self._np[c] for c in (group, "weight_kg", "price_usd", "income"))
+            if mask is not None:
+                codes = np.where(mask, codes, m)    # filtered-out rows go to one extra bucket
+            sums = [np.bincount(codes, minlength=m + 1),
+                    np.bincount(codes, weights=kg, minlength=m + 1),
+                    np.bincount(codes, weights=price, minlength=m + 1),
+                    np.bincount(codes, weights=income, minlength=m + 1)]
+            return tuple(x[:m].tolist() for x in sums)
+
+        cnt, wsum, psum, inc = [0] * m, [0.0] * m, [0.0] * m, [0.0] * m
+        cols = (self.codes[group], self.num["weight_kg"], self.num["price_usd"], self.num["income"])
+        if mask is not None:
+            cols = tuple(compress(c, mask) for c in cols)
+        for c, kg, pr, ic in zip(*cols):
+            cnt[c] += 1
+            wsum[c] += kg
+            psum[c] += pr
+            inc[c] += ic
+        return cnt, wsum, psum, inc
+
+    def group_by(self, group: str, mask=None) -> list[dict]:
+        """
+        Totals per group value, highest income first (same shape as reports.breakdown):
+        [{"key", "label", "count", "weight_kg", "price_usd", "income"}]
+        """
+        if group not in GROUPS:
+            raise ValueError(f"Unknown group '{group}' (choose: {', '.join(GROUPS)})")
+        cnt, wsum, psum, inc = self._sums(group, mask)
+        result = [
+            {"key": value, "label": self._label(group, value), "count": int(cnt[c]),
+             "weight_kg": wsum[c], "price_usd": psum[c], "income": inc[c]}
+            for c, value in enumerate(self.values[group]) if cnt[c]
+        ]
+        result.sort(key=lambda t: (-t["income"], -t["count"]))
+        return result
+
+    def top_k(self, group: str, measure: str = "income", k: int = 10, mask=None) -> list[dict]:
+        """The k groups with the largest measure (count / weight_kg / price_usd / income)."""
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure '{measure}' (choose: {', '.join(MEASURES)})")
+        items = self.group_by(group, mask)
+        items.sort(key=lambda t: -t[measure])
+        return items[:k]
+
+    # ---------- distribution ----------
+    def histogram(self, column: str, edges: list[float], by: str | None = None, mask=None) -> list[dict]:
+        """
+        How many rows fall in each bucket of a numeric column: (-inf, e0), [e0, e1), ..., [e_last, inf).
+        by = a group -> one row per group value. [{"key", "label", "bins": [counts]}]
+        """
+        if column not in ("weight_kg", "price_usd"):
+            raise ValueError("column: must be weight_kg or price_usd")
+        if by is not None and by not in GROUPS:
+            raise ValueError(f"Unknown group '{by}' (choose: {', '.join(GROUPS)})")
+        edges = sorted(float(e) for e in edges)
+        nb = len(edges) + 1
+        m = len(self.values[by]) if by else 1
+
+        if self._np is not None:
+            values = self._np[column] if mask is None else self._np[column][mask]
+            bucket = np.searchsorted(np.asarray(edges), values, side="right")
+            if by:
+                codes = self._np[by] if mask is None else self._np[by][mask]
+                bucket = codes.astype(np.int64) * nb + bucket
+            flat = np.bincount(bucket, minlength=m * nb).tolist()
+        else:
+            flat = [0] * (m * nb)
+            values = self.num[column] if mask is None else compress(self.num[column], mask)
+            if by:
+                codes = self.codes[by] if mask is None else compress(self.codes[by], mask)
+                for c, v in zip(codes, values):
+                    flat[c * nb + bisect_right(edges, v)] += 1
+            else:
+                for v in values:
+                    flat[bisect_right(edges, v)] += 1
+
+        if not by:
+            return [{"key": None, "label": "all", "bins": flat}]
+        return [
+            {"key": value, "label": self._label(by, value), "bins": flat[c * nb:(c + 1) * nb]}
+            for c, value in enumerate(self.values[by]) if any(flat[c * nb:(c + 1) * nb])
+        ]
+
+
+# =========================
+# LOAD FROM THE DATABASE
+# =========================
+def _stream(sql: str):
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(sql)
+        while True:
+            rows = cur.fetchmany(FETCH_ROWS)
+            if not rows:
+                return
+            yield from rows
+
+
+def load(use_numpy: bool | None = None) -> Snapshot:
+    """Stream tbl_shipments (one pass, FETCH_ROWS at a time) + the small dimension tables."""
+    customers = query("customer_names", cache=False)
+    drivers = query("driver_names", cache=False)
+    vehicles = query("vehicle_types", cache=False)
+    return Snapshot.from_rows(_stream(SNAPSHOT_SELECT), customers, drivers, vehicles, use_numpy)
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(max_age: float | None = None) -> Snapshot:
+    """Shared snapshot; loaded again when older than max_age seconds (default TRANSPORT_SNAPSHOT_TTL)."""
+    global _snapshot
+    if max_age is None:
+        max_age = float(os.environ.get("TRANSPORT_SNAPSHOT_TTL", "300"))
+    with _snapshot_lock:
+        if _snapshot is None or time.time() - _snapshot.loaded_at > max_age:
+            _snapshot = load()
+        return _snapshot
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Columnar snapshot analysis of tbl_shipments")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("group", help="count / kg / income per group")
+    p.add_argument("by", choices=GROUPS)
+    p.add_argument("--top", type=int)
+    p.add_argument("--measure", choices=MEASURES, default="income")
+    p2 = sub.add_parser("hist", help="how many shipments per weight / price bucket")
+    p2.add_argument("column", choices=["weight_kg", "price_usd"])
+    p2.add_argument("edges", type=float, nargs="+")
+    p2.add_argument("--by", choices=GROUPS)
+    for a in (p, p2):
+        a.add_argument("--status", help="only this status")
+        a.add_argument("--month", help="YYYY-MM of created_at")
+        a.add_argument("--no-numpy", action="store_true")
+    args = parser.parse_args(argv)
+
+    get_backend().create_schema()
+    snap = load(use_numpy=False if args.no_numpy else None)
+    print(f"✅ {snap.n} shipments loaded in {snap.seconds:.2f}s ({snap.nbytes() / 1024 / 1024:.1f} MB,"
+          f" {'NumPy' if snap.uses_numpy else 'array module'})", file=sys.stderr)
+    try:
+        since, until = month_range(*map(int, args.month.split("-"))) if args.month else (None, None)
+        mask = snap.where(since, until, **({"status": args.status} if args.status else {}))
+    except ValueError as e:
+        print("❌", e, file=sys.stderr)
+        return 1
+
+    if args.cmd == "group":
+        items = snap.top_k(args.by, args.measure, args.top, mask) if args.top else snap.group_by(args.by, mask)
+        render_table(f"BY {args.by.upper()}", [args.by.capitalize(), "Count", "Kg", "Price $", "Income $"],
+                     [(t["label"], t["count"], f"{t['weight_kg']:.1f}", f"{t['price_usd']:.2f}",
+                       f"{t['income']:.2f}") for t in items])
+    else:
+        edges = sorted(args.edges)
+        names = [f"<{edges[0]:g}"] + [f"{a:g}-{b:g}" for a, b in zip(edges, edges[1:])] + [f">={edges[-1]:g}"]
+        items = snap.histogram(args.column, edges, args.by, mask)
+        render_table(f"{args.column.upper()} DISTRIBUTION", [(args.by or "").capitalize() or "Rows"] + names,
+                     [(t["label"], *t["bins"]) for t in items])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
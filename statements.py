@@ -0,0 +1,183 @@
+# statements.py
+# ✅ Every named SQL statement of the system in one catalog (no copy-pasted column lists)
+# ✅ Per-table statements ("exists", "delete", ...) only for whitelisted tables, built once
+# ✅ Counters per statement: calls, cache hits, rows, total / max seconds
+#
+#   from db import query, execute
+#   rows = query("shipments_by_customer", (7,))
+#   ok, err = execute(table_statement("delete", "tbl_drivers"), (3,))
+#
+#   python statements.py          print the catalog
+#
+# The SQL text of a statement never changes, so the driver sees the same string every call:
+# pyodbc keeps the prepared statement of the last SQL run on a cursor, SQLite keeps a per
+# connection statement cache. db.py runs catalog statements on the long-lived cursor of each
+# pooled connection (db_pool.ConnectionPool.cursor) to get both.
+
+import sys
+import threading
+
+import entities
+from db_backend import SQLITE_SCHEMA
+
+# whitelist: only tables the schema declares can be put into a statement
+TABLES = frozenset(SQLITE_SCHEMA)
+
+SHIPMENT_SELECT = (
+    "SELECT id, customer_id, driver_id, vehicle_id, origin, destination,"
+    " weight_kg, price_usd, status, created_at FROM tbl_shipments"
+)
+JOIN_SELECT = (
+    "SELECT s.id, c.[name], d.[name], v.plate, s.origin, s.destination,"
+    " s.weight_kg, s.price_usd, s.status, s.created_at"
+    " FROM ((tbl_shipments AS s"
+    " INNER JOIN tbl_customers AS c ON s.customer_id = c.id)"
+    " INNER JOIN tbl_drivers AS d ON s.driver_id = d.id)"
+    " INNER JOIN tbl_vehicles AS v ON s.vehicle_id = v.id"
+)
+
+# name -> SQL (fixed text; every search is covered by an index, see indexes.py)
+CATALOG = {
+    "shipment_by_id": SHIPMENT_SELECT + " WHERE id=?",
+    "shipments_by_customer": SHIPMENT_SELECT + " WHERE customer_id=? ORDER BY created_at DESC",
+    "shipments_by_driver": SHIPMENT_SELECT + " WHERE driver_id=? ORDER BY created_at DESC",
+    "shipments_by_vehicle": SHIPMENT_SELECT + " WHERE vehicle_id=? ORDER BY created_at DESC",
+    "shipments_by_status": SHIPMENT_SELECT + " WHERE status=? ORDER BY created_at DESC",
+    "shipments_by_route": SHIPMENT_SELECT + " WHERE origin=? AND destination=? ORDER BY created_at DESC",
+    "shipments_join_newest": JOIN_SELECT + " ORDER BY s.created_at DESC",
+    "customer_names": "SELECT id, [name] FROM tbl_customers",
+    "driver_names": "SELECT id, [name] FROM tbl_drivers",
+    "vehicle_types": "SELECT id, plate, vehicles_type FROM tbl_vehicles",
+    "vehicle_capacity": "SELECT capacity_kg FROM tbl_vehicles WHERE id=?",
+    "vehicle_capacities": "SELECT id, capacity_kg FROM tbl_vehicles ORDER BY id",
+}
+
+# kind -> SQL with {table} ({columns} / {marks} = the entity's columns / one "?" each), see table_statement()
+TABLE_TEMPLATES = {
+    "exists": "SELECT 1 FROM {table} WHERE id=?",
+    "delete": "DELETE FROM {table} WHERE id=?",
+    "ids": "SELECT id FROM {table}",
+    "max_id": "SELECT MAX(id) FROM {table}",
+    "all": "SELECT {columns} FROM {table}",
+    "all_by_id": "SELECT {columns} FROM {table} ORDER BY id",
+    "insert": "INSERT INTO {table} ({columns}) VALUES ({marks})",
+}
+
+STATS_HEADERS = ["Statement", "Calls", "Cached", "Rows", "Avg ms", "Max ms", "Total s"]
+
+_TABLE_ENTITY = {e["table"]: name for name, e in entities.ENTITIES.items()}
+_lock = threading.Lock()
+
+
+class Statement:
+    """One named SQL text + its counters."""
+
+    __slots__ = ("name", "sql", "calls", "cached", "rows", "seconds", "max_seconds")
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.calls = 0          # executed on the database
+        self.cached = 0         # answered by query_cache, no database call
+        self.rows = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, rows: int):
+        with _lock:
+            self.calls += 1
+            self.rows += rows
+            self.seconds += seconds
+            if seconds > self.max_seconds:
+                self.max_seconds = seconds
+
+    def hit(self):
+        with _lock:
+            self.cached += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls, "cached": self.cached, "rows": self.rows, "seconds": self.seconds,
+            "avg_ms": 1000 * self.seconds / self.calls if self.calls else 0.0,
+            "max_ms": 1000 * self.max_seconds,
+        }
+
+
+_statements = {name: Statement(name, text) for name, text in CATALOG.items()}
+
+
+def check_table(table: str) -> str:
+    """The table name if it is in the whitelist, otherwise ValueError."""
+    if table not in TABLES:
+        raise ValueError(f"Unknown table '{table}'")
+    return table
+
+
+def table_statement(kind: str, table: str) -> str:
+    """Name of a per-table statement ("exists:tbl_customers"); built on first use."""
+    name = f"{kind}:{table}"
+    if name in _statements:
+        return name
+    if kind not in TABLE_TEMPLATES:
+        raise ValueError(f"Unknown statement kind '{kind}' (choose: {', '.join(TABLE_TEMPLATES)})")
+    check_table(table)
+    entity = _TABLE_ENTITY.get(table)
+    if "{columns}" in TABLE_TEMPLATES[kind] and entity is None:
+        raise ValueError(f"'{kind}' needs an entity table, not '{table}'")
+    cols = entities.columns(entity) if entity else ()
+    text = TABLE_TEMPLATES[kind].format(
+        table=table, columns=entities.column_list(entity) if entity else "", marks=", ".join("?" * len(cols))
+    )
+    with _lock:
+        _statements.setdefault(name, Statement(name, text))
+    return name
+
+
+def get(name: str) -> Statement:
+    """Statement by name (catalog names, or "kind:table" for per-table ones)."""
+    st = _statements.get(name)
+    if st is None:
+        kind, sep, table = name.partition(":")
+        if not sep:
+            raise ValueError(f"Unknown statement '{name}'")
+        st = _statements[table_statement(kind, table)]
+    return st
+
+
+def sql(name: str) -> str:
+    return get(name).sql
+
+
+def stats() -> dict:
+    """name -> counters, for every statement that ran at least once."""
+    with _lock:
+        items = list(_statements.values())
+    return {st.name: st.snapshot() for st in items if st.calls or st.cached}
+
+
+def reset_stats():
+    with _lock:
+        for st in _statements.values():
+            st.calls = st.cached = st.rows = 0
+            st.seconds = st.max_seconds = 0.0
+
+
+def stats_rows(items: dict) -> list[tuple]:
+    """stats() as table rows, slowest in total first, see STATS_HEADERS."""
+    return [
+        (name, s["calls"], s["cached"], s["rows"], f"{s['avg_ms']:.2f}", f"{s['max_ms']:.2f}", f"{s['seconds']:.3f}")
+        for name, s in sorted(items.items(), key=lambda kv: -kv[1]["seconds"])
+    ]
+
+
+def main() -> int:
+    for table in sorted(_TABLE_ENTITY):
+        for kind in TABLE_TEMPLATES:
+            table_statement(kind, table)
+    for name in list(_statements):
+        print(f"{name:<34} {sql(name)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
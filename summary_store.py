@@ -0,0 +1,223 @@
+# summary_store.py
+# ✅ Materialized shipment counters (tbl_summary) for O(1) dashboard reports
+# ✅ Kept up to date by shipments.py inside the same transaction as each write
+#
+# tbl_summary has one row per (scope, scope_key, status):
+#   scope = "all"      scope_key = ""            -> whole company
+#   scope = "customer" scope_key = customer id   -> per customer (same for driver / vehicle)
+# Each row stores shipments (count), price_usd (sum) and weight_kg (sum).
+# Income = price_usd of every status except Cancelled, computed when reading.
+#
+# Commands:
+#   python summary_store.py show      print the stored summary
+#   python summary_store.py rebuild   recompute everything from tbl_shipments
+#   python summary_store.py check     compare the store with a full recomputation
+
+import sys
+
+import query_cache
+from db import fetch_all, get_conn
+from db_backend import STATUSES, get_backend
+
+SCOPES = {
+    "all": None,
+    "customer": "customer_id",
+    "driver": "driver_id",
+    "vehicle": "vehicle_id",
+}
+
+# marker row written by rebuild(); without it the store has never been filled
+BUILT_MARKER = ("meta", "built", "")
+
+TOLERANCE = 0.005   # money/weight sums are floats, allow rounding drift
+
+
+# =========================
+# INCREMENTAL UPDATES (called by shipments.py)
+# =========================
+def _bump(cur, scope: str, key: str, status: str, count: int, price: float, weight: float):
+    cur.execute(
+        "UPDATE tbl_summary SET shipments = shipments + ?, price_usd = price_usd + ?,"
+        " weight_kg = weight_kg + ? WHERE scope=? AND scope_key=? AND status=?",
+        (count, price, weight, scope, key, status),
+    )
+    if cur.rowcount == 0:
+        cur.execute(
+            "INSERT INTO tbl_summary (scope, scope_key, status, shipments, price_usd, weight_kg)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (scope, key, status, count, price, weight),
+        )
+
+
+def _collect(deltas: dict, row: dict, sign: int):
+    price = sign * float(row["price_usd"] or 0)
+    weight = sign * float(row["weight_kg"] or 0)
+    for scope, col in SCOPES.items():
+        key = "" if col is None else str(row[col])
+        d = deltas.setdefault((scope, key, row["status"]), [0, 0.0, 0.0])
+        d[0] += sign
+        d[1] += price
+        d[2] += weight
+
+
+def on_shipment_write(cur, changes: list):
+    """
+    Write hook. changes = [(old_row, new_row), ...]
+    old_row is None for inserts, new_row is None for deletes.
+    Deltas are merged first, so a batch of 1000 inserts touches each counter row once.
+    """
+    deltas = {}
+    for old, new in changes:
+        if old is not None:
+            _collect(deltas, old, -1)
+        if new is not None:
+            _collect(deltas, new, +1)
+    for (scope, key, status), (count, price, weight) in deltas.items():
+        if count or price or weight:
+            _bump(cur, scope, key, status, count, price, weight)
+
+
+# =========================
+# READ (O(1): a handful of primary-key rows)
+# =========================
+def _totals(rows) -> dict:
+    totals = {"total": 0, "income": 0.0, "weight_kg": 0.0}
+    for status in STATUSES:
+        totals[status] = 0
+    for status, count, price, weight in rows:
+        totals["total"] += count
+        totals[status] = totals.get(status, 0) + count
+        totals["weight_kg"] += weight or 0
+        if status != "Cancelled":
+            totals["income"] += price or 0
+    return totals
+
+
+def is_built() -> bool:
+    rows = fetch_all(
+        "SELECT 1 FROM tbl_summary WHERE scope=? AND scope_key=? AND status=?", BUILT_MARKER
+    )
+    return bool(rows)
+
+
+def read(scope: str = "all", key=None) -> dict:
+    """Summary in the same shape as reports.summary(), read from the counters."""
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown scope '{scope}' (choose: {', '.join(SCOPES)})")
+    if not is_built():
+        rebuild()
+    rows = fetch_all(
+        "SELECT status, shipments, price_usd, weight_kg FROM tbl_summary WHERE scope=? AND scope_key=?",
+        (scope, "" if key is None else str(key)),
+    )
+    return _totals(rows)
+
+
+def weights(scope: str, key) -> dict:
+    """{status: weight_kg} of one scope key, e.g. the load of one vehicle per status."""
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown scope '{scope}' (choose: {', '.join(SCOPES)})")
+    if not is_built():
+        rebuild()
+    rows = fetch_all(
+        "SELECT status, shipments, price_usd, weight_kg FROM tbl_summary WHERE scope=? AND scope_key=?",
+        (scope, "" if key is None else str(key)),
+    )
+    return {status: weight or 0.0 for status, _, _, weight in rows}
+
+
+# =========================
+# REBUILD / CHECK
+# =========================
+def _recompute(cur) -> dict:
+    """{(scope, key, status): (count, price, weight)} straight from tbl_shipments, read on `cur`."""
+    expected = {}
+    for scope, col in SCOPES.items():
+        if col is None:
+            cur.execute("SELECT status, COUNT(*), SUM(price_usd), SUM(weight_kg) FROM tbl_shipments GROUP BY status")
+            for status, count, price, weight in cur.fetchall():
+                expected[(scope, "", status)] = (count, price or 0, weight or 0)
+        else:
+            cur.execute(
+                f"SELECT {col}, status, COUNT(*), SUM(price_usd), SUM(weight_kg) FROM tbl_shipments"
+                f" GROUP BY {col}, status"
+            )
+            for key, status, count, price, weight in cur.fetchall():
+                expected[(scope, str(key), status)] = (count, price or 0, weight or 0)
+    return expected
+
+
+def rebuild() -> int:
+    """
+    Throw the counters away and recompute them in one transaction. Returns rows written.
+    The DELETE comes first, so shipment writes wait until the counters are back (no write is lost).
+    """
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM tbl_summary")
+        expected = _recompute(cur)
+        for (scope, key, status), (count, price, weight) in expected.items():
+            cur.execute(
+                "INSERT INTO tbl_summary (scope, scope_key, status, shipments, price_usd, weight_kg)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (scope, key, status, count, price, weight),
+            )
+        cur.execute(
+            "INSERT INTO tbl_summary (scope, scope_key, status, shipments, price_usd, weight_kg)"
+            " VALUES (?, ?, ?, 0, 0, 0)",
+            BUILT_MARKER,
+        )
+    query_cache.invalidate("tbl_summary")
+    return len(expected)
+
+
+def check() -> list[str]:
+    """Compare the store with a full recomputation. Returns a list of differences (empty = OK)."""
+    with get_conn() as conn:
+        expected = _recompute(conn.cursor())
+    stored = {}
+    for scope, key, status, count, price, weight in fetch_all(
+        "SELECT scope, scope_key, status, shipments, price_usd, weight_kg FROM tbl_summary WHERE scope<>'meta'",
+        cache=False,
+    ):
+        stored[(scope, key, status)] = (count, price or 0, weight or 0)
+
+    problems = []
+    for k in sorted(set(expected) | set(stored)):
+        exp = expected.get(k, (0, 0, 0))
+        got = stored.get(k, (0, 0, 0))
+        if exp[0] != got[0] or abs(exp[1] - got[1]) > TOLERANCE or abs(exp[2] - got[2]) > TOLERANCE:
+            scope, key, status = k
+            problems.append(
+                f"{scope}:{key or '*'}:{status} expected count={exp[0]} price={exp[1]:.2f}"
+                f" weight={exp[2]:.2f}, stored count={got[0]} price={got[1]:.2f} weight={got[2]:.2f}"
+            )
+    return problems
+
+
+def main(argv: list[str]):
+    get_backend().create_schema()   # older databases may not have tbl_summary yet
+    cmd = argv[0] if argv else "show"
+    if cmd == "rebuild":
+        print(f"✅ Summary rebuilt ({rebuild()} counter rows)")
+    elif cmd == "check":
+        problems = check()
+        if problems:
+            print(f"❌ {len(problems)} counter(s) out of sync:")
+            for p in problems:
+                print("  ", p)
+            print("💡 Run: python summary_store.py rebuild")
+            return 1
+        print("✅ Summary store matches tbl_shipments")
+    elif cmd == "show":
+        st = read()
+        for k, v in st.items():
+            print(f"{k:<10}: {v:.2f}" if isinstance(v, float) else f"{k:<10}: {v}")
+    else:
+        print("Usage: python summary_store.py [show|rebuild|check]")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
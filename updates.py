@@ -0,0 +1,175 @@
+# updates.py
+# ✅ Partial updates: ONE "UPDATE ... SET <only changed columns> WHERE id=?" per row
+# ✅ Bulk patching from a CSV / JSONL file (id + the columns to change; empty = keep)
+#
+#   python updates.py patch customers changes.csv
+#   python updates.py patch shipments fixes.jsonl --batch-size 2000
+#
+# Shipments go through shipments.py so the summary counters stay right.
+
+import argparse
+import sys
+import time
+
+import bulk
+import entities
+import query_cache
+import search_index
+import shipments
+from db import fetch_all, get_conn
+from db_backend import get_backend
+from import_export import detect_format, open_text, read_rows, row_dict
+
+IN_CHUNK = 200      # IDs per "WHERE id IN (...)"
+
+
+def patch(entity: str, rid: int, changes: dict, check=None):
+    """
+    Update only the given columns of one row, atomically.
+    check(cur, old_row, new_row) -> error or None runs after the write in the same transaction and
+    an error rolls it back (shipments: whole rows; other entities: old_row=None, new_row=id + changes).
+    Returns (True, None) if ok, otherwise (False, error_message).
+    """
+    if entity == "shipments":
+        return shipments.update_fields(rid, changes, check)
+    try:
+        sql, params = entities.update_sql(entity, changes, rid)
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            if cur.rowcount == 0:
+                return False, "Not found"
+            if check and (err := check(cur, None, {"id": rid, **changes})):
+                raise ValueError(err)
+            search_index.sync_rows(cur, entity, [rid])
+        query_cache.invalidate_sql(sql)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def _existing_ids(table: str, ids: list) -> set:
+    found = set()
+    for i in range(0, len(ids), IN_CHUNK):
+        chunk = ids[i:i + IN_CHUNK]
+        rows = fetch_all(f"SELECT id FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})", tuple(chunk),
+                         cache=False)
+        found.update(r[0] for r in rows)
+    return found
+
+
+def _patch_shipments_batch(items: list, start: int, result: bulk.BulkResult):
+    t0 = time.perf_counter()
+    try:
+        with get_conn() as conn:
+            errors = shipments.update_rows(conn.cursor(), items)
+    except Exception as e:
+        errors = [(i, str(e)) for i in range(len(items))]
+    bad = {i for i, _ in errors}
+    result.written += len(items) - len(bad)
+    result.batches += 1
+    result.seconds += time.perf_counter() - t0
+    for i, msg in errors:
+        result.errors.append((start + i, items[i], msg))
+
+
+def bulk_patch(entity: str, rows, batch_size: int | None = None) -> bulk.BulkResult:
+    """
+    rows = iterable of dicts with "id" + the columns to change.
+    Rows changing the same set of columns share one executemany batch and transaction.
+    IDs that do not exist are reported as errors ("Not found"), like patch().
+    """
+    size = batch_size or bulk.DEFAULT_BATCH_SIZE
+    result = bulk.BulkResult()
+    buckets = {}        # tuple(columns) -> [(row_number, params), ...]
+    table = entities.get_entity(entity)["table"]
+    ship_items, ship_start = [], 0
+
+    def reindex(cur, written_params):
+        search_index.sync_rows(cur, entity, [p[-1] for p in written_params])
+
+    def flush(cols):
+        items = buckets.pop(cols)
+        found = _existing_ids(table, [p[-1] for _, p in items])
+        for n, p in items:
+            if p[-1] not in found:
+                result.errors.append((n, p, "Not found"))
+        items = [(n, p) for n, p in items if p[-1] in found]
+        if not items:
+            return
+        sql, _ = entities.update_sql(entity, dict.fromkeys(cols), 0)
+        on_written = reindex if search_index.indexed(entity) else None
+        part = bulk.bulk_execute(sql, [p for _, p in items], size, on_written)
+        part.errors = [(items[i][0], p, msg) for i, p, msg in part.errors]    # row numbers of the input
+        result.merge(part)
+
+    for n, row in enumerate(rows):
+        rid, changes = row["id"], {k: v for k, v in row.items() if k != "id"}
+        if not changes:
+            continue
+        if entity == "shipments":
+            if not ship_items:
+                ship_start = n
+            ship_items.append((rid, changes))
+            if len(ship_items) >= size:
+                _patch_shipments_batch(ship_items, ship_start, result)
+                ship_items, ship_start = [], 0
+            continue
+        cols = tuple(sorted(changes))
+        buckets.setdefault(cols, []).append((n, tuple(changes[c] for c in cols) + (rid,)))
+        if len(buckets[cols]) >= size:
+            flush(cols)
+
+    if ship_items:
+        _patch_shipments_batch(ship_items, ship_start, result)
+    if entity == "shipments":
+        query_cache.invalidate("tbl_shipments", "tbl_summary", "tbl_shipment_events")
+    for cols in list(buckets):
+        flush(cols)
+    return result
+
+
+def patch_file(entity: str, path: str, fmt: str | None = None, batch_size: int | None = None):
+    """Stream a patch file into bulk_patch(). Returns (BulkResult, invalid_line_messages)."""
+    invalid = []
+
+    def changes():
+        f = open_text(path, "r")
+        try:
+            for line_no, raw in read_rows(f, fmt or detect_format(path)):
+                try:
+                    raw = row_dict(raw)
+                    rid = entities.to_int(raw.get("id"))
+                    yield {"id": rid, **entities.validate_changes(entity, raw)}
+                except ValueError as e:
+                    invalid.append(f"line {line_no}: {e}")
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+    return bulk_patch(entity, changes(), batch_size), invalid
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Partial updates from a CSV / JSONL file")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("patch", help="update rows listed in a file (id + changed columns)")
+    p.add_argument("entity", choices=list(entities.ENTITIES))
+    p.add_argument("path")
+    p.add_argument("--format", choices=["csv", "jsonl"])
+    p.add_argument("--batch-size", type=int)
+    args = parser.parse_args(argv)
+
+    get_backend().create_schema()
+    res, invalid = patch_file(args.entity, args.path, args.format, args.batch_size)
+    print(f"✅ {res.written} rows updated, {len(invalid)} invalid, {res.failed} failed "
+          f"({res.rows_per_sec:.0f} rows/sec)", file=sys.stderr)
+    for msg in invalid[:100]:
+        print("❌", msg, file=sys.stderr)
+    for _, params, msg in res.errors[:100]:
+        print("❌", params, msg, file=sys.stderr)
+    return 0 if not invalid and not res.failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())